@@ -0,0 +1,291 @@
+"""
+GeoHarness: Bulk POI Verification API
+
+Google POI 목록(이름 + 좌표)을 한 번에 받아 /search와 같은 장소별 판정
+(Naver 검색 → classify_poi_status → ML 보정)을 수행하고, 끝나는 대로 NDJSON으로 흘려보냅니다.
+
+- 입력: NDJSON (application/x-ndjson) 또는 CSV (text/csv, 헤더 필수)
+  필드: name|poi_name, lat|g_lat, lng|g_lng, place_id(선택) — google_poi_base.csv 그대로 업로드 가능
+- 업로드 본문은 SpooledTemporaryFile에 받아(메모리 상한 초과분은 디스크) 행 단위로 나눠 읽음
+- 입력/출력 큐 크기와 작업자 수가 BATCH_VERIFY_CONCURRENCY로 고정 → 입력 크기와 무관하게 메모리 일정
+  (클라이언트가 결과를 늦게 읽으면 작업자가 멈추고 입력도 더 읽지 않음)
+- 업스트림 호출은 batch 우선순위 클래스(shared/scheduler.py) → 라이브 검색이 먼저
+- Naver 일일 남은 호출 수가 BATCH_VERIFY_NAVER_RESERVE 이하이면 Naver 검색을 건너뛰고
+  CSV 데이터셋 폴백으로만 판정 (라이브 API 몫 보존, 이벤트에 naver="quota_exhausted")
+- Naver 조회 실패(429/5xx, 타임아웃, 차단기 열림)는 not_found로 판정하지 않고
+  해당 줄의 error 이벤트(naver="failed")로 보냄 → summary.naver_failed
+
+엔드포인트:
+    POST /api/v1/verify/batch
+"""
+
+import asyncio
+import csv
+import io
+import itertools
+import json
+import logging
+import tempfile
+import time
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from api.executor import cpu_executor
+from api.search import NaverLookupError, _build_place_result, _naver_local_lookup
+from shared.config import settings
+from shared.http import http_pool
+from shared.scheduler import BATCH, priority_scope
+
+logger = logging.getLogger("BatchVerify")
+
+router = APIRouter(prefix="/api/v1", tags=["batch-verify"])
+
+_NAME_FIELDS = ("name", "poi_name")
+_LAT_FIELDS = ("lat", "g_lat")
+_LNG_FIELDS = ("lng", "g_lng")
+_READ_ROWS = 512            # 스레드에서 한 번에 읽을 입력 행 수
+_DONE = object()
+
+
+def _field(record: dict, names) -> Optional[str]:
+    for name in names:
+        value = record.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _parse_poi(record) -> dict:
+    """입력 레코드 1건 → Google Places 결과 형식 (_build_place_result 입력)"""
+    if not isinstance(record, dict):
+        raise ValueError("expected an object with name/lat/lng")
+    name = _field(record, _NAME_FIELDS)
+    lat, lng = _field(record, _LAT_FIELDS), _field(record, _LNG_FIELDS)
+    if not name or lat is None or lng is None:
+        raise ValueError("name, lat and lng are required")
+    return {
+        "name": str(name),
+        "place_id": record.get("place_id") or "",
+        "geometry": {"location": {"lat": float(lat), "lng": float(lng)}},
+    }
+
+
+def _is_csv(content_type: str, first_line: str) -> bool:
+    if "csv" in content_type:
+        return True
+    if "json" in content_type:
+        return False
+    return not first_line.lstrip().startswith("{")
+
+
+async def _spool_body(request: Request):
+    """요청 본문 → SpooledTemporaryFile (BATCH_VERIFY_SPOOL_BYTES 초과분은 디스크)"""
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.BATCH_VERIFY_SPOOL_BYTES)
+    async for chunk in request.stream():
+        await asyncio.to_thread(spool.write, chunk)
+    spool.seek(0)
+    return spool
+
+
+def _next_rows(reader, n: int) -> List[tuple]:
+    """csv.reader에서 최대 n행 → [(마지막 줄 번호, 행)] (따옴표 안 줄바꿈은 한 행으로)"""
+    batch = []
+    for row in reader:
+        batch.append((reader.line_num, row))
+        if len(batch) >= n:
+            break
+    return batch
+
+
+def _next_lines(lines: Iterable[str], n: int) -> List[str]:
+    return list(itertools.islice(lines, n))
+
+
+async def _read_records(spool, content_type: str) -> AsyncIterator[tuple]:
+    """
+    (줄 번호, 레코드 dict 또는 파싱 예외) — 입력을 _READ_ROWS행씩 스레드에서 읽음
+
+    CSV는 입력 전체에 csv.reader 하나를 사용 → 따옴표 필드 안의 줄바꿈이 읽기 단위 경계에 걸려도 한 행
+    """
+    text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+    first = await asyncio.to_thread(text.readline)
+    if not first:
+        return
+    lines = itertools.chain([first], text)
+    if _is_csv(content_type, first):
+        reader = csv.reader(lines)
+        header: Optional[List[str]] = None
+        while batch := await asyncio.to_thread(_next_rows, reader, _READ_ROWS):
+            for line_no, row in batch:
+                if not any(cell.strip() for cell in row):
+                    continue
+                if header is None:
+                    header = [cell.strip() for cell in row]
+                    continue
+                yield line_no, dict(zip(header, row))
+        return
+
+    line_no = 0
+    while batch := await asyncio.to_thread(_next_lines, lines, _READ_ROWS):
+        for line in batch:
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                yield line_no, e
+
+
+async def _naver_quota_left() -> bool:
+    """라이브 API 몫(BATCH_VERIFY_NAVER_RESERVE)을 넘는 Naver 일일 호출이 남았는지"""
+    await http_pool.quotas.ensure_loaded()
+    remaining = http_pool.quotas.remaining("naver")
+    if remaining is None or remaining["daily_remaining"] is None:
+        return True
+    return remaining["daily_remaining"] > settings.BATCH_VERIFY_NAVER_RESERVE
+
+
+async def _verify_one(place: dict, region: Optional[str]) -> tuple:
+    """
+    장소 1건 판정 → (결과, naver 조회 상태: searched | quota_exhausted | disabled)
+
+    Raises:
+        NaverLookupError: Naver 조회 실패 (결과 없음과 달리 판정하지 않음)
+    """
+    naver_item = None
+    lookup = "disabled"
+    if settings.NAVER_SEARCH_CLIENT_ID and settings.NAVER_SEARCH_CLIENT_SECRET:
+        if await _naver_quota_left():
+            name = place["name"]
+            naver_item = await _naver_local_lookup(f"{name} {region}" if region else name)
+            lookup = "searched"
+        else:
+            lookup = "quota_exhausted"
+    result = await cpu_executor.run("place_verify", _build_place_result, place, None, None, None, naver_item)
+    return result, lookup
+
+
+async def _batch_events(spool, content_type: str, region: Optional[str]) -> AsyncIterator[dict]:
+    """
+    검증 이벤트
+
+    place   : 장소별 판정 (완료 순서대로, index = 입력 순서 0부터, line = 입력 줄 번호)
+    error   : 해당 줄만 실패 (형식 오류/판정 오류/Naver 조회 실패 naver="failed"), 나머지는 계속
+    summary : 전체 건수(place + error 이벤트 수), 상태별 건수, Naver 건너뜀/실패 수, 소요 시간
+    """
+    start = time.perf_counter()
+    concurrency = settings.BATCH_VERIFY_CONCURRENCY
+    inbox: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    outbox: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    counts: Dict[str, int] = {"verified": 0, "warning": 0, "not_found": 0}
+    totals = {"total": 0, "errors": 0, "naver_skipped": 0, "naver_failed": 0}
+    next_index = 0
+
+    async def produce():
+        nonlocal next_index
+        try:
+            async for line_no, record in _read_records(spool, content_type):
+                try:
+                    if isinstance(record, Exception):
+                        raise record
+                    item = (next_index, line_no, _parse_poi(record))
+                except (ValueError, TypeError) as e:
+                    item = (next_index, line_no, e)
+                await inbox.put(item)
+                next_index += 1
+        except (ValueError, csv.Error) as e:   # 인코딩 오류 등 — 이후 입력은 읽지 않음
+            await outbox.put({"event": "error", "index": next_index, "error": f"invalid batch payload: {e}"})
+        finally:
+            # 그 밖의 실패(spool I/O 오류, 취소)에도 작업자가 끝나도록 — 예외는 소비 측에서 보고
+            for _ in range(concurrency):
+                await inbox.put(_DONE)
+
+    async def work():
+        with priority_scope(BATCH):
+            while (item := await inbox.get()) is not _DONE:
+                index, line_no, place = item
+                if isinstance(place, Exception):
+                    await outbox.put({"event": "error", "index": index, "line": line_no, "error": str(place)})
+                    continue
+                try:
+                    result, lookup = await _verify_one(place, region)
+                    event = {"event": "place", "index": index, "line": line_no, "naver": lookup, "place": result}
+                except NaverLookupError as e:
+                    event = {"event": "error", "index": index, "line": line_no, "naver": "failed",
+                             "error": f"naver lookup failed: {e}"}
+                except Exception as e:
+                    logger.warning(f"Batch verify failed at line {line_no}: {e}")
+                    event = {"event": "error", "index": index, "line": line_no, "error": str(e)}
+                await outbox.put(event)
+        await outbox.put(_DONE)
+
+    tasks = [asyncio.ensure_future(produce())] + [asyncio.ensure_future(work()) for _ in range(concurrency)]
+    try:
+        finished = 0
+        while finished < concurrency:
+            event = await outbox.get()
+            if event is _DONE:
+                finished += 1
+                continue
+            totals["total"] += 1      # 입력 오류(줄 없음)도 오류 1건으로 → total = 판정 수 + errors
+            if event["event"] == "error":
+                totals["errors"] += 1
+                totals["naver_failed"] += event.get("naver") == "failed"
+            else:
+                counts[event["place"]["status"]] = counts.get(event["place"]["status"], 0) + 1
+                totals["naver_skipped"] += event["naver"] == "quota_exhausted"
+            yield event
+        producer = tasks[0]
+        await asyncio.wait([producer])
+        if not producer.cancelled() and producer.exception() is not None:
+            e = producer.exception()
+            logger.error(f"Batch verify input failed: {e}")
+            totals["total"] += 1
+            totals["errors"] += 1
+            yield {"event": "error", "index": next_index, "error": f"batch input failed: {e}"}
+        yield {
+            "event": "summary",
+            **totals,
+            "statuses": counts,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+    except Exception as e:
+        logger.error(f"Batch verify stream error: {e}")
+        yield {"event": "error", "error": str(e)}
+    finally:
+        # 클라이언트가 연결을 끊으면 남은 작업 정리
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        spool.close()
+
+
+@router.post("/verify/batch")
+async def verify_batch(request: Request, region: Optional[str] = Query(None)):
+    """
+    Google POI 일괄 생존 판정 (결과는 NDJSON 스트림)
+
+    Request (Content-Type: application/x-ndjson):
+        {"name": "하이라인", "lat": 37.5443, "lng": 127.0566, "place_id": "ChIJ..."}
+    Request (Content-Type: text/csv):
+        poi_name,g_lat,g_lng
+        하이라인,37.5443,127.0566
+    region: Naver 검색어에 붙일 지역명 (예: 성수동)
+
+    Response (application/x-ndjson):
+        {"event": "place", "index": 0, "line": 1, "naver": "searched", "place": {... /search 장소 결과 ...}}
+        {"event": "error", "index": 1, "line": 2, "error": "name, lat and lng are required"}
+        {"event": "error", "index": 2, "line": 3, "naver": "failed", "error": "naver lookup failed: HTTP 429"}
+        {"event": "summary", "total": 3, "errors": 2, "naver_skipped": 0, "naver_failed": 1, "statuses": {...}, ...}
+    """
+    content_type = request.headers.get("content-type", "")
+    spool = await _spool_body(request)
+
+    async def body():
+        async for event in _batch_events(spool, content_type, region):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
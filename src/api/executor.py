@@ -0,0 +1,139 @@
+"""
+GeoHarness: CPU Stage Executor
+
+async 엔드포인트 안의 CPU 바운드 단계(퍼지 매칭, sklearn 추론, 이름 유사도)를
+uvicorn 이벤트 루프 밖의 스레드/프로세스 풀에서 실행합니다.
+한 요청이 퍼지 매칭을 하는 동안에도 다른 요청의 업스트림 I/O는 계속 진행됩니다.
+
+- 실행기 종류/크기는 설정으로 지정 (CPU_EXECUTOR_KIND: thread | process | inline)
+- 대기열은 CPU_EXECUTOR_MAX_PENDING으로 제한 (초과 시 호출자가 자리 날 때까지 대기)
+- 단계별 대기/실행 시간 통계를 /health에 노출
+
+사용법:
+    from api.executor import cpu_executor
+
+    row = await cpu_executor.run("dataset_match", _find_in_dataset, query)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from shared.config import settings
+
+logger = logging.getLogger("StageExecutor")
+
+
+class _StageStats:
+    __slots__ = ("calls", "errors", "wait_ms", "run_ms", "max_run_ms")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.wait_ms = 0.0
+        self.run_ms = 0.0
+        self.max_run_ms = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_wait_ms": round(self.wait_ms / self.calls, 2) if self.calls else None,
+            "avg_run_ms": round(self.run_ms / self.calls, 2) if self.calls else None,
+            "max_run_ms": round(self.max_run_ms, 2),
+        }
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict):
+    """워커에서 실행: 결과와 함께 순수 실행 시간(ms) 반환"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+class StageExecutor:
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_pending: int = 64):
+        if kind not in ("thread", "process", "inline"):
+            raise ValueError(f"unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self._semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._stats: Dict[str, _StageStats] = {}
+        self.in_flight = 0
+
+    def _executor(self) -> Optional[Executor]:
+        if self.kind == "inline":
+            return None
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cpu-stage")
+        return self._pool
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # asyncio.Semaphore는 이벤트 루프에 묶이므로 루프별로 하나씩
+        loop = asyncio.get_running_loop()
+        sem = self._semaphores.get(loop)
+        if sem is None:
+            sem = self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+        return sem
+
+    async def run(self, stage: str, fn: Callable, *args, **kwargs) -> Any:
+        """fn(*args, **kwargs)를 실행기에서 실행하고 단계별 시간을 기록"""
+        stats = self._stats.setdefault(stage, _StageStats())
+        queued_at = time.perf_counter()
+
+        async with self._semaphore():
+            self.in_flight += 1
+            try:
+                executor = self._executor()
+                if executor is None:
+                    result, run_ms = _timed_call(fn, args, kwargs)
+                else:
+                    loop = asyncio.get_running_loop()
+                    result, run_ms = await loop.run_in_executor(executor, partial(_timed_call, fn, args, kwargs))
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+        total_ms = (time.perf_counter() - queued_at) * 1000
+        stats.calls += 1
+        stats.run_ms += run_ms
+        stats.wait_ms += max(0.0, total_ms - run_ms)
+        stats.max_run_ms = max(stats.max_run_ms, run_ms)
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "stages": {name: s.to_dict() for name, s in self._stats.items()},
+        }
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+cpu_executor = StageExecutor(
+    kind=settings.CPU_EXECUTOR_KIND,
+    max_workers=settings.CPU_EXECUTOR_WORKERS,
+    max_pending=settings.CPU_EXECUTOR_MAX_PENDING,
+)
@@ -6,17 +6,21 @@ GeoHarness v2.0: Local Verifier API
 
 엔드포인트:
     POST /api/v1/predict-offset
+    POST /api/v1/predict-offset/batch
     POST /api/v1/verify-location
 """
 
+import json
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
-import aiohttp
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
-from engine.inference import predict_offset, get_model_status
+from api.executor import cpu_executor
+from engine.inference import predict_offset, predict_offset_batch, get_model_status
 from shared.config import settings
+from shared.http import http_pool
+from shared.resilience import Deadline, deadline_scope
 
 logger = logging.getLogger("LocalVerifier")
 
@@ -36,6 +40,7 @@ async def api_predict_offset(payload: dict):
 
     Request:
         { "lat": 37.5442, "lng": 127.0499 }
+        { "lat": 37.5442, "lng": 127.0499, "method": "lattice" }  (격자 보간)
 
     Response:
         {
@@ -52,7 +57,9 @@ async def api_predict_offset(payload: dict):
     if lat is None or lng is None:
         return {"error": "lat/lng required"}
 
-    result = predict_offset(float(lat), float(lng))
+    result = await cpu_executor.run(
+        "predict_offset", predict_offset, float(lat), float(lng), method=payload.get("method", "ml"),
+    )
 
     return {
         "original": {"lat": lat, "lng": lng},
@@ -66,6 +73,90 @@ async def api_predict_offset(payload: dict):
     }
 
 
+def _parse_point(item) -> Tuple[float, float]:
+    """{"lat", "lng"} 객체 또는 [lat, lng] 배열 → (lat, lng)"""
+    if isinstance(item, dict):
+        return float(item["lat"]), float(item["lng"])
+    lat, lng = item
+    return float(lat), float(lng)
+
+
+def _parse_batch_body(body: bytes, content_type: str) -> Tuple[List[float], List[float]]:
+    """
+    배치 요청 본문 파싱.
+
+    - NDJSON (application/x-ndjson, application/jsonl): 한 줄에 한 좌표
+    - JSON: { "lats": [...], "lngs": [...] } | { "points": [...] } | [...]
+    """
+    if "ndjson" in content_type or "jsonl" in content_type:
+        points = [json.loads(line) for line in body.decode("utf-8").splitlines() if line.strip()]
+    else:
+        data = json.loads(body or b"null")
+        if isinstance(data, dict) and "lats" in data:
+            lats = [float(v) for v in data["lats"]]
+            lngs = [float(v) for v in data.get("lngs", [])]
+            return lats, lngs
+        points = data.get("points") if isinstance(data, dict) else data
+        if not isinstance(points, list):
+            raise ValueError("expected a JSON array of points")
+
+    lats, lngs = [], []
+    for item in points:
+        lat, lng = _parse_point(item)
+        lats.append(lat)
+        lngs.append(lng)
+    return lats, lngs
+
+
+@router.post("/predict-offset/batch")
+async def api_predict_offset_batch(request: Request):
+    """
+    Google WGS84 좌표 배열 → ML 보정 좌표 일괄 반환 (모델 호출 1회)
+
+    Request (JSON):
+        { "points": [{ "lat": 37.5442, "lng": 127.0499 }, ...] }
+        또는 { "lats": [...], "lngs": [...] } 또는 [[lat, lng], ...]
+
+    Request (NDJSON, Content-Type: application/x-ndjson):
+        {"lat": 37.5442, "lng": 127.0499}
+        {"lat": 37.5443, "lng": 127.0500}
+
+    Response:
+        {
+            "count": 2,
+            "method": "ml",
+            "confidence": 0.92,
+            "results": [{ "original": {...}, "corrected": {...} }, ...],
+            "details": { ... }
+        }
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        lats, lngs = _parse_batch_body(body, content_type)
+        result = await cpu_executor.run("predict_offset_batch", predict_offset_batch, lats, lngs)
+    except (ValueError, TypeError, KeyError) as e:
+        return {"error": f"invalid batch payload: {e}"}
+
+    corrected_lat = result["corrected_lat"].tolist()
+    corrected_lng = result["corrected_lng"].tolist()
+    results = [
+        {
+            "original": {"lat": lat, "lng": lng},
+            "corrected": {"lat": c_lat, "lng": c_lng},
+        }
+        for lat, lng, c_lat, c_lng in zip(lats, lngs, corrected_lat, corrected_lng)
+    ]
+
+    return {
+        "count": len(results),
+        "method": result["method"],
+        "confidence": result["confidence"],
+        "results": results,
+        "details": result["details"],
+    }
+
+
 @router.post("/verify-location")
 async def verify_location(payload: dict):
     """
@@ -81,7 +172,8 @@ async def verify_location(payload: dict):
             "corrected": { "lat": 37.5443, "lng": 127.0501 },
             "naver_result": { "name": "하이라인", "address": "서울시 성동구..." },
             "offset_distance_m": 12.3,
-            "harness_score": 88
+            "harness_score": 88,
+            "budget": { "total_ms": 5000.0, "used_ms": 180.2, "stages": { "predict_offset": 3.1, "ncp": 170.4 } }
         }
     """
     lat = payload.get("lat")
@@ -91,17 +183,19 @@ async def verify_location(payload: dict):
     if lat is None or lng is None:
         return {"error": "lat/lng required"}
 
-    # Step 1: ML 보정
-    correction = predict_offset(float(lat), float(lng))
+    with deadline_scope(Deadline(settings.VERIFY_DEADLINE_S)) as deadline:
+        # Step 1: ML 보정 (이벤트 루프 밖 실행기)
+        with deadline.stage("predict_offset"):
+            correction = await cpu_executor.run("predict_offset", predict_offset, float(lat), float(lng))
 
-    # Step 2: 네이버 역지오코딩 (API 키 있으면)
-    naver_result = None
-    if settings.NAVER_CLIENT_ID and not settings.NAVER_CLIENT_ID.startswith("your-"):
-        naver_result = await _search_naver_at_coords(
-            correction["corrected_lat"],
-            correction["corrected_lng"],
-            poi_name,
-        )
+        # Step 2: 네이버 역지오코딩 (API 키 있으면, 남은 예산 안에서)
+        naver_result = None
+        if settings.NAVER_CLIENT_ID and not settings.NAVER_CLIENT_ID.startswith("your-"):
+            naver_result = await _search_naver_at_coords(
+                correction["corrected_lat"],
+                correction["corrected_lng"],
+                poi_name,
+            )
 
     # Step 3: Harness Score 계산
     from engine.metrics import haversine_m, calculate_harness_score
@@ -122,6 +216,7 @@ async def verify_location(payload: dict):
         "naver_result": naver_result,
         "offset_distance_m": round(offset_dist, 2),
         "harness_score": harness,
+        "budget": deadline.report(),
     }
 
 
@@ -135,20 +230,18 @@ async def _search_naver_at_coords(lat: float, lng: float, query: str) -> Optiona
     params = {"query": query or f"{lat},{lng}"}
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, params=params) as resp:
-                if resp.status != 200:
-                    return None
-                data = await resp.json()
-                addresses = data.get("addresses", [])
-                if not addresses:
-                    return None
-                first = addresses[0]
-                return {
-                    "name": query,
-                    "address": first.get("jibunAddress", ""),
-                    "road_address": first.get("roadAddress", ""),
-                }
+        status, data = await http_pool.get_json("ncp", url, headers=headers, params=params)
+        if status != 200:
+            return None
+        addresses = data.get("addresses", [])
+        if not addresses:
+            return None
+        first = addresses[0]
+        return {
+            "name": query,
+            "address": first.get("jibunAddress", ""),
+            "road_address": first.get("roadAddress", ""),
+        }
     except Exception as e:
         logger.error(f"NCP Geocoding error: {e}")
         return None
@@ -6,56 +6,141 @@ GeoHarness v6.0: POI Survival Verification API
 2. Naver Search Local API로 교차검증하여 POI 생존 여부를 판정하고
 3. ML decoder로 보정된 좌표를 보조 지표로 계산하고
 4. 판정 결과 + 원본/보정 좌표 + 메타데이터를 반환합니다.
+
+/api/v1/search/stream은 같은 과정을 NDJSON/SSE 이벤트로 흘려보내
+Google 결과를 먼저, 장소별 판정은 완료되는 대로 전송합니다.
+
+업스트림 호스트 차단기(shared/breaker.py)가 열려 있으면 해당 호출을 건너뛰고
+CSV 데이터셋 폴백으로 바로 진행합니다 (meta.degraded, 캐시하지 않음).
 """
 
+import asyncio
 import csv
+import json
 import logging
 import re
 import time
-from difflib import SequenceMatcher
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, List, Optional, Tuple
 
-import aiohttp
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
 
+from api.executor import cpu_executor
+from api.singleflight import SingleFlight, normalize_query
+from engine.autocomplete import AutocompleteIndex, prefix_key
 from engine.inference import predict_offset
 from engine.metrics import haversine_m
+from engine.poi_index import DEFAULT_FIELDS as POI_INDEX_FIELDS, PoiIndex
+from engine.poi_store import PoiStore, cache_path_for
+from engine.similarity import name_similarity
+from engine.spatial import GridIndex
+from shared.cache import create_cache
 from shared.config import settings
+from shared.http import http_pool
+from shared.resilience import Deadline, budget_stage, current_deadline, deadline_context, deadline_scope
 
 logger = logging.getLogger("SearchAPI")
 
 router = APIRouter(prefix="/api/v1", tags=["search"])
 
-# ── CSV 데이터셋 로딩 (서버 시작 시 1회) ──
-_dataset: List[dict] = []
+# ── CSV 데이터셋 로딩 (서버 시작 시 1회, 열 저장소 engine/poi_store.py) ──
+# import 시에는 바이너리 캐시를 읽기만 하고, 새로 쓰는 것은 서버 시작 시 (write_dataset_cache)
 _dataset_path = Path(__file__).resolve().parent.parent.parent / "data" / "ml_dataset.csv"
 try:
-    with open(_dataset_path, encoding="utf-8") as _f:
-        _dataset = list(csv.DictReader(_f))
-    logger.info(f"Loaded {len(_dataset)} rows from ml_dataset.csv")
+    _dataset = PoiStore.load(_dataset_path, use_cache=settings.DATASET_STORE_CACHE, write_cache=False)
+    logger.info(f"Loaded {len(_dataset)} rows from ml_dataset.csv: {_dataset.stats()}")
 except FileNotFoundError:
+    _dataset = PoiStore.empty()
     logger.warning(f"ml_dataset.csv not found at {_dataset_path}")
 
-# 간단한 메모리 캐시 (TTL 기반)
-_search_cache: Dict[str, dict] = {}
-_cache_timestamps: Dict[str, float] = {}
-CACHE_TTL = 3600  # 1시간
+
+
+def write_dataset_cache():
+    """CSV를 파싱해 읽었으면 바이너리 캐시 저장 → 다음 시작부터 캐시에서 로드 (api/server.py lifespan)"""
+    if not settings.DATASET_STORE_CACHE or _dataset.loaded_from != "csv":
+        return
+    cache_path = cache_path_for(_dataset_path)
+    try:
+        _dataset.save(cache_path, _dataset.signature)
+        logger.info(f"Wrote POI store cache {cache_path}")
+    except OSError as e:
+        logger.warning(f"Could not write POI store cache {cache_path}: {e}")
+
+
+# 이름 trigram 역색인 (퍼지 매칭 후보 축소, engine/poi_index.py)
+_poi_index = PoiIndex(_dataset, normalized=[_dataset.normalized(f) for f in POI_INDEX_FIELDS])
+# 좌표 격자 색인 (장소별 폴백은 Google 좌표 반경 내 행만 채점, engine/spatial.py)
+_poi_grid = GridIndex(_dataset.n_lat, _dataset.n_lng, cell_deg=settings.DATASET_GRID_CELL_DEG)
+
+
+def _build_autocomplete_index() -> AutocompleteIndex:
+    """자동완성 접두사 색인: ml_dataset.csv(주소 포함) → google_poi_base.csv 이름 순 (engine/autocomplete.py)"""
+    index = AutocompleteIndex(max_recent=settings.AUTOCOMPLETE_RECENT_MAX)
+    index.add_many(
+        {"description": f"{name}, {address}" if address else name, "place_id": f"local:{i}", "main_text": name}
+        for i, (name, address) in enumerate(zip(_dataset.poi_name, _dataset.n_address))
+        if name
+    )
+    base_path = _dataset_path.parent / "google_poi_base.csv"
+    try:
+        with open(base_path, encoding="utf-8") as f:
+            index.add_many(
+                {"description": row["poi_name"], "place_id": f"local:base:{i}", "main_text": row["poi_name"]}
+                for i, row in enumerate(csv.DictReader(f))
+                if row.get("poi_name")
+            )
+    except FileNotFoundError:
+        logger.warning(f"google_poi_base.csv not found at {base_path}")
+    logger.info(f"Autocomplete index: {index.stats()}")
+    return index
+
+
+_autocomplete_index = _build_autocomplete_index()
+
+# 검색 결과 캐시 (memory: 인스턴스 로컬 LRU / sqlite: 재시작 후 유지 / redis: 인스턴스 간 공유)
+def _create_search_cache():
+    backend = settings.SEARCH_CACHE_BACKEND
+    common = {"ttl": settings.SEARCH_CACHE_TTL_S, "compress": settings.SEARCH_CACHE_COMPRESS}
+    if backend == "redis":
+        return create_cache("redis", url=settings.SEARCH_CACHE_REDIS_URL, **common)
+    bounds = {
+        "max_entries": settings.SEARCH_CACHE_MAX_ENTRIES,
+        "max_bytes": settings.SEARCH_CACHE_MAX_BYTES,
+        "sweep_interval": settings.SEARCH_CACHE_SWEEP_S,
+    }
+    if backend == "sqlite":
+        path = settings.SEARCH_CACHE_SQLITE_PATH or str(_dataset_path.parent / "search_cache.sqlite3")
+        return create_cache("sqlite", path=path, **bounds, **common)
+    return create_cache(backend, **bounds, **common)
+
+
+_search_cache = _create_search_cache()
+
+
+def _search_key(full_query: str, region: Optional[str]) -> str:
+    """
+    검색 캐시 / single-flight 공용 키: 정규화한 전체 쿼리 + 지역
+
+    장소별 Naver 조회는 region으로 검색어를 만들므로 전체 텍스트가 같아도
+    query/region 구분이 다르면 다른 결과 ("하이라인 카페"+"성수동" ≠ "하이라인 카페 성수동"+"")
+    """
+    return f"{normalize_query(full_query)}|{normalize_query(region or '')}"
 
 
 def _get_cached(key: str) -> Optional[dict]:
-    if key in _search_cache:
-        if time.time() - _cache_timestamps[key] < CACHE_TTL:
-            return _search_cache[key]
-        else:
-            del _search_cache[key]
-            del _cache_timestamps[key]
-    return None
+    return _search_cache.get(key)
 
 
 def _set_cache(key: str, value: dict):
-    _search_cache[key] = value
-    _cache_timestamps[key] = time.time()
+    _search_cache.set(key, value)
+
+
+async def _cache_call(fn, *args):
+    """디스크/네트워크 캐시 백엔드는 이벤트 루프 밖 스레드에서 호출"""
+    if _search_cache.blocking:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
 
 
 def _strip_html(text: str) -> str:
@@ -63,41 +148,31 @@ def _strip_html(text: str) -> str:
     return re.sub(r"<[^>]+>", "", text)
 
 
-def name_similarity(google_name: str, naver_name: str) -> float:
-    """한/영 정규화 후 유사도 계산 (0~1)"""
-    def normalize(s: str) -> str:
-        s = _strip_html(s)
-        s = re.sub(r"[^\w가-힣a-zA-Z0-9]", "", s)
-        return s.lower().strip()
-
-    g = normalize(google_name)
-    n = normalize(naver_name)
-    if not g or not n:
-        return 0.0
-    return SequenceMatcher(None, g, n).ratio()
-
+def _find_in_dataset(
+    query: str,
+    near: Optional[Tuple[float, float]] = None,
+    radius_m: Optional[float] = None,
+) -> Optional[dict]:
+    """
+    CSV 데이터셋에서 퍼지 매칭으로 POI 검색
 
-def _find_in_dataset(query: str) -> Optional[dict]:
-    """CSV 데이터셋에서 퍼지 매칭으로 POI 검색"""
+    poi_name/n_name 중 더 높은 유사도가 0.4 이상인 최고점 행 (동점이면 데이터셋 순서상 앞선 행).
+    trigram 역색인 후보 + 문자 수 상한 검증으로 전체 선형 탐색과 같은 결과를 반환합니다.
+    near=(lat, lng)를 주면 Naver 좌표가 radius_m 이내인 행만 후보로 삼습니다.
+    """
     if not _dataset:
         return None
-    best_row = None
-    best_score = 0.0
-    for row in _dataset:
-        score = max(
-            name_similarity(query, row.get("poi_name", "")),
-            name_similarity(query, row.get("n_name", "")),
-        )
-        if score > best_score:
-            best_score = score
-            best_row = row
-    if best_score >= 0.4 and best_row:
-        return best_row
-    return None
+    allowed = None
+    if near is not None:
+        radius = settings.DATASET_MATCH_RADIUS_M if radius_m is None else radius_m
+        allowed = _poi_grid.within(near[0], near[1], radius)
+        if len(allowed) == 0:
+            return None
+    return _poi_index.best_match(query, threshold=0.4, allowed=allowed)
 
 
 def _csv_row_to_naver(row: dict) -> Tuple[dict, Optional[float], Optional[float]]:
-    """CSV row를 Naver API 응답 형식으로 변환"""
+    """CSV row를 Naver API 응답 형식으로 변환 (좌표는 로드 시 디코딩/검증된 n_lat, n_lng)"""
     naver_item = {
         "title": row.get("n_name", ""),
         "category": row.get("poi_type", ""),
@@ -105,18 +180,7 @@ def _csv_row_to_naver(row: dict) -> Tuple[dict, Optional[float], Optional[float]
         "telephone": "",
         "link": "",
     }
-    n_lat, n_lng = None, None
-    try:
-        raw_x = int(row.get("n_mapx", 0))
-        raw_y = int(row.get("n_mapy", 0))
-        if raw_x and raw_y:
-            n_lng = raw_x / 10_000_000.0
-            n_lat = raw_y / 10_000_000.0
-            if not (33.0 <= n_lat <= 43.0 and 124.0 <= n_lng <= 132.0):
-                n_lat, n_lng = None, None
-    except (ValueError, TypeError):
-        pass
-    return naver_item, n_lat, n_lng
+    return naver_item, row.get("n_lat"), row.get("n_lng")
 
 
 def classify_poi_status(
@@ -158,6 +222,250 @@ def classify_poi_status(
     return ("not_found", 0.8, f"거리 {dist:.0f}m 초과 (폐업 추정)")
 
 
+def _build_place_result(
+    place: dict,
+    naver_item: Optional[dict],
+    n_lat: Optional[float],
+    n_lng: Optional[float],
+    place_naver_item: Optional[dict] = None,
+) -> dict:
+    """
+    Google 결과 1건 → 개별 Naver 매칭 + ML 보정 + POI 생존 판정 (CPU 단계, 동기)
+
+    개별 Naver 데이터 우선순위:
+        1. 장소별 Naver Search 결과 (place_naver_item, 좌표 유효 시)
+        2. CSV 데이터셋 (Google 좌표 반경 내 이름 매칭)
+        3. 쿼리 단위 결과 (naver_item, n_lat, n_lng)
+    """
+    geo = place.get("geometry", {}).get("location", {})
+    g_lat = geo.get("lat", 0)
+    g_lng = geo.get("lng", 0)
+    place_name = place.get("name", "")
+
+    p_naver_item, p_n_lat, p_n_lng = naver_item, n_lat, n_lng
+    place_coords = _naver_item_coords(place_naver_item) if place_naver_item is not None else (None, None)
+    if place_coords[0] is not None:
+        p_naver_item, (p_n_lat, p_n_lng) = place_naver_item, place_coords
+    else:
+        # 개별 CSV 매칭: 각 Google 결과마다 자기 좌표 반경 안의 Naver 데이터
+        csv_row = _find_in_dataset(place_name, near=(g_lat, g_lng))
+        if csv_row:
+            p_naver_item, p_n_lat, p_n_lng = _csv_row_to_naver(csv_row)
+            logger.info(f"CSV fallback (place): matched '{csv_row.get('n_name')}' for '{place_name}'")
+
+    # Naver 메타데이터 추출 (개별)
+    p_naver_name = None
+    p_naver_category = None
+    p_naver_phone = None
+    p_naver_link = None
+    if p_naver_item:
+        p_naver_name = _strip_html(p_naver_item.get("title", "")) or None
+        p_naver_category = p_naver_item.get("category") or None
+        p_naver_phone = p_naver_item.get("telephone") or None
+        p_naver_link = p_naver_item.get("link") or None
+
+    # ML 보정 (보조 지표)
+    correction = predict_offset(g_lat, g_lng)
+
+    # 보정 거리 계산
+    dist_m = haversine_m(g_lat, g_lng, correction["corrected_lat"], correction["corrected_lng"])
+
+    # Sync 거리 및 점수 계산 (Naver 좌표가 있을 경우)
+    sync_score = None
+    naver_location = None
+    if p_n_lat is not None and p_n_lng is not None:
+        naver_location = {"lat": p_n_lat, "lng": p_n_lng}
+        sync_dist_m = haversine_m(correction["corrected_lat"], correction["corrected_lng"], p_n_lat, p_n_lng)
+        sync_score = max(0, 100 - sync_dist_m)
+
+    # POI 생존 판정
+    status, status_confidence, status_reason = classify_poi_status(
+        place_name, g_lat, g_lng,
+        p_naver_item, p_n_lat, p_n_lng,
+    )
+
+    # 이름 유사도
+    sim = None
+    if p_naver_name:
+        sim = round(name_similarity(place_name, p_naver_name), 2)
+
+    return {
+        # 기존 필드 유지
+        "name": place_name,
+        "address": place.get("formatted_address", ""),
+        "place_id": place.get("place_id", ""),
+        "types": place.get("types", []),
+        "rating": place.get("rating"),
+        "original": {"lat": g_lat, "lng": g_lng},
+        "corrected": {
+            "lat": correction["corrected_lat"],
+            "lng": correction["corrected_lng"],
+        },
+        "naver_location": naver_location,
+        "sync_score": round(sync_score, 1) if sync_score is not None else None,
+        "correction_distance_m": round(dist_m, 1),
+        "confidence": correction["confidence"],
+        "method": correction["method"],
+        # 새 필드: POI 생존 검증
+        "status": status,
+        "status_reason": status_reason,
+        "status_confidence": status_confidence,
+        "naver_name": p_naver_name,
+        "naver_category": p_naver_category,
+        "naver_phone": p_naver_phone,
+        "naver_link": p_naver_link,
+        "name_similarity": sim,
+    }
+
+
+# ── 업스트림 호출 (shared/http.py 공유 연결 풀 사용) ──
+
+# 진행 중인 동일 요청 합치기 (api/singleflight.py)
+_search_flight = SingleFlight("search")
+_autocomplete_flight = SingleFlight("autocomplete")
+_geocode_flight = SingleFlight("ncp_geocode")
+
+GOOGLE_TEXT_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+GOOGLE_AUTOCOMPLETE_URL = "https://maps.googleapis.com/maps/api/place/autocomplete/json"
+NAVER_LOCAL_SEARCH_URL = "https://openapi.naver.com/v1/search/local.json"
+NCP_GEOCODE_URL = "https://naveropenapi.apigw.ntruss.com/map-geocode/v2/geocode"
+
+# 검색 경로 업스트림 (차단기 상태 확인용)
+SEARCH_UPSTREAMS = (("google", GOOGLE_TEXT_SEARCH_URL), ("naver", NAVER_LOCAL_SEARCH_URL), ("ncp", NCP_GEOCODE_URL))
+
+
+def _in_korea(lat: float, lng: float) -> bool:
+    return 33.0 <= lat <= 43.0 and 124.0 <= lng <= 132.0
+
+
+def _naver_item_coords(item: dict) -> Tuple[Optional[float], Optional[float]]:
+    """Naver Search 결과의 mapx/mapy (WGS84 × 1e7) → (lat, lng)"""
+    try:
+        raw_x = int(item.get("mapx", 0))
+        raw_y = int(item.get("mapy", 0))
+        if raw_x and raw_y:
+            n_lng = raw_x / 10_000_000.0
+            n_lat = raw_y / 10_000_000.0
+            if _in_korea(n_lat, n_lng):
+                return n_lat, n_lng
+    except (ValueError, TypeError):
+        pass
+    return None, None
+
+
+def _open_upstreams() -> List[str]:
+    """차단기가 열려 있어 이번 검색에서 건너뛸 업스트림 이름"""
+    return [name for name, url in SEARCH_UPSTREAMS if not http_pool.breakers.available(url)]
+
+
+def _csv_row_to_google(row: dict) -> dict:
+    """CSV row를 Google Text Search 결과 형식으로 변환 (Google 차단기 open 시)"""
+    lat, lng = row.get("g_lat"), row.get("g_lng")
+    if lat is None or lng is None:
+        lat, lng = 0, 0
+    poi_type = row.get("poi_type", "")
+    return {
+        "name": row.get("poi_name", ""),
+        "formatted_address": row.get("n_address", ""),
+        "place_id": "",
+        "types": [poi_type] if poi_type else [],
+        "geometry": {"location": {"lat": lat, "lng": lng}},
+    }
+
+
+async def _google_places(full_query: str, api_key: str, degraded: List[str]) -> Tuple[int, Optional[dict]]:
+    """Google Text Search. Google 차단기가 열려 있으면 호출 없이 CSV 데이터셋 매칭 결과로 대체"""
+    if "google" not in degraded:
+        return await _google_text_search(full_query, api_key)
+    with budget_stage("dataset_match"):
+        row = await cpu_executor.run("dataset_match", _find_in_dataset, full_query)
+    logger.info(f"Google circuit open: dataset fallback {'matched' if row else 'missed'} for '{full_query}'")
+    return 200, {"results": [_csv_row_to_google(row)] if row else []}
+
+
+async def _google_text_search(full_query: str, api_key: str) -> Tuple[int, Optional[dict]]:
+    """Google Places Text Search → (status, JSON | None)"""
+    params = {
+        "query": full_query,
+        "key": api_key,
+        "language": "ko",
+        "region": "kr",
+    }
+    return await http_pool.get_json("google", GOOGLE_TEXT_SEARCH_URL, params=params)
+
+
+class NaverLookupError(Exception):
+    """Naver Search 조회 실패 (차단기 열림/한도 소진/타임아웃/200이 아닌 응답) — 결과 없음과 구분"""
+
+
+async def _naver_local_lookup(query: str, display: int = 1) -> Optional[dict]:
+    """
+    Naver Search Local API 첫 결과 (결과 없음 → None, 키 미설정 → None)
+
+    Raises:
+        NaverLookupError: 조회 실패 (판정 근거로 쓸 수 없음)
+    """
+    client_id = settings.NAVER_SEARCH_CLIENT_ID
+    client_secret = settings.NAVER_SEARCH_CLIENT_SECRET
+    if not (client_id and client_secret):
+        return None
+    if not http_pool.breakers.available(NAVER_LOCAL_SEARCH_URL):
+        raise NaverLookupError("circuit open for Naver Search")
+    headers = {
+        "X-Naver-Client-Id": client_id,
+        "X-Naver-Client-Secret": client_secret,
+    }
+    try:
+        status, data = await http_pool.get_json(
+            "naver", NAVER_LOCAL_SEARCH_URL, headers=headers, params={"query": query, "display": display},
+        )
+    except Exception as e:
+        raise NaverLookupError(f"{type(e).__name__}: {e}") from e
+    if status != 200:
+        raise NaverLookupError(f"HTTP {status}")
+    items = (data or {}).get("items", [])
+    return items[0] if items else None
+
+
+async def _naver_local_search(query: str, display: int = 1) -> Optional[dict]:
+    """Naver Search Local API 첫 결과 (키 미설정/실패 시 None — 검색은 폴백으로 진행)"""
+    try:
+        return await _naver_local_lookup(query, display)
+    except NaverLookupError as e:
+        logger.warning(f"Naver Search failed: {e}")
+        return None
+
+
+async def _ncp_geocode(address: str) -> Optional[Tuple[float, float]]:
+    """NCP Geocoding: 주소 → (lat, lng) (키 미설정/실패 시 None, 같은 주소 동시 요청은 1회만 호출)"""
+    return await _geocode_flight.do(normalize_query(address), lambda: _ncp_geocode_uncached(address))
+
+
+async def _ncp_geocode_uncached(address: str) -> Optional[Tuple[float, float]]:
+    ncp_id = settings.NAVER_CLIENT_ID
+    ncp_secret = settings.NAVER_CLIENT_SECRET
+    if not (ncp_id and ncp_secret) or not http_pool.breakers.available(NCP_GEOCODE_URL):
+        return None
+    headers = {
+        "X-NCP-APIGW-API-KEY-ID": ncp_id,
+        "X-NCP-APIGW-API-KEY": ncp_secret,
+    }
+    try:
+        status, data = await http_pool.get_json("ncp", NCP_GEOCODE_URL, headers=headers, params={"query": address})
+    except Exception as e:
+        logger.warning(f"NCP Geocoding fallback failed: {e}")
+        return None
+    addrs = (data or {}).get("addresses", [])
+    if not addrs:
+        return None
+    try:
+        n_lng = float(addrs[0]["x"])
+        n_lat = float(addrs[0]["y"])
+    except (KeyError, ValueError, TypeError):
+        return None
+    return (n_lat, n_lng) if _in_korea(n_lat, n_lng) else None
+
+
 @router.post("/search")
 async def search_place(payload: dict):
     """
@@ -172,9 +480,10 @@ async def search_place(payload: dict):
         return {"error": "query is required", "places": []}
 
     full_query = f"{query} {region}" if region else query
+    key = _search_key(full_query, region)
 
     # 캐시 확인
-    cached = _get_cached(full_query)
+    cached = await _cache_call(_get_cached, key)
     if cached:
         logger.info(f"Cache hit: {full_query}")
         return cached
@@ -183,203 +492,368 @@ async def search_place(payload: dict):
     if not api_key:
         return {"error": "GOOGLE_MAPS_KEY not configured", "places": []}
 
-    # API keys
-    naver_search_id = settings.NAVER_SEARCH_CLIENT_ID
-    naver_search_secret = settings.NAVER_SEARCH_CLIENT_SECRET
-    ncp_id = settings.NAVER_CLIENT_ID
-    ncp_secret = settings.NAVER_CLIENT_SECRET
+    # 동시에 들어온 같은 쿼리(캐시 키 기준)는 업스트림 조회 + 검증을 한 번만 수행하고 결과를 공유
+    return await _search_flight.do(key, lambda: _search_uncached(full_query, region, api_key))
 
-    # Prepare Tasks
-    google_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    google_params = {
-        "query": full_query,
-        "key": api_key,
-        "language": "ko",
-        "region": "kr",
-    }
 
-    # 1차: Naver Search Local API (장소명 검색에 최적)
-    naver_search_url = "https://openapi.naver.com/v1/search/local.json"
-    naver_search_headers = {
-        "X-Naver-Client-Id": naver_search_id,
-        "X-Naver-Client-Secret": naver_search_secret,
-    }
-    naver_search_params = {"query": full_query, "display": 1}
-    use_naver_search = bool(naver_search_id and naver_search_secret)
+def _search_deadline() -> Deadline:
+    """검색 1회 예산: 업스트림 단계마다 호출 1회에 쓸 수 있는 몫을 나눔 (CPU 단계는 남은 예산 안에서)"""
+    return Deadline(settings.SEARCH_DEADLINE_S, shares={
+        "google": settings.SEARCH_SHARE_GOOGLE,
+        "naver": settings.SEARCH_SHARE_NAVER,
+        "ncp": settings.SEARCH_SHARE_NCP,
+    })
+
+
+async def _search_uncached(full_query: str, region: Optional[str], api_key: str) -> dict:
+    """Google/Naver 조회 → 폴백 → 장소별 검증 → 캐시 저장 (single-flight 1회 실행 단위)"""
+    with deadline_scope(_search_deadline()) as deadline:
+        response = await _search_within_deadline(full_query, region, api_key)
+    if "error" in response:
+        return response
+    # 예산 사용 내역은 이번 실행의 값이므로 캐시에는 넣지 않음
+    return {**response, "meta": {**response["meta"], "budget": deadline.report()}}
 
+
+async def _search_within_deadline(full_query: str, region: Optional[str], api_key: str) -> dict:
+    naver_task = None
+    # 차단기가 열린 업스트림은 호출하지 않고 바로 CSV 데이터셋 폴백 (결과는 캐시하지 않음)
+    degraded = _open_upstreams()
     try:
-        import asyncio
-        async with aiohttp.ClientSession() as session:
-            g_task = session.get(google_url, params=google_params)
-
-            if use_naver_search:
-                n_task = session.get(
-                    naver_search_url,
-                    headers=naver_search_headers,
-                    params=naver_search_params,
-                )
-                g_resp, n_resp = await asyncio.gather(g_task, n_task)
-            else:
-                g_resp = await g_task
-                n_resp = None
-
-            if g_resp.status != 200:
-                return {"error": f"Google API error: {g_resp.status}", "places": []}
-            data = await g_resp.json()
-
-            naver_search_data = None
-            if n_resp and n_resp.status == 200:
-                naver_search_data = await n_resp.json()
-
-        results = data.get("results", [])
-        places = []
-
-        # 1차: Naver Search Local API 결과 파싱
-        n_lat, n_lng = None, None
-        naver_item = None
-        if naver_search_data:
-            items = naver_search_data.get("items", [])
-            if items:
-                naver_item = items[0]
-                try:
-                    raw_x = int(naver_item.get("mapx", 0))
-                    raw_y = int(naver_item.get("mapy", 0))
-                    if raw_x and raw_y:
-                        n_lng = raw_x / 10_000_000.0
-                        n_lat = raw_y / 10_000_000.0
-                        if not (33.0 <= n_lat <= 43.0 and 124.0 <= n_lng <= 132.0):
-                            n_lat, n_lng = None, None
-                except (ValueError, TypeError):
-                    pass
-
-        # CSV 폴백: Naver API 실패 시 데이터셋에서 매칭
-        if naver_item is None:
-            csv_row = _find_in_dataset(full_query)
-            if csv_row:
-                naver_item, n_lat, n_lng = _csv_row_to_naver(csv_row)
-                logger.info(f"CSV fallback (query): matched '{csv_row.get('n_name')}' for '{full_query}'")
-
-        # 2차 폴백: NCP Geocoding (Naver Search 실패 시, formatted_address로 재시도)
-        if n_lat is None and ncp_id and ncp_secret and results:
-            address_str = results[0].get("formatted_address", "")
-            if address_str:
-                ncp_url = "https://naveropenapi.apigw.ntruss.com/map-geocode/v2/geocode"
-                ncp_headers = {
-                    "X-NCP-APIGW-API-KEY-ID": ncp_id,
-                    "X-NCP-APIGW-API-KEY": ncp_secret,
-                }
-                try:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(
-                            ncp_url,
-                            headers=ncp_headers,
-                            params={"query": address_str},
-                        ) as ncp_resp:
-                            if ncp_resp.status == 200:
-                                ncp_data = await ncp_resp.json()
-                                addrs = ncp_data.get("addresses", [])
-                                if addrs:
-                                    n_lng = float(addrs[0]["x"])
-                                    n_lat = float(addrs[0]["y"])
-                                    if not (33.0 <= n_lat <= 43.0 and 124.0 <= n_lng <= 132.0):
-                                        n_lat, n_lng = None, None
-                except Exception as e:
-                    logger.warning(f"NCP Geocoding fallback failed: {e}")
-
-        for place in results[:5]:  # 상위 5건만
-            geo = place.get("geometry", {}).get("location", {})
-            g_lat = geo.get("lat", 0)
-            g_lng = geo.get("lng", 0)
-            place_name = place.get("name", "")
-
-            # 개별 CSV 매칭: 각 Google 결과마다 자기에 맞는 Naver 데이터
-            p_naver_item, p_n_lat, p_n_lng = naver_item, n_lat, n_lng
-            csv_row = _find_in_dataset(place_name)
-            if csv_row:
-                p_naver_item, p_n_lat, p_n_lng = _csv_row_to_naver(csv_row)
-                logger.info(f"CSV fallback (place): matched '{csv_row.get('n_name')}' for '{place_name}'")
-
-            # Naver 메타데이터 추출 (개별)
-            p_naver_name = None
-            p_naver_category = None
-            p_naver_phone = None
-            p_naver_link = None
-            if p_naver_item:
-                p_naver_name = _strip_html(p_naver_item.get("title", "")) or None
-                p_naver_category = p_naver_item.get("category") or None
-                p_naver_phone = p_naver_item.get("telephone") or None
-                p_naver_link = p_naver_item.get("link") or None
-
-            # ML 보정 (보조 지표)
-            correction = predict_offset(g_lat, g_lng)
-
-            # 보정 거리 계산
-            dist_m = haversine_m(g_lat, g_lng, correction["corrected_lat"], correction["corrected_lng"])
-
-            # Sync 거리 및 점수 계산 (Naver 좌표가 있을 경우)
-            sync_score = None
-            naver_location = None
-            if p_n_lat is not None and p_n_lng is not None:
-                naver_location = {"lat": p_n_lat, "lng": p_n_lng}
-                sync_dist_m = haversine_m(correction["corrected_lat"], correction["corrected_lng"], p_n_lat, p_n_lng)
-                sync_score = max(0, 100 - sync_dist_m)
-
-            # POI 생존 판정
-            status, status_confidence, status_reason = classify_poi_status(
-                place_name, g_lat, g_lng,
-                p_naver_item, p_n_lat, p_n_lng,
-            )
+        # 1차: Google Text Search + Naver Search Local API 동시 호출 (공유 연결 풀)
+        naver_task = asyncio.ensure_future(_naver_local_search(full_query))
+        g_status, data = await _google_places(full_query, api_key, degraded)
+        if g_status != 200:
+            return {"error": f"Google API error: {g_status}", "places": []}
+
+        results = data.get("results", [])[:5]  # 상위 5건만
+        (naver_item, n_lat, n_lng, source), place_items = await asyncio.gather(
+            _resolve_query_naver(full_query, results, naver_task),
+            _verify_places_naver(results, region),
+        )
 
-            # 이름 유사도
-            sim = None
-            if p_naver_name:
-                sim = round(name_similarity(place_name, p_naver_name), 2)
-
-            places.append({
-                # 기존 필드 유지
-                "name": place_name,
-                "address": place.get("formatted_address", ""),
-                "place_id": place.get("place_id", ""),
-                "types": place.get("types", []),
-                "rating": place.get("rating"),
-                "original": {"lat": g_lat, "lng": g_lng},
-                "corrected": {
-                    "lat": correction["corrected_lat"],
-                    "lng": correction["corrected_lng"],
-                },
-                "naver_location": naver_location,
-                "sync_score": round(sync_score, 1) if sync_score is not None else None,
-                "correction_distance_m": round(dist_m, 1),
-                "confidence": correction["confidence"],
-                "method": correction["method"],
-                # 새 필드: POI 생존 검증
-                "status": status,
-                "status_reason": status_reason,
-                "status_confidence": status_confidence,
-                "naver_name": p_naver_name,
-                "naver_category": p_naver_category,
-                "naver_phone": p_naver_phone,
-                "naver_link": p_naver_link,
-                "name_similarity": sim,
-            })
-
-        response = {"places": places, "query": full_query, "total": len(places)}
-        _set_cache(full_query, response)
+        # CPU 단계(퍼지 매칭, ML 보정, 판정)는 이벤트 루프 밖 실행기에서 처리
+        with budget_stage("place_verify"):
+            places = list(await asyncio.gather(*[
+                cpu_executor.run("place_verify", _build_place_result, place, naver_item, n_lat, n_lng, place_item)
+                for place, place_item in zip(results, place_items)
+            ]))
+
+        meta = {"query_match_source": source}
+        if degraded:
+            meta["degraded"] = degraded
+        response = {
+            "places": places,
+            "query": full_query,
+            "total": len(places),
+            "meta": meta,
+        }
+        if not degraded:
+            await _cache_call(_set_cache, _search_key(full_query, region), response)
         return response
 
     except Exception as e:
         logger.error(f"Search error: {e}")
         return {"error": str(e), "places": []}
+    finally:
+        if naver_task is not None and not naver_task.done():
+            naver_task.cancel()
+
+
+# 쿼리 단위 Naver 좌표 출처 우선순위 (높은 순)
+QUERY_MATCH_SOURCES = ("naver", "csv", "ncp")
+
+
+async def _resolve_query_naver(
+    full_query: str,
+    results: List[dict],
+    naver_task: "asyncio.Future",
+) -> Tuple[Optional[dict], Optional[float], Optional[float], Optional[str]]:
+    """
+    쿼리 단위 Naver 결과: Naver Search / CSV 데이터셋을 동시에 실행하고, 둘 다 좌표가 없을 때만 NCP Geocoding
+
+    우선순위(naver > csv > ncp) 순으로 결과를 확인하여 국내 좌표가 유효한 첫 출처를 채택하고
+    아직 끝나지 않은 하위 출처는 취소합니다. NCP는 호출마다 일일 한도를 쓰고, 취소해도
+    이미 보낸 요청(같은 주소를 기다리는 다른 검색과 공유)은 되돌릴 수 없으므로 미리 시작하지 않습니다.
+
+    Returns:
+        (naver_item, n_lat, n_lng, source) — source는 채택된 출처 이름, 없으면 None
+        NCP가 채택되면 좌표만 NCP 값이고 item은 상위 출처의 item (있으면)
+    """
+    async def from_naver():
+        item = await naver_task
+        return (item, *_naver_item_coords(item)) if item is not None else (None, None, None)
+
+    async def from_csv():
+        with budget_stage("dataset_match"):
+            row = await cpu_executor.run("dataset_match", _find_in_dataset, full_query)
+        return _csv_row_to_naver(row) if row else (None, None, None)
+
+    async def from_ncp(address: str):
+        coords = await _ncp_geocode(address)
+        return (None, *coords) if coords is not None else (None, None, None)
+
+    tasks = [("naver", asyncio.ensure_future(from_naver())), ("csv", asyncio.ensure_future(from_csv()))]
+    fallback_item = None
+    try:
+        for source, task in tasks:
+            try:
+                item, n_lat, n_lng = await task
+            except Exception as e:
+                logger.warning(f"Query match source '{source}' failed: {e}")
+                continue
+            if n_lat is not None:
+                if source == "csv":
+                    logger.info(f"CSV fallback (query): matched '{item.get('title')}' for '{full_query}'")
+                return item or fallback_item, n_lat, n_lng, source
+            fallback_item = fallback_item or item
+
+        address = results[0].get("formatted_address", "") if results else ""
+        if address:
+            try:
+                _, n_lat, n_lng = await from_ncp(address)
+            except Exception as e:
+                logger.warning(f"Query match source 'ncp' failed: {e}")
+                n_lat = n_lng = None
+            if n_lat is not None:
+                return fallback_item, n_lat, n_lng, "ncp"
+        return fallback_item, None, None, None
+    finally:
+        for _, task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def _start_places_naver(results: List[dict], region: Optional[str]) -> List["asyncio.Future"]:
+    """
+    Google 결과마다 자기 이름(+지역)으로 Naver Search 조회를 동시에 시작
+
+    동시 요청 수는 NAVER_VERIFY_CONCURRENCY로 제한하고, 모든 조회가 공통 마감 시각
+    (시작 + NAVER_VERIFY_DEADLINE_S, 요청 예산이 더 짧으면 그 남은 시간)을 넘기면
+    취소되어 None이 됩니다 (이후 CSV/쿼리 단위 폴백 사용).
+    장소마다 Future를 돌려주므로 스트리밍 경로는 끝난 장소부터 판정할 수 있습니다.
+    """
+    loop = asyncio.get_running_loop()
+    if not (settings.NAVER_SEARCH_CLIENT_ID and settings.NAVER_SEARCH_CLIENT_SECRET):
+        done = []
+        for _ in results:
+            fut = loop.create_future()
+            fut.set_result(None)
+            done.append(fut)
+        return done
+
+    sem = asyncio.Semaphore(settings.NAVER_VERIFY_CONCURRENCY)
+    budget = current_deadline()
+    window = settings.NAVER_VERIFY_DEADLINE_S
+    if budget is not None:
+        window = min(window, budget.remaining())
+    deadline = loop.time() + window
+
+    async def verify(place: dict) -> Optional[dict]:
+        name = place.get("name", "")
+        if not name:
+            return None
+        try:
+            async with asyncio.timeout_at(deadline):
+                async with sem:
+                    return await _naver_local_search(f"{name} {region}" if region else name)
+        except TimeoutError:
+            logger.warning(f"Naver per-place verification timed out: '{name}'")
+            return None
+
+    return [asyncio.ensure_future(verify(place)) for place in results]
+
+
+async def _verify_places_naver(results: List[dict], region: Optional[str]) -> List[Optional[dict]]:
+    """장소별 Naver Search 결과 (순서 = results, 실패/마감 초과는 None)"""
+    return list(await asyncio.gather(*_start_places_naver(results, region)))
+
+
+# ── 스트리밍 검색 (NDJSON / SSE) ──
+
+def _place_preview(place: dict) -> dict:
+    """검증 전 Google 결과 요약 (스트림 첫 이벤트용)"""
+    geo = place.get("geometry", {}).get("location", {})
+    return {
+        "name": place.get("name", ""),
+        "address": place.get("formatted_address", ""),
+        "place_id": place.get("place_id", ""),
+        "types": place.get("types", []),
+        "rating": place.get("rating"),
+        "original": {"lat": geo.get("lat", 0), "lng": geo.get("lng", 0)},
+    }
+
+
+def _place_preview_from_result(place: dict) -> dict:
+    """캐시된 검증 결과 → 같은 요약 형식"""
+    return {k: place.get(k) for k in ("name", "address", "place_id", "types", "rating", "original")}
+
+
+def _format_event(event: dict, fmt: str) -> str:
+    data = json.dumps(event, ensure_ascii=False)
+    if fmt == "sse":
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def _search_events(full_query: str, region: Optional[str] = None) -> AsyncIterator[dict]:
+    """
+    검색 진행 이벤트
+
+    places  : Google 결과 (원본 좌표) — Naver/폴백을 기다리지 않고 먼저
+    place   : 장소별 판정 + ML 보정 결과 (완료 순서대로, index로 위치 표시)
+    summary : 전체 건수/소요 시간 (JSON 엔드포인트와 같은 응답을 캐시에 저장)
+    error   : 실패 시 (이후 이벤트 없음)
+    """
+    start = time.perf_counter()
+
+    def summary(total: int, cached: bool, meta: Optional[dict] = None) -> dict:
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        return {"event": "summary", "query": full_query, "total": total, "cached": cached,
+                "elapsed_ms": elapsed_ms, "meta": meta or {}}
+
+    cached = await _cache_call(_get_cached, _search_key(full_query, region))
+    if cached and "error" not in cached:
+        places = cached.get("places", [])
+        yield {"event": "places", "query": full_query, "places": [_place_preview_from_result(p) for p in places]}
+        for i, place in enumerate(places):
+            yield {"event": "place", "index": i, "place": place}
+        yield summary(len(places), cached=True, meta=cached.get("meta"))
+        return
+
+    api_key = settings.GOOGLE_MAPS_KEY
+    if not api_key:
+        yield {"event": "error", "error": "GOOGLE_MAPS_KEY not configured"}
+        return
+
+    # async generator 안에서는 contextvar를 직접 바꾸지 않고, 예산이 설정된 컨텍스트에서 Task를 만듦
+    deadline = _search_deadline()
+    ctx = deadline_context(deadline)
+    degraded = _open_upstreams()
+    naver_task = ctx.run(asyncio.ensure_future, _naver_local_search(full_query))
+    pending: List[asyncio.Future] = []
+    try:
+        google_task = ctx.run(asyncio.ensure_future, _google_places(full_query, api_key, degraded))
+        pending.append(google_task)
+        g_status, data = await google_task
+        if g_status != 200:
+            yield {"event": "error", "error": f"Google API error: {g_status}"}
+            return
+        results = data.get("results", [])[:5]
+        yield {"event": "places", "query": full_query, "places": [_place_preview(p) for p in results]}
+
+        query_naver = ctx.run(asyncio.ensure_future, _resolve_query_naver(full_query, results, naver_task))
+        place_naver = ctx.run(_start_places_naver, results, region)
+
+        async def verify(i: int, place: dict) -> Tuple[int, dict]:
+            place_item = await place_naver[i]
+            if place_item is not None and _naver_item_coords(place_item)[0] is not None:
+                naver_item, n_lat, n_lng = None, None, None   # 자기 결과가 있으면 쿼리 단위 폴백 불필요
+            else:
+                naver_item, n_lat, n_lng, _ = await asyncio.shield(query_naver)
+            with budget_stage("place_verify"):
+                return i, await cpu_executor.run(
+                    "place_verify", _build_place_result, place, naver_item, n_lat, n_lng, place_item,
+                )
+
+        verifiers = [ctx.run(asyncio.ensure_future, verify(i, p)) for i, p in enumerate(results)]
+        pending += [query_naver, *place_naver, *verifiers]
+        places: List[Optional[dict]] = [None] * len(results)
+        for next_done in asyncio.as_completed(verifiers):
+            i, place = await next_done
+            places[i] = place
+            yield {"event": "place", "index": i, "place": place}
+
+        # 모든 장소가 자기 결과를 가져 쿼리 단위 결과를 기다리지 않았어도 출처는 기록
+        meta = {"query_match_source": (await asyncio.shield(query_naver))[3]}
+        if degraded:
+            meta["degraded"] = degraded
+        response = {"places": places, "query": full_query, "total": len(places), "meta": meta}
+        if not degraded:
+            await _cache_call(_set_cache, _search_key(full_query, region), response)
+        yield summary(len(places), cached=False, meta={**meta, "budget": deadline.report()})
+
+    except Exception as e:
+        logger.error(f"Search stream error: {e}")
+        yield {"event": "error", "error": str(e)}
+    finally:
+        # 클라이언트가 연결을 끊으면 남은 작업 정리
+        for task in [naver_task, *pending]:
+            if not task.done():
+                task.cancel()
+
+
+def _stream_response(query: str, region: Optional[str], fmt: Optional[str], accept: str):
+    if fmt is None:
+        fmt = "sse" if "text/event-stream" in accept else "ndjson"
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+
+    async def body():
+        if not query:
+            yield _format_event({"event": "error", "error": "query is required"}, fmt)
+            return
+        full_query = f"{query} {region}" if region else query
+        async for event in _search_events(full_query, region):
+            yield _format_event(event, fmt)
+
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/search/stream")
+async def search_place_stream(payload: dict, request: Request, format: Optional[str] = Query(None)):
+    """
+    /search 스트리밍 버전 — Google 결과를 먼저 보내고 장소별 판정을 완료 순서대로 전송
+
+    Request: { "query": "하이라인 카페", "region": "성수동" }
+    형식: ?format=ndjson|sse (생략 시 Accept: text/event-stream이면 SSE, 아니면 NDJSON)
+    """
+    return _stream_response(
+        payload.get("query", ""), payload.get("region", "성수동"), format, request.headers.get("accept", ""),
+    )
+
+
+@router.get("/search/stream")
+async def search_place_stream_get(
+    request: Request,
+    query: str = Query(""),
+    region: str = Query("성수동"),
+    format: Optional[str] = Query(None),
+):
+    """EventSource(GET 전용) 클라이언트용 스트리밍 검색"""
+    return _stream_response(query, region, format, request.headers.get("accept", ""))
+
+
+@router.get("/search/cache-stats")
+async def search_cache_stats():
+    """검색 결과 캐시 적중/미스/제거/크기 통계 + 동일 요청 합치기 통계"""
+    stats = await _cache_call(_search_cache.stats)
+    stats["singleflight"] = {f.name: f.stats() for f in (_search_flight, _autocomplete_flight, _geocode_flight)}
+    stats["autocomplete_index"] = _autocomplete_index.stats()
+    stats["dataset"] = _dataset.stats()
+    return stats
 
 
 @router.get("/search/autocomplete")
 async def autocomplete(q: str = Query("", min_length=1)):
-    """Google Places Autocomplete"""
+    """
+    로컬 접두사 색인(engine/autocomplete.py) 우선, 결과가 모자랄 때만 Google Places Autocomplete
+
+    source: local(색인만) / google(색인 결과 없음) / mixed
+    """
+    limit = settings.AUTOCOMPLETE_LIMIT
+    local = _autocomplete_index.search(q, limit=limit)
     api_key = settings.GOOGLE_MAPS_KEY
-    if not api_key or not q:
-        return {"predictions": []}
+    if len(local) >= settings.AUTOCOMPLETE_MIN_LOCAL or not api_key or not q:
+        return {"predictions": local, "source": "local"}
+
+    remote = await _autocomplete_flight.do(normalize_query(q), lambda: _autocomplete_uncached(q, api_key))
+    google = remote.get("predictions", [])
+    seen = {prefix_key(p["main_text"]) for p in local}
+    merged = local + [p for p in google if prefix_key(p["main_text"]) not in seen][: limit - len(local)]
+    return {"predictions": merged, "source": "mixed" if local else "google"}
+
 
-    url = "https://maps.googleapis.com/maps/api/place/autocomplete/json"
+async def _autocomplete_uncached(q: str, api_key: str) -> dict:
     params = {
         "input": q,
         "key": api_key,
@@ -389,11 +863,9 @@ async def autocomplete(q: str = Query("", min_length=1)):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as resp:
-                if resp.status != 200:
-                    return {"predictions": []}
-                data = await resp.json()
+        status, data = await http_pool.get_json("google", GOOGLE_AUTOCOMPLETE_URL, params=params)
+        if status != 200:
+            return {"predictions": []}
 
         predictions = [
             {
@@ -403,6 +875,7 @@ async def autocomplete(q: str = Query("", min_length=1)):
             }
             for p in data.get("predictions", [])[:5]
         ]
+        _autocomplete_index.remember(predictions)   # 다음 입력부터 로컬 색인으로 응답
         return {"predictions": predictions}
 
     except Exception as e:
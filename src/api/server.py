@@ -1,7 +1,9 @@
+import asyncio
 import json
 import logging
 import os
 import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Body
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -11,7 +13,9 @@ import google.generativeai as genai
 from engine.transform import run_transformation_pipeline
 from engine.ai import execute_gemini_correction_loop
 from engine.metrics import calculate_rmse, calculate_harness_score
+from engine.inference import start_model_watcher
 from shared.config import settings
+from shared.http import http_pool
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -37,7 +41,21 @@ def _get_gemini_model():
         _gemini_model = None
     return _gemini_model
 
-app = FastAPI(title="GeoHarness Spatial-Sync API MVP v4.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # decoder.pkl 선로드 + 백그라운드 감시 시작 (첫 요청이 모델 로드를 기다리지 않도록)
+    start_model_watcher()
+    # 업스트림 공유 연결 풀 (요청마다 TCP/TLS 핸드셰이크·DNS 조회 반복 방지)
+    await http_pool.start()
+    # ml_dataset.csv를 파싱해 읽었으면 바이너리 캐시 기록 (다음 시작부터 캐시 로드)
+    await asyncio.to_thread(write_dataset_cache)
+    yield
+    await http_pool.close()
+    cpu_executor.shutdown()
+    _search_cache.close()
+
+
+app = FastAPI(title="GeoHarness Spatial-Sync API MVP v4.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -48,13 +66,18 @@ app.add_middleware(
 )
 
 # ML offset correction router
+from api.executor import cpu_executor
 from api.local_verifier import router as verifier_router
 app.include_router(verifier_router)
 
 # Place search + ML correction router
-from api.search import router as search_router
+from api.search import router as search_router, _search_cache, write_dataset_cache
 app.include_router(search_router)
 
+# Bulk POI verification router (NDJSON stream)
+from api.batch_verify import router as batch_verify_router
+app.include_router(batch_verify_router)
+
 logger = logging.getLogger("api")
 
 # Load VWorld Anchors Data once
@@ -85,7 +108,15 @@ if os.path.isdir(_static_dir):
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "version": "4.0"}
+    breakers = http_pool.breakers.stats()
+    return {
+        "status": "degraded" if any(b["state"] != "closed" for b in breakers.values()) else "ok",
+        "version": "4.0",
+        "executor": cpu_executor.stats(),
+        "http_pool": http_pool.stats(),
+        "breakers": breakers,
+        "quota": http_pool.quotas.stats() if http_pool.quotas is not None else {},
+    }
 
 @app.get("/naver-test")
 def naver_map_test():
@@ -0,0 +1,70 @@
+"""
+GeoHarness: Single-Flight Request Coalescing
+
+같은 키의 요청이 동시에 여러 개 들어오면 첫 요청만 실제 작업(업스트림 호출 + 검증)을
+실행하고, 나머지는 그 결과를 함께 기다립니다. 인기 쿼리가 캐시에 들어가기 전
+몇 초 동안 같은 Google/Naver 호출이 수십 번 나가는 것을 막습니다.
+
+- 작업은 별도 Task로 실행되므로 먼저 온 호출자가 연결을 끊어도(취소) 나머지는 결과를 받음
+- 작업이 끝나면 키를 즉시 해제 (결과 보관은 캐시의 역할)
+- 예외도 대기 중인 모든 호출자에게 그대로 전달
+
+사용법:
+    from api.singleflight import SingleFlight
+
+    _search_flight = SingleFlight("search")
+    response = await _search_flight.do(_search_key(full_query, region), lambda: _search_uncached(...))
+"""
+
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+def normalize_query(text: str) -> str:
+    """단일 비행 키: 공백 정리 + 소문자 ("하이라인  카페 " == "하이라인 카페")"""
+    return " ".join(text.split()).lower()
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        # asyncio.Future는 이벤트 루프에 묶이므로 루프별로 진행 중 작업 관리
+        self._inflight: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def _tasks(self) -> Dict[Hashable, asyncio.Task]:
+        loop = asyncio.get_running_loop()
+        tasks = self._inflight.get(loop)
+        if tasks is None:
+            tasks = self._inflight[loop] = {}
+        return tasks
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """key로 진행 중인 작업이 있으면 그 결과를, 없으면 fn()을 실행한 결과를 반환"""
+        self.calls += 1
+        tasks = self._tasks()
+        task = tasks.get(key)
+        if task is None:
+            self.executions += 1
+            task = tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t, key=key: self._release(tasks, key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _release(tasks: Dict[Hashable, asyncio.Task], key: Hashable, task: asyncio.Task):
+        if tasks.get(key) is task:
+            del tasks[key]
+        if not task.cancelled():
+            task.exception()  # 모든 호출자가 취소된 경우 "never retrieved" 경고 방지
+
+    def stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
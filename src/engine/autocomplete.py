@@ -0,0 +1,162 @@
+"""
+GeoHarness: Local Autocomplete Prefix Index
+
+알려진 POI 이름(ml_dataset.csv, google_poi_base.csv)과 최근 Google 자동완성 결과로
+메모리 접두사 색인을 만들어 /search/autocomplete가 Google 왕복 없이 답하도록 합니다.
+
+- 한글은 자모 단위로 분해하여 비교 ("항" → ㅎㅏㅇ 이므로 "하이라인"(ㅎㅏㅇㅣㄹㅏㅇㅣㄴ)과 일치)
+  겹받침/이중모음도 입력 순서대로 나눔 (ㄺ → ㄹㄱ, ㅘ → ㅗㅏ) → 조합 중인 음절도 접두사로 일치
+- 이름 전체와 각 단어 시작 위치부터의 접미사를 키로 색인 ("Highline seongsu (하이라인)" → "하이"로 검색)
+- 키 정렬 배열 + 이분 탐색 (trie를 평탄화한 형태): 질의당 O(log N + 결과 수)
+- 정렬: 이름 시작 일치 > 단어 시작 일치, 그다음 출처 순서(데이터셋 > 최근 Google), 짧은 이름
+
+사용법:
+    index = AutocompleteIndex()
+    index.add_many([{"main_text": "하이라인", "description": "하이라인, 서울 성동구 ...", "place_id": "local:0"}])
+    index.search("항")   # → [{"main_text": "하이라인", ...}]
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+         "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 두 번 입력하는 겹자모 → 입력 순서
+_COMPOUND = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+_HANGUL_BASE = 0xAC00
+
+
+def _build_jamo_table() -> Dict[int, str]:
+    table = {ord(k): v for k, v in _COMPOUND.items()}
+    for code in range(_HANGUL_BASE, _HANGUL_BASE + 11172):
+        offset = code - _HANGUL_BASE
+        cho, rest = divmod(offset, 21 * 28)
+        jung, jong = divmod(rest, 28)
+        table[code] = "".join(_COMPOUND.get(j, j) for j in (_CHO[cho], _JUNG[jung], _JONG[jong]))
+    return table
+
+
+_JAMO_TABLE = _build_jamo_table()
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def decompose_hangul(text: str) -> str:
+    """한글 음절/겹자모를 입력 순서의 호환 자모로 분해 (그 외 문자는 그대로)"""
+    return text.translate(_JAMO_TABLE)
+
+
+def prefix_key(text: str) -> str:
+    """비교 키: NFC → 소문자 → 공백·기호 제거 → 자모 분해"""
+    text = unicodedata.normalize("NFC", text or "").lower()
+    return decompose_hangul(_NON_WORD.sub("", text))
+
+
+def _word_keys(name: str) -> List[str]:
+    """이름 전체 키 + 각 단어 시작부터의 접미사 키 (첫 번째가 이름 전체)"""
+    words = [w for w in _NON_WORD.split(unicodedata.normalize("NFC", name or "").lower()) if w]
+    keys = []
+    for i in range(len(words)):
+        key = decompose_hangul("".join(words[i:]))
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+class AutocompleteIndex:
+    def __init__(self, max_recent: int = 5000):
+        """
+        Args:
+            max_recent: 기억할 최근 Google 예측 수 (초과 시 오래 쓰이지 않은 것부터 제거)
+        """
+        self.max_recent = max_recent
+        self._keys: List[Tuple[str, int, int]] = []   # (키, 단어 위치 0=이름 시작, 항목 번호)
+        self._entries: Dict[int, dict] = {}
+        self._by_name: Dict[str, int] = {}             # 이름 키 → 항목 번호 (중복 방지)
+        self._recent: "OrderedDict[int, None]" = OrderedDict()
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _insert(self, entry: dict, rank: int, sorted_insert: bool) -> Optional[int]:
+        name_key = prefix_key(entry.get("main_text", ""))
+        if not name_key or name_key in self._by_name:
+            return None
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = {**entry, "_rank": rank}
+        self._by_name[name_key] = entry_id
+        for pos, key in enumerate(_word_keys(entry["main_text"])):
+            item = (key, pos, entry_id)
+            if sorted_insert:
+                insort(self._keys, item)
+            else:
+                self._keys.append(item)
+        return entry_id
+
+    def add_many(self, entries: Iterable[dict], rank: int = 0):
+        """정적 항목 일괄 추가 (이름이 같은 항목은 먼저 들어온 것 유지)"""
+        for entry in entries:
+            self._insert(entry, rank, sorted_insert=False)
+        self._keys.sort()
+
+    def remember(self, predictions: Iterable[dict], rank: int = 1):
+        """Google 예측을 최근 항목으로 추가 (이미 있는 이름은 최근 사용으로만 갱신)"""
+        for prediction in predictions:
+            name_key = prefix_key(prediction.get("main_text", ""))
+            existing = self._by_name.get(name_key)
+            if existing is not None:
+                if existing in self._recent:
+                    self._recent.move_to_end(existing)
+                continue
+            entry_id = self._insert(prediction, rank, sorted_insert=True)
+            if entry_id is None:
+                continue
+            self._recent[entry_id] = None
+            while len(self._recent) > self.max_recent:
+                self._remove(self._recent.popitem(last=False)[0])
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        self._by_name.pop(prefix_key(entry.get("main_text", "")), None)
+        for pos, key in enumerate(_word_keys(entry["main_text"])):
+            i = bisect_left(self._keys, (key, pos, entry_id))
+            if i < len(self._keys) and self._keys[i] == (key, pos, entry_id):
+                del self._keys[i]
+
+    def search(self, query: str, limit: int = 5, scan: int = 256) -> List[dict]:
+        """
+        접두사가 일치하는 항목 (최대 limit개)
+
+        scan: 순위를 매길 최대 후보 키 수 (짧은 질의가 색인 대부분과 일치해도 상한 유지)
+        """
+        q = prefix_key(query)
+        if not q:
+            return []
+        best: Dict[int, Tuple[int, int, int]] = {}
+        i = bisect_left(self._keys, (q, -1, -1))
+        end = min(len(self._keys), i + scan)
+        while i < end and self._keys[i][0].startswith(q):
+            _, pos, entry_id = self._keys[i]
+            entry = self._entries[entry_id]
+            rank = (0 if pos == 0 else 1, entry["_rank"], len(entry["main_text"]))
+            if entry_id not in best or rank < best[entry_id]:
+                best[entry_id] = rank
+            i += 1
+        ordered = sorted(best, key=lambda e: (best[e], e))[:limit]
+        for entry_id in ordered:
+            if entry_id in self._recent:
+                self._recent.move_to_end(entry_id)
+        return [{k: v for k, v in self._entries[e].items() if k != "_rank"} for e in ordered]
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._entries), "keys": len(self._keys), "recent": len(self._recent)}
@@ -0,0 +1,231 @@
+"""
+GeoHarness: Compiled Tree Ensemble Evaluator
+
+decoder.pkl의 model_x / model_y (VotingRegressor(RF + HistGB))를
+연속된 NumPy 노드 배열(feature, threshold, left, right, value)로 평탄화하고,
+두 모델의 모든 트리를 한 번의 순회로 평가합니다.
+
+sklearn 단건 predict는 입력 검증 + joblib 스레드 디스패치 때문에
+호출당 수 ms가 걸리지만, 평탄화된 배열은 트리 깊이만큼의
+벡터 연산으로 끝납니다.
+
+sklearn과의 비트 단위 호환:
+    - RF 트리는 sklearn과 같이 입력을 float32로 캐스팅한 뒤 비교
+    - HistGB 트리는 float64 입력 그대로 비교 (NaN → missing_go_to_left)
+    - 트리 합산은 sklearn과 같은 순서의 순차 누적 (np.cumsum)
+      * RF n_jobs > 1 은 sklearn 자체의 누적 순서가 스레드마다 달라질 수 있음
+    - VotingRegressor 평균은 np.average 그대로 사용
+
+사용법:
+    from engine.compiled import CompiledEnsemble
+
+    compiled = CompiledEnsemble.from_models(bundle["model_x"], bundle["model_y"])
+    delta_x, delta_y = compiled.predict(X)
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+_LEAF = -1
+_CHUNK_ROWS = 256
+
+
+class _TreeBuilder:
+    """트리들을 전역 노드 배열에 이어 붙이는 헬퍼"""
+
+    def __init__(self):
+        self.feature: List[np.ndarray] = []
+        self.threshold: List[np.ndarray] = []
+        self.left: List[np.ndarray] = []
+        self.right: List[np.ndarray] = []
+        self.value: List[np.ndarray] = []
+        self.missing_left: List[np.ndarray] = []
+        self.roots: List[int] = []
+        self.float32_input: List[bool] = []
+        self.max_depth = 0
+        self.n_nodes = 0
+
+    def add(self, feature, threshold, left, right, value, missing_left, is_leaf, depth, float32_input):
+        offset = self.n_nodes
+        n = feature.shape[0]
+        local = np.arange(n, dtype=np.int64)
+
+        # 리프는 자기 자신을 가리키게 해서 고정 횟수 순회가 가능하도록 함
+        left = np.where(is_leaf, local, left.astype(np.int64)) + offset
+        right = np.where(is_leaf, local, right.astype(np.int64)) + offset
+        feature = np.where(is_leaf, 0, feature).astype(np.int64)
+        threshold = np.where(is_leaf, np.inf, threshold).astype(np.float64)
+
+        self.feature.append(feature)
+        self.threshold.append(threshold)
+        self.left.append(left)
+        self.right.append(right)
+        self.value.append(np.asarray(value, dtype=np.float64))
+        self.missing_left.append(np.asarray(missing_left, dtype=bool))
+        self.roots.append(offset)
+        self.float32_input.append(float32_input)
+        self.max_depth = max(self.max_depth, int(depth))
+        self.n_nodes += n
+
+    def add_sklearn_tree(self, tree):
+        t = tree.tree_
+        is_leaf = t.children_left == _LEAF
+        missing_left = getattr(t, "missing_go_to_left", np.zeros(t.node_count, dtype=np.uint8))
+        self.add(
+            t.feature, t.threshold, t.children_left, t.children_right,
+            t.value[:, 0, 0], missing_left, is_leaf, t.max_depth, float32_input=True,
+        )
+
+    def add_hist_predictor(self, predictor):
+        nodes = predictor.nodes
+        if nodes["is_categorical"].any():
+            raise ValueError("categorical splits are not supported")
+        self.add(
+            nodes["feature_idx"], nodes["num_threshold"], nodes["left"], nodes["right"],
+            nodes["value"], nodes["missing_go_to_left"], nodes["is_leaf"].astype(bool),
+            nodes["depth"].max(), float32_input=False,
+        )
+
+
+def _is_forest(est) -> bool:
+    return hasattr(est, "estimators_") and all(hasattr(e, "tree_") for e in est.estimators_)
+
+
+def _is_hist_gb(est) -> bool:
+    return hasattr(est, "_predictors") and hasattr(est, "_baseline_prediction")
+
+
+class CompiledEnsemble:
+    """
+    model_x / model_y 트리 전체를 담은 평탄화 노드 배열
+
+    각 모델은 "그룹" 목록으로 표현됩니다:
+        RF 그룹      → 트리 값의 순차 합 / 트리 수
+        HistGB 그룹  → baseline + 트리 값의 순차 합
+        단일 트리    → 트리 값
+    VotingRegressor는 그룹 예측을 np.average로 결합합니다.
+    """
+
+    def __init__(self):
+        self.feature = self.threshold = self.left = self.right = self.value = None
+        self.missing_left = self.roots = self.input_offset = None
+        self.max_depth = 0
+        # 모델별: (voting weights | None, [(kind, tree_start, tree_stop, scalar), ...], is_voting)
+        self.models: List[Tuple] = []
+
+    @classmethod
+    def from_models(cls, *models) -> "CompiledEnsemble":
+        """VotingRegressor / RandomForest / HistGradientBoosting / DecisionTree 모델을 평탄화"""
+        compiled = cls()
+        builder = _TreeBuilder()
+
+        for model in models:
+            is_voting = hasattr(model, "estimators_") and hasattr(model, "_weights_not_none")
+            estimators = model.estimators_ if is_voting else [model]
+            groups = []
+            for est in estimators:
+                start = len(builder.roots)
+                if _is_forest(est):
+                    for tree in est.estimators_:
+                        builder.add_sklearn_tree(tree)
+                    groups.append(("forest", start, len(builder.roots), float(len(est.estimators_))))
+                elif _is_hist_gb(est):
+                    if type(est._loss.link).__name__ != "IdentityLink" or est.n_trees_per_iteration_ != 1:
+                        raise ValueError(f"unsupported HistGradientBoosting loss: {est.loss}")
+                    for predictors in est._predictors:
+                        builder.add_hist_predictor(predictors[0])
+                    baseline = float(np.asarray(est._baseline_prediction).ravel()[0])
+                    groups.append(("hist", start, len(builder.roots), baseline))
+                elif hasattr(est, "tree_"):
+                    builder.add_sklearn_tree(est)
+                    groups.append(("tree", start, len(builder.roots), 0.0))
+                else:
+                    raise ValueError(f"unsupported estimator: {type(est).__name__}")
+            weights = model._weights_not_none if is_voting else None
+            compiled.models.append((weights, groups, is_voting))
+
+        compiled.feature = np.concatenate(builder.feature)
+        compiled.threshold = np.concatenate(builder.threshold)
+        compiled.left = np.concatenate(builder.left)
+        compiled.right = np.concatenate(builder.right)
+        compiled.value = np.concatenate(builder.value)
+        compiled.missing_left = np.concatenate(builder.missing_left)
+        compiled.roots = np.asarray(builder.roots, dtype=np.int64)
+        compiled.input_offset = np.asarray(builder.float32_input, dtype=np.int64)
+        compiled.max_depth = builder.max_depth
+        return compiled
+
+    @property
+    def n_trees(self) -> int:
+        return self.roots.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (
+            self.feature, self.threshold, self.left, self.right,
+            self.value, self.missing_left, self.roots, self.input_offset,
+        ))
+
+    def leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """모든 트리를 동시에 순회하여 리프 값 반환 — shape (n_trees, n_samples)"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_samples = X.shape[0]
+        if n_samples <= _CHUNK_ROWS:
+            return self._leaf_values_chunk(X)
+
+        # 대형 배치는 청크 단위로 순회 (중간 배열을 캐시에 머물게 함)
+        out = np.empty((self.n_trees, n_samples))
+        for start in range(0, n_samples, _CHUNK_ROWS):
+            stop = min(start + _CHUNK_ROWS, n_samples)
+            out[:, start:stop] = self._leaf_values_chunk(X[start:stop])
+        return out
+
+    def _leaf_values_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_samples, n_features = X.shape
+
+        # [float64 입력 | float32로 캐스팅한 입력]을 한 배열에 두고 오프셋으로 선택
+        X_flat = np.concatenate([X.ravel(), X.astype(np.float32).astype(np.float64).ravel()])
+        base = (self.input_offset * X.size)[:, None] + (np.arange(n_samples) * n_features)[None, :]
+        has_nan = bool(np.isnan(X).any())
+
+        node = np.repeat(self.roots[:, None], n_samples, axis=1)
+        for _ in range(self.max_depth):
+            x = X_flat[base + self.feature[node]]
+            go_left = x <= self.threshold[node]
+            if has_nan:
+                go_left = np.where(np.isnan(x), self.missing_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node]
+
+    def predict(self, X: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        모든 모델을 한 번의 순회로 예측
+
+        Returns:
+            모델별 예측 배열 튜플 — from_models(model_x, model_y)면 (delta_x, delta_y)
+        """
+        values = self.leaf_values(X)
+        outputs = []
+        for weights, groups, is_voting in self.models:
+            preds = []
+            for kind, start, stop, scalar in groups:
+                trees = values[start:stop]
+                if kind == "forest":
+                    preds.append(np.cumsum(trees, axis=0)[-1] / scalar)
+                elif kind == "hist":
+                    base = np.full((1, trees.shape[1]), scalar)
+                    preds.append(np.cumsum(np.vstack([base, trees]), axis=0)[-1])
+                else:
+                    preds.append(trees[0])
+            if is_voting:
+                outputs.append(np.average(np.column_stack(preds), axis=1, weights=weights))
+            else:
+                outputs.append(preds[0])
+        return tuple(outputs)
+
+
+def compile_bundle(bundle: dict) -> dict:
+    """decoder 번들에 평탄화된 트리 배열을 추가 (bundle["compiled"])"""
+    bundle["compiled"] = CompiledEnsemble.from_models(bundle["model_x"], bundle["model_y"])
+    return bundle
@@ -0,0 +1,71 @@
+"""
+GeoHarness: Coordinate-Quantized Correction Cache
+
+인기 POI는 여러 검색에서 같은 Google 좌표로 반복 등장하므로
+predict_offset 결과(오프셋)를 LRU로 캐시합니다.
+
+키: (격자에 스냅한 lat, lng, method, 모델 버전)
+값: (delta_x, delta_y, method, confidence, details) — 좌표가 아닌 오프셋을 저장하고
+    호출 시 실제 입력 좌표에 더하므로, 같은 격자 셀의 다른 좌표도 자기 위치 기준으로 보정됩니다.
+
+모델이 교체되면 ModelManager 리스너가 clear()를 호출합니다.
+(버전이 키에 포함되어 있어 교체 직후 경합 중에도 이전 모델 값은 조회되지 않음)
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class CorrectionCache:
+    def __init__(self, max_entries: int = 50_000, grid_deg: float = 1e-6):
+        self.max_entries = max_entries
+        self.grid_deg = grid_deg
+        self._data: "OrderedDict[Hashable, Tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key(self, lat: float, lng: float, method: str, version: Optional[str]) -> Tuple:
+        return (round(lat / self.grid_deg), round(lng / self.grid_deg), method, version)
+
+    def get(self, key: Tuple) -> Optional[Tuple]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: Tuple):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, *_):
+        """전체 무효화 (ModelManager 교체 리스너로도 사용)"""
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "grid_deg": self.grid_deg,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
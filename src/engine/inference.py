@@ -4,94 +4,193 @@ GeoHarness v2.0: ML Inference Engine
 보정 함수: Google WGS84 좌표 → 보정된 좌표 반환
 - decoder.pkl 모델이 있으면 ML 추론으로 오프셋 보정
 - 없으면 PyProj 기본 변환으로 fallback
+- decoder.lattice.npy가 있으면 method="lattice"로 격자 보간 응답 (engine/lattice.py)
+- 모델 파일은 백그라운드 스레드가 감시하여 검증/워밍업 후 원자적으로 교체 (engine/model_manager.py)
+- 트리 앙상블은 로드 시 NumPy 노드 배열로 평탄화되어 (engine/compiled.py)
+  model_x / model_y를 한 번의 순회로 평가합니다
 
 사용법:
     from engine.inference import predict_offset
 
     result = predict_offset(37.5442, 127.0499)
     # → { "corrected_lat": ..., "corrected_lng": ..., "method": "ml", "confidence": 0.95 }
+
+    # 대량 보정 (NumPy 배열, 모델 호출 1회)
+    batch = predict_offset_batch(lats, lngs)
 """
 
 import logging
-import math
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Optional
+
+from engine.compiled import compile_bundle
+from engine.correction_cache import CorrectionCache
+from engine.lattice import OffsetLattice, lattice_paths
+from engine.model_manager import ModelManager, validate_bundle
+from engine.spatial import AnchorIndex
+from shared.config import settings
 
 logger = logging.getLogger("Inference")
 
-# 모델 캐시 + 핫리로드 (파일 수정 시 자동 갱신)
-_model_cache: Optional[Dict] = None
-_model_mtime: float = 0.0
 _MODEL_PATH = "src/models/decoder.pkl"
+_MODEL_POLL_INTERVAL = 5.0   # 백그라운드 감시 주기 (초)
+_COMPILED_MAX_ROWS = 256  # 이보다 큰 배치는 sklearn predict (benchmark_decoder.py 기준)
+_WARMUP_POINT = (37.5442, 127.0499)  # 성수동 — 새 모델 워밍업용 테스트 좌표
+
+# 보정 결과 LRU 캐시 (좌표 격자 스냅 + 모델 버전 키, 모델 교체 시 무효화)
+_correction_cache = CorrectionCache(
+    max_entries=settings.CORRECTION_CACHE_SIZE,
+    grid_deg=settings.CORRECTION_CACHE_GRID_DEG,
+)
+
+
+def _load_bundle(model_path: Path) -> Dict:
+    """decoder.pkl 로드 + 추론 준비 (감시 스레드에서 실행, 요청 경로 밖)"""
+    import joblib
+
+    bundle = _prepare_bundle(validate_bundle(joblib.load(str(model_path))))
+    bundle["model_version"] = _file_version(model_path)
+    _attach_lattice(bundle, model_path)
+
+    n_samples = bundle.get('n_samples', '?')
+    logger.info(f"✅ Model loaded from {model_path} (samples: {n_samples})")
+    logger.info(f"   Features: {bundle.get('feature_cols', [])}")
+    logger.info(f"   RMSE: x={bundle.get('rmse_x', '?'):.6f}, y={bundle.get('rmse_y', '?'):.6f}")
+    return bundle
+
+
+def _warmup_bundle(bundle: Dict):
+    """교체 전 테스트 추론 — 실패하거나 값이 비정상이면 교체 거부"""
+    import numpy as np
+
+    X = _build_features(bundle, [_WARMUP_POINT[0]], [_WARMUP_POINT[1]])
+    for pred in _predict_deltas(bundle, X):
+        if not np.all(np.isfinite(pred)):
+            raise ValueError("warm-up prediction is not finite")
+    lattice = bundle.get("lattice")
+    if lattice is not None:
+        lattice.interpolate([_WARMUP_POINT[0]], [_WARMUP_POINT[1]])
+
+
+def configure_model(path: str = _MODEL_PATH, poll_interval: float = _MODEL_POLL_INTERVAL) -> ModelManager:
+    """모델 경로/감시 주기 설정 (기존 감시 스레드는 중지)"""
+    global _manager, _MODEL_PATH
+    previous = globals().get("_manager")
+    if previous is not None:
+        previous.stop()
+    _MODEL_PATH = str(path)
+    _manager = ModelManager(_MODEL_PATH, loader=_load_bundle, warmup=_warmup_bundle, poll_interval=poll_interval)
+    _manager.add_listener(_correction_cache.clear)
+    _correction_cache.clear()
+    return _manager
+
+
+def start_model_watcher() -> ModelManager:
+    """서버 시작 시 호출: 모델을 미리 로드하고 백그라운드 감시 시작"""
+    _manager.ensure_started()
+    return _manager
 
 
 def _load_model() -> Optional[Dict]:
     """
-    decoder.pkl 모델 번들 로드 (lazy loading + hot-reload)
-    형섭님이 새 pkl을 갈아끼우면 서버 재시작 없이 자동 반영됩니다.
+    현재 활성 decoder.pkl 번들 (요청 경로 — 파일 stat/로드 없음)
+    형섭님이 새 pkl을 갈아끼우면 감시 스레드가 검증 후 자동 교체합니다.
     """
-    global _model_cache, _model_mtime
+    return _manager.current()
 
-    model_path = Path(_MODEL_PATH)
-    if not model_path.exists():
-        if _model_cache is not None:
-            logger.warning("decoder.pkl deleted — clearing cache, falling back to PyProj")
-            _model_cache = None
-        return None
 
-    # 핫리로드: 파일 수정 시간이 바뀌었으면 다시 로드
-    current_mtime = model_path.stat().st_mtime
-    if _model_cache is not None and current_mtime == _model_mtime:
-        return _model_cache
+def _file_version(path: Path) -> str:
+    """모델 파일 내용 기반 버전 (sha256 앞 12자리)"""
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def _attach_lattice(bundle: Dict, model_path: Path) -> Dict:
+    """
+    decoder.lattice.npy가 있고 같은 모델 버전으로 생성된 경우에만 mmap으로 연결
+    """
+    bundle["lattice"] = None
+    lattice = OffsetLattice.load(*lattice_paths(model_path))
+    if lattice is None:
+        return bundle
+    if lattice.model_version != bundle.get("model_version"):
+        logger.warning(
+            f"Offset lattice is stale (built for {lattice.model_version}, "
+            f"model is {bundle.get('model_version')}) — ignoring, rebuild with ml/build_lattice.py"
+        )
+        return bundle
+    bundle["lattice"] = lattice
+    logger.info(f"   Lattice: {lattice.nx}x{lattice.ny} @ {lattice.resolution}m")
+    return bundle
+
+
+def _ensure_anchor_index(bundle: Dict) -> Dict:
+    """
+    번들에 기준점 색인이 없으면 로드 시점에 1회 생성 (구버전 decoder.pkl 호환)
+    """
+    if bundle.get("anchor_index") is None and bundle.get("anchors"):
+        bundle["anchor_index"] = AnchorIndex(bundle["anchors"])
+    return bundle
+
+
+def _prepare_bundle(bundle: Dict) -> Dict:
+    """
+    로드 직후 번들 준비: 기준점 색인 + 평탄화 트리 배열 (없을 때만 생성,
+    학습 시 sklearn과 불일치로 판정된 번들은 생성하지 않음)
+    """
+    _ensure_anchor_index(bundle)
+    if bundle.get("compiled") is None and not bundle.get("compiled_mismatch"):
+        try:
+            compile_bundle(bundle)
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Tree compilation skipped, using sklearn predict: {e}")
+    return bundle
 
-    try:
-        import joblib
-        _model_cache = joblib.load(str(model_path))
-        _model_mtime = current_mtime
-        n_samples = _model_cache.get('n_samples', '?')
-        logger.info(f"✅ Model loaded from {_MODEL_PATH} (samples: {n_samples})")
-        logger.info(f"   Features: {_model_cache.get('feature_cols', [])}")
-        logger.info(f"   RMSE: x={_model_cache.get('rmse_x', '?'):.6f}, y={_model_cache.get('rmse_y', '?'):.6f}")
-        return _model_cache
-    except Exception as e:
-        logger.error(f"Failed to load model: {e}")
-        return None
-
-
-def _haversine_m(lat1, lng1, lat2, lng2):
-    """두 WGS84 좌표 간 거리 (미터)"""
-    R = 6371000
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlam = math.radians(lng2 - lng1)
-    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
-    return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-
-def _bearing(lat1, lng1, lat2, lng2):
-    """두 좌표 사이의 방위각 (degrees)"""
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dlam = math.radians(lng2 - lng1)
-    x = math.sin(dlam) * math.cos(phi2)
-    y = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(dlam)
-    return (math.degrees(math.atan2(x, y)) + 360) % 360
-
-
-def _compute_anchor_features(g_lat: float, g_lng: float, anchors: List[Dict]) -> tuple:
-    """가장 가까운 기준점 3개까지의 (거리, 방향각) 계산"""
-    if not anchors or len(anchors) < 3:
-        return (0.0, 0.0) * 3
-
-    relations = []
-    for a in anchors:
-        d = _haversine_m(g_lat, g_lng, a["lat"], a["lng"])
-        b = _bearing(g_lat, g_lng, a["lat"], a["lng"])
-        relations.append((d, b))
-    
-    relations.sort(key=lambda x: x[0])
-    
-    r1, r2, r3 = relations[0], relations[1], relations[2]
-    return r1[0], r1[1], r2[0], r2[1], r3[0], r3[1]
+
+def _predict_deltas(model: Dict, X):
+    """
+    (delta_x, delta_y) 추론
+
+    소량 입력(단건 요청 경로)은 평탄화 트리로 두 모델을 한 번에 평가하고,
+    대형 배치는 멀티스레드 sklearn predict가 더 빠르므로 그대로 사용합니다.
+    """
+    compiled = model.get("compiled")
+    if compiled is not None and X.shape[0] <= _COMPILED_MAX_ROWS:
+        return compiled.predict(X)
+    return model["model_x"].predict(X), model["model_y"].predict(X)
+
+
+def _build_features(model: Dict, g_lats, g_lngs):
+    """모델 번들의 feature_cols에 맞춰 (n, F) 입력 행렬 구성"""
+    import numpy as np
+
+    g_lats = np.asarray(g_lats, dtype=np.float64)
+    g_lngs = np.asarray(g_lngs, dtype=np.float64)
+    columns = [g_lats[:, None], g_lngs[:, None]]
+
+    index = model.get("anchor_index")
+    if "anchor1_dist" in model["feature_cols"] and index is not None:
+        columns.append(index.triangulation_features(g_lats, g_lngs))
+
+    return np.hstack(columns)
+
+
+def _model_confidence(model: Dict) -> float:
+    return max(0.5, 1.0 - (model.get("rmse_x", 1.0) + model.get("rmse_y", 1.0)) / 2)
+
+
+def _model_details(model: Dict) -> Dict:
+    return {
+        "model_rmse_x": model.get("rmse_x"),
+        "model_rmse_y": model.get("rmse_y"),
+        "n_training_samples": model.get("n_samples"),
+        "gpu_trained": model.get("gpu_trained"),
+    }
 
 
 def _fallback_pyproj(g_lat: float, g_lng: float) -> Dict:
@@ -126,15 +225,21 @@ def _fallback_pyproj(g_lat: float, g_lng: float) -> Dict:
         }
 
 
-def predict_offset(g_lat: float, g_lng: float) -> Dict:
+def predict_offset(g_lat: float, g_lng: float, method: str = "ml") -> Dict:
     """
     Google WGS84 좌표를 보정된 좌표로 변환.
 
+    Args:
+        method: "ml" — decoder 모델 추론
+                "lattice" — 사전 계산 격자 쌍선형 보간 (격자 밖이거나 격자가 없으면 "ml")
+
+    결과 오프셋은 (격자 스냅 좌표, method, 모델 버전) 키로 LRU 캐시됩니다.
+
     Returns:
         {
             "corrected_lat": float,
             "corrected_lng": float,
-            "method": "ml" | "pyproj_fallback" | "identity",
+            "method": "ml" | "lattice" | "pyproj_fallback" | "identity",
             "confidence": float (0-1),
             "details": { ... }
         }
@@ -145,22 +250,12 @@ def predict_offset(g_lat: float, g_lng: float) -> Dict:
         return _fallback_pyproj(g_lat, g_lng)
 
     try:
-        import numpy as np
-
-        feature_cols = model["feature_cols"]
-        anchors = model.get("anchors", [])
-
-        # Feature 구성
-        features = [g_lat, g_lng]
-        if "anchor1_dist" in feature_cols and anchors:
-            a_features = _compute_anchor_features(g_lat, g_lng, anchors)
-            features.extend(a_features)
-
-        X = np.array([features])
-
-        # 추론
-        delta_x = float(model["model_x"].predict(X)[0])
-        delta_y = float(model["model_y"].predict(X)[0])
+        key = _correction_cache.key(g_lat, g_lng, method, model.get("model_version"))
+        cached = _correction_cache.get(key)
+        if cached is None:
+            cached = _infer_offset(model, g_lat, g_lng, method)
+            _correction_cache.put(key, cached)
+        delta_x, delta_y, used_method, confidence, details = cached
 
         corrected_lng = g_lng + delta_x
         corrected_lat = g_lat + delta_y
@@ -168,22 +263,135 @@ def predict_offset(g_lat: float, g_lng: float) -> Dict:
         return {
             "corrected_lat": corrected_lat,
             "corrected_lng": corrected_lng,
-            "method": "ml",
-            "confidence": max(0.5, 1.0 - (model.get("rmse_x", 1.0) + model.get("rmse_y", 1.0)) / 2),
-            "details": {
-                "delta_x": round(delta_x, 8),
-                "delta_y": round(delta_y, 8),
-                "model_rmse_x": model.get("rmse_x"),
-                "model_rmse_y": model.get("rmse_y"),
-                "n_training_samples": model.get("n_samples"),
-                "gpu_trained": model.get("gpu_trained"),
-            },
+            "method": used_method,
+            "confidence": confidence,
+            "details": dict(details),
         }
     except Exception as e:
         logger.error(f"ML inference failed: {e}")
         return _fallback_pyproj(g_lat, g_lng)
 
 
+def _infer_offset(model: Dict, g_lat: float, g_lng: float, method: str) -> tuple:
+    """
+    단건 오프셋 추론 (캐시 미스 경로)
+
+    Returns:
+        (delta_x, delta_y, method, confidence, details)
+    """
+    used_method = "ml"
+    extra = {}
+    lattice = model.get("lattice") if method == "lattice" else None
+    if lattice is not None:
+        lat_dx, lat_dy, inside = lattice.interpolate([g_lat], [g_lng])
+    if lattice is not None and inside[0]:
+        delta_x = float(lat_dx[0])
+        delta_y = float(lat_dy[0])
+        used_method = "lattice"
+        extra = {"lattice_resolution_m": lattice.resolution}
+    else:
+        X = _build_features(model, [g_lat], [g_lng])
+
+        # 추론
+        pred_x, pred_y = _predict_deltas(model, X)
+        delta_x = float(pred_x[0])
+        delta_y = float(pred_y[0])
+
+    details = {
+        "delta_x": round(delta_x, 8),
+        "delta_y": round(delta_y, 8),
+        **_model_details(model),
+        **extra,
+    }
+    return delta_x, delta_y, used_method, _model_confidence(model), details
+
+
+def _fallback_pyproj_batch(lats, lngs) -> Dict:
+    """PyProj 기본 변환 fallback (배치)"""
+    import numpy as np
+
+    try:
+        from pyproj import Transformer
+        wgs_to_tm = Transformer.from_crs("EPSG:4326", "EPSG:5179", always_xy=True)
+        tm_to_wgs = Transformer.from_crs("EPSG:5179", "EPSG:4326", always_xy=True)
+
+        tm_x, tm_y = wgs_to_tm.transform(lngs, lats)
+        back_lng, back_lat = tm_to_wgs.transform(tm_x, tm_y)
+
+        return {
+            "corrected_lat": np.asarray(back_lat, dtype=np.float64),
+            "corrected_lng": np.asarray(back_lng, dtype=np.float64),
+            "method": "pyproj_fallback",
+            "confidence": 0.6,
+            "details": {"note": "ML 모델 미로드 — PyProj 순수 투영 사용"},
+        }
+    except Exception as e:
+        logger.error(f"PyProj batch fallback failed: {e}")
+        return {
+            "corrected_lat": lats.copy(),
+            "corrected_lng": lngs.copy(),
+            "method": "identity",
+            "confidence": 0.0,
+            "details": {"error": str(e)},
+        }
+
+
+def predict_offset_batch(lats, lngs) -> Dict:
+    """
+    Google WGS84 좌표 배열을 한 번에 보정 (대량 POI 보정용).
+
+    기준점 feature는 브로드캐스팅으로 계산하고, model_x / model_y는
+    배치당 1회씩만 호출합니다.
+
+    Args:
+        lats, lngs: 같은 길이의 1차원 배열 (list / np.ndarray)
+
+    Returns:
+        {
+            "corrected_lat": np.ndarray,
+            "corrected_lng": np.ndarray,
+            "delta_x": np.ndarray | None,
+            "delta_y": np.ndarray | None,
+            "method": "ml" | "pyproj_fallback" | "identity",
+            "confidence": float (0-1),
+            "details": { ... }
+        }
+    """
+    import numpy as np
+
+    lats = np.asarray(lats, dtype=np.float64).ravel()
+    lngs = np.asarray(lngs, dtype=np.float64).ravel()
+    if lats.shape != lngs.shape:
+        raise ValueError(f"lats/lngs length mismatch: {lats.shape[0]} != {lngs.shape[0]}")
+
+    model = _load_model()
+    if model is None or lats.size == 0:
+        result = _fallback_pyproj_batch(lats, lngs)
+        result.update(delta_x=None, delta_y=None)
+        return result
+
+    try:
+        X = _build_features(model, lats, lngs)
+        pred_x, pred_y = _predict_deltas(model, X)
+        delta_x = np.asarray(pred_x, dtype=np.float64)
+        delta_y = np.asarray(pred_y, dtype=np.float64)
+
+        return {
+            "corrected_lat": lats + delta_y,
+            "corrected_lng": lngs + delta_x,
+            "delta_x": delta_x,
+            "delta_y": delta_y,
+            "method": "ml",
+            "confidence": _model_confidence(model),
+            "details": _model_details(model),
+        }
+    except Exception as e:
+        logger.error(f"ML batch inference failed: {e}")
+        result = _fallback_pyproj_batch(lats, lngs)
+        result.update(delta_x=None, delta_y=None)
+        return result
+
+
 def get_model_status() -> Dict:
     """현재 모델 상태 조회 (API 헬스체크용)"""
     model = _load_model()
@@ -192,13 +400,27 @@ def get_model_status() -> Dict:
             "loaded": False,
             "path": _MODEL_PATH,
             "fallback": "pyproj",
+            "manager": _manager.status(),
+            "cache": _correction_cache.stats(),
         }
+    lattice = model.get("lattice")
     return {
         "loaded": True,
         "path": _MODEL_PATH,
+        "version": model.get("model_version"),
+        "manager": _manager.status(),
+        "cache": _correction_cache.stats(),
+        "lattice": {
+            "resolution_m": lattice.resolution,
+            "shape": [lattice.ny, lattice.nx],
+            "max_error_m": lattice.meta.get("interpolation_error", {}).get("max_error_m"),
+        } if lattice is not None else None,
         "features": model.get("feature_cols", []),
         "rmse_x": model.get("rmse_x"),
         "rmse_y": model.get("rmse_y"),
         "n_samples": model.get("n_samples"),
         "gpu_trained": model.get("gpu_trained"),
     }
+
+
+_manager: ModelManager = configure_model()
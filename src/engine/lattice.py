@@ -0,0 +1,173 @@
+"""
+GeoHarness: Precomputed Offset Lattice
+
+decoder 보정값(delta_x, delta_y)은 위치에 대한 매끄러운 함수이고 서비스 영역은
+한정되어 있으므로, EPSG:5179 정규 격자 위에서 미리 평가해 두고
+런타임에는 격자 4점 쌍선형 보간(O(1))으로 응답합니다.
+
+파일 구성 (decoder.pkl 옆에 저장):
+    decoder.lattice.npy   — float32 (2, ny, nx): [delta_x, delta_y], mmap으로 로드
+    decoder.lattice.json  — 격자 원점/해상도/크기 + 생성에 사용한 모델 버전
+
+격자 생성은 ml/build_lattice.py, 런타임 조회는 engine/inference.py
+(predict_offset(..., method="lattice"))에서 사용합니다.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from shared.constants import EPSG_KOREA_TM, EPSG_WGS84
+
+logger = logging.getLogger("Lattice")
+
+_BUILD_CHUNK = 20_000
+
+_transformers: Dict[str, object] = {}
+
+
+def _transformer(direction: str):
+    """pyproj Transformer 캐시 (생성 비용이 커서 모듈 수명 동안 재사용)"""
+    if direction not in _transformers:
+        from pyproj import Transformer
+        src, dst = (EPSG_WGS84, EPSG_KOREA_TM) if direction == "fwd" else (EPSG_KOREA_TM, EPSG_WGS84)
+        _transformers[direction] = Transformer.from_crs(src, dst, always_xy=True)
+    return _transformers[direction]
+
+
+def lattice_paths(model_path) -> Tuple[Path, Path]:
+    """decoder.pkl → (decoder.lattice.npy, decoder.lattice.json)"""
+    model_path = Path(model_path)
+    return model_path.with_suffix(".lattice.npy"), model_path.with_suffix(".lattice.json")
+
+
+class OffsetLattice:
+    """EPSG:5179 정규 격자 위의 (delta_x, delta_y) 필드 + 쌍선형 보간"""
+
+    def __init__(self, fields: np.ndarray, meta: Dict):
+        self.fields = fields                      # (2, ny, nx)
+        self.meta = meta
+        self.x0 = float(meta["x0"])
+        self.y0 = float(meta["y0"])
+        self.resolution = float(meta["resolution_m"])
+        self.ny, self.nx = fields.shape[1], fields.shape[2]
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self.meta.get("model_version")
+
+    @staticmethod
+    def grid_for_bounds(bounds: Tuple[float, float, float, float], resolution_m: float, margin_m: float = 0.0) -> Dict:
+        """
+        WGS84 경계 (min_lat, min_lng, max_lat, max_lng) → EPSG:5179 격자 메타데이터
+        """
+        min_lat, min_lng, max_lat, max_lng = bounds
+        corner_lngs = np.array([min_lng, max_lng, min_lng, max_lng])
+        corner_lats = np.array([min_lat, min_lat, max_lat, max_lat])
+        xs, ys = _transformer("fwd").transform(corner_lngs, corner_lats)
+        x0 = float(np.floor((np.min(xs) - margin_m) / resolution_m) * resolution_m)
+        y0 = float(np.floor((np.min(ys) - margin_m) / resolution_m) * resolution_m)
+        nx = int(np.ceil((np.max(xs) + margin_m - x0) / resolution_m)) + 1
+        ny = int(np.ceil((np.max(ys) + margin_m - y0) / resolution_m)) + 1
+        return {"x0": x0, "y0": y0, "resolution_m": float(resolution_m), "nx": nx, "ny": ny}
+
+    @classmethod
+    def build(cls, predict_fn: Callable, grid: Dict, chunk: int = _BUILD_CHUNK) -> "OffsetLattice":
+        """
+        격자 모든 노드에서 predict_fn(lats, lngs) → (delta_x, delta_y) 평가
+
+        노드 좌표는 EPSG:5179 (x0 + i*res, y0 + j*res)를 WGS84로 역변환하여 사용합니다.
+        """
+        nx, ny, res = grid["nx"], grid["ny"], grid["resolution_m"]
+        fields = np.empty((2, ny, nx), dtype=np.float32)
+        flat_x = fields[0].reshape(-1)
+        flat_y = fields[1].reshape(-1)
+
+        for start in range(0, nx * ny, chunk):
+            idx = np.arange(start, min(start + chunk, nx * ny))
+            xs = grid["x0"] + (idx % nx) * res
+            ys = grid["y0"] + (idx // nx) * res
+            lngs, lats = _transformer("rev").transform(xs, ys)
+            dx, dy = predict_fn(np.asarray(lats), np.asarray(lngs))
+            flat_x[idx] = dx
+            flat_y[idx] = dy
+
+        return cls(fields, dict(grid))
+
+    def save(self, npy_path, meta_path):
+        np.save(npy_path, np.ascontiguousarray(self.fields))
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, npy_path, meta_path) -> Optional["OffsetLattice"]:
+        """mmap으로 격자 로드 (파일이 없으면 None)"""
+        if not Path(npy_path).exists() or not Path(meta_path).exists():
+            return None
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        fields = np.load(npy_path, mmap_mode="r")
+        return cls(fields, meta)
+
+    def interpolate(self, lats, lngs) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        쌍선형 보간
+
+        Returns:
+            (delta_x, delta_y, inside) — 격자 밖 좌표는 inside=False, delta는 NaN
+        """
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lngs = np.asarray(lngs, dtype=np.float64).ravel()
+        xs, ys = _transformer("fwd").transform(lngs, lats)
+
+        fx = (np.asarray(xs) - self.x0) / self.resolution
+        fy = (np.asarray(ys) - self.y0) / self.resolution
+        inside = (fx >= 0) & (fy >= 0) & (fx <= self.nx - 1) & (fy <= self.ny - 1)
+
+        i0 = np.clip(np.floor(fx), 0, self.nx - 2).astype(np.int64)
+        j0 = np.clip(np.floor(fy), 0, self.ny - 2).astype(np.int64)
+        tx = np.clip(fx - i0, 0.0, 1.0)
+        ty = np.clip(fy - j0, 0.0, 1.0)
+
+        out = []
+        for k in range(2):
+            f = self.fields[k]
+            v00 = f[j0, i0].astype(np.float64)
+            v01 = f[j0, i0 + 1].astype(np.float64)
+            v10 = f[j0 + 1, i0].astype(np.float64)
+            v11 = f[j0 + 1, i0 + 1].astype(np.float64)
+            v = (v00 * (1 - tx) + v01 * tx) * (1 - ty) + (v10 * (1 - tx) + v11 * tx) * ty
+            out.append(np.where(inside, v, np.nan))
+        return out[0], out[1], inside
+
+    def max_interpolation_error(self, predict_fn: Callable, max_samples: int = 200_000, seed: int = 0) -> Dict:
+        """
+        셀 중심점(보간 오차가 가장 큰 위치)에서 모델 값과 보간 값 비교
+
+        Returns:
+            { "max_error_m", "mean_error_m", "max_error_deg", "n_samples" }
+        """
+        n_cells = (self.nx - 1) * (self.ny - 1)
+        rng = np.random.default_rng(seed)
+        cells = np.arange(n_cells) if n_cells <= max_samples else rng.choice(n_cells, max_samples, replace=False)
+        xs = self.x0 + (cells % (self.nx - 1) + 0.5) * self.resolution
+        ys = self.y0 + (cells // (self.nx - 1) + 0.5) * self.resolution
+        lngs, lats = _transformer("rev").transform(xs, ys)
+        lats, lngs = np.asarray(lats), np.asarray(lngs)
+
+        true_dx, true_dy = predict_fn(lats, lngs)
+        interp_dx, interp_dy, _ = self.interpolate(lats, lngs)
+
+        err_x_m = (interp_dx - true_dx) * 111_320.0 * np.cos(np.radians(lats))
+        err_y_m = (interp_dy - true_dy) * 110_574.0
+        err_m = np.hypot(err_x_m, err_y_m)
+        err_deg = np.maximum(np.abs(interp_dx - true_dx), np.abs(interp_dy - true_dy))
+        return {
+            "max_error_m": float(np.max(err_m)),
+            "mean_error_m": float(np.mean(err_m)),
+            "max_error_deg": float(np.max(err_deg)),
+            "n_samples": int(cells.shape[0]),
+        }
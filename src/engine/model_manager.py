@@ -0,0 +1,180 @@
+"""
+GeoHarness: Model Manager (background hot-reload)
+
+decoder.pkl 파일을 백그라운드 스레드에서 감시하다가 변경되면
+요청 경로 밖에서 로드 → 검증 → 워밍업(테스트 추론) 후 원자적으로 교체합니다.
+
+요청 스레드는 stat()/joblib.load 없이 현재 활성 번들 참조만 읽습니다.
+새 번들이 검증이나 워밍업에 실패하면 기존 모델을 계속 사용합니다.
+
+사용법:
+    manager = ModelManager(path, loader=load_bundle, warmup=warmup_bundle)
+    manager.ensure_started()      # 최초 1회 동기 로드 + 감시 스레드 시작
+    bundle = manager.current()    # 요청 경로: 참조 읽기만
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("ModelManager")
+
+REQUIRED_KEYS = ("model_x", "model_y", "feature_cols")
+
+
+def validate_bundle(bundle) -> Dict:
+    """번들 필수 키 검증 (실패 시 ValueError)"""
+    if not isinstance(bundle, dict):
+        raise ValueError(f"bundle must be a dict, got {type(bundle).__name__}")
+    missing = [k for k in REQUIRED_KEYS if k not in bundle]
+    if missing:
+        raise ValueError(f"bundle missing keys: {missing}")
+    return bundle
+
+
+class _ActiveModel:
+    """교체 단위 스냅샷 (불변) — 번들과 메타데이터를 한 참조로 묶음"""
+
+    __slots__ = ("bundle", "version", "loaded_at", "load_seconds", "file_stamp")
+
+    def __init__(self, bundle: Optional[Dict], version: Optional[str], loaded_at: Optional[float],
+                 load_seconds: Optional[float], file_stamp: Optional[Tuple[float, int]]):
+        self.bundle = bundle
+        self.version = version
+        self.loaded_at = loaded_at
+        self.load_seconds = load_seconds
+        self.file_stamp = file_stamp
+
+
+_EMPTY = _ActiveModel(None, None, None, None, None)
+
+
+class ModelManager:
+    def __init__(
+        self,
+        path: str,
+        loader: Callable[[Path], Dict],
+        warmup: Optional[Callable[[Dict], None]] = None,
+        poll_interval: float = 5.0,
+    ):
+        self.path = Path(path)
+        self._loader = loader
+        self._warmup = warmup
+        self.poll_interval = poll_interval
+
+        self._active = _EMPTY
+        self._listeners: List[Callable[[Optional[Dict]], None]] = []
+        self._lock = threading.Lock()           # 로드/교체 직렬화 (읽기는 lock 없음)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = False
+        self.last_error: Optional[str] = None
+        self.reload_count = 0
+
+    # ── 요청 경로 ──────────────────────────────────────────
+
+    def current(self) -> Optional[Dict]:
+        """현재 활성 번들 (없으면 None)"""
+        self.ensure_started()
+        return self._active.bundle
+
+    # ── 수명 주기 ──────────────────────────────────────────
+
+    def ensure_started(self):
+        """최초 호출 시 1회 동기 로드 후 감시 스레드 시작"""
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._check_locked()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+            self._thread.start()
+            self._started = True
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._started = False
+
+    def add_listener(self, fn: Callable[[Optional[Dict]], None]):
+        """모델 교체 시 호출될 콜백 등록 (예: 보정 캐시 무효화)"""
+        self._listeners.append(fn)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check_now()
+
+    # ── 로드 / 교체 ────────────────────────────────────────
+
+    def check_now(self) -> bool:
+        """파일 변경 확인 후 필요하면 교체. 교체가 일어났으면 True"""
+        with self._lock:
+            return self._check_locked()
+
+    def _file_stamp(self) -> Optional[Tuple[float, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def _check_locked(self) -> bool:
+        stamp = self._file_stamp()
+        active = self._active
+
+        if stamp is None:
+            if active.bundle is not None:
+                logger.warning(f"{self.path.name} deleted — clearing model, falling back to PyProj")
+                self._swap(_EMPTY)
+                return True
+            return False
+
+        if stamp == active.file_stamp:
+            return False
+
+        start = time.perf_counter()
+        try:
+            bundle = validate_bundle(self._loader(self.path))
+            if self._warmup is not None:
+                self._warmup(bundle)
+        except Exception as e:
+            # 같은 파일을 매 주기 재시도하지 않도록 stamp는 기록하되 기존 번들 유지
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"Model reload rejected, keeping version {active.version}: {self.last_error}")
+            self._active = _ActiveModel(active.bundle, active.version, active.loaded_at,
+                                        active.load_seconds, stamp)
+            return False
+
+        load_seconds = time.perf_counter() - start
+        self.last_error = None
+        self._swap(_ActiveModel(bundle, bundle.get("model_version"), time.time(), load_seconds, stamp))
+        logger.info(f"✅ Model {bundle.get('model_version')} active ({load_seconds * 1000:.0f} ms load + warm-up)")
+        return True
+
+    def _swap(self, new: _ActiveModel):
+        self._active = new            # 단일 참조 대입 → 원자적 교체
+        self.reload_count += 1
+        for fn in self._listeners:
+            try:
+                fn(new.bundle)
+            except Exception as e:
+                logger.error(f"Model swap listener failed: {e}")
+
+    # ── 상태 ──────────────────────────────────────────────
+
+    def status(self) -> Dict:
+        active = self._active
+        return {
+            "version": active.version,
+            "loaded_at": active.loaded_at,
+            "load_time_ms": round(active.load_seconds * 1000, 1) if active.load_seconds is not None else None,
+            "reload_count": self.reload_count,
+            "watching": self._thread is not None and self._thread.is_alive(),
+            "poll_interval_s": self.poll_interval,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,196 @@
+"""
+GeoHarness: POI Name Trigram Index
+
+CSV 데이터셋 전체를 매번 SequenceMatcher로 훑지 않도록, 로드 시점에
+정규화된 이름(poi_name, n_name)의 문자 trigram 역색인을 만듭니다.
+
+- 정규화/채점: engine/similarity.py (name_similarity와 같은 점수)
+- trigram은 코드 포인트 단위이므로 한글은 음절 단위로 자름 ("하이라인" → " 하이", "하이라", ...)
+  양끝을 공백으로 패딩하여 1~2글자 이름도 색인됨
+- 질의 trigram과 겹치는 항목을 Dice 계수 순으로 top-k 추출 → 후보만 정확한 ratio 계산
+- 검증 단계: 문자(음절) 역색인으로 각 항목의 공통 문자 수 C를 구하면
+  ratio = 2M/(|q|+|n|) ≤ 2C/(|q|+|n|) 이므로, 이 상한이 현재 최고점(또는 threshold)에
+  못 미치는 항목은 SequenceMatcher 없이 제외. 남은 항목만 추가로 채점하여
+  선형 탐색과 동일한 결과를 보장
+- 최고점, 동점이면 데이터셋 순서상 앞선 행 (기존 선형 탐색과 같은 규칙)
+- 행 목록 대신 열 저장소(engine/poi_store.py)와 미리 정규화된 이름 열을 받을 수 있음
+- allowed(행 번호 배열)를 주면 그 행들 안에서만 같은 규칙으로 탐색
+  (예: engine/spatial.GridIndex 반경 질의 결과)
+
+사용법:
+    index = PoiIndex(rows)
+    row = index.best_match("하이라인 카페 성수동", threshold=0.4)
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine.similarity import SimilarityEngine, normalize_name
+
+DEFAULT_FIELDS = ("poi_name", "n_name")
+
+
+def trigrams(norm: str) -> List[str]:
+    """공백 패딩 문자 trigram (중복 제거, 등장 순서 유지)"""
+    if not norm:
+        return []
+    padded = f"  {norm} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+class PoiIndex:
+    def __init__(
+        self,
+        rows: Sequence[dict],
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        top_k: int = 64,
+        normalized: Optional[Sequence[Sequence[str]]] = None,
+    ):
+        """
+        Args:
+            normalized: 필드별 정규화된 이름 열 (engine/poi_store.PoiStore.normalized) — 주면 행을 읽지 않음
+        """
+        self.rows = rows
+        self.fields = tuple(fields)
+        self.top_k = top_k
+        if normalized is None:
+            normalized = [[normalize_name(row.get(field, "") or "") for row in rows] for field in self.fields]
+
+        # 색인 단위: (행, 필드) 항목. entry_id = row * n_fields + field
+        n_fields = len(self.fields)
+        self.names: List[str] = []
+        gram_counts = np.zeros(len(rows) * n_fields, dtype=np.int32)
+        name_lens = np.zeros(len(rows) * n_fields, dtype=np.int32)
+        postings: Dict[str, List[int]] = {}
+        char_postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        columns = [iter(column) for column in normalized]
+        for r in range(len(rows)):
+            for f, column in enumerate(columns):
+                norm = next(column)
+                self.names.append(norm)
+                entry = r * n_fields + f
+                grams = trigrams(norm)
+                gram_counts[entry] = len(grams)
+                name_lens[entry] = len(norm)
+                for g in grams:
+                    postings.setdefault(g, []).append(entry)
+                for ch, cnt in Counter(norm).items():
+                    ids, counts = char_postings.setdefault(ch, ([], []))
+                    ids.append(entry)
+                    counts.append(cnt)
+
+        self.similarity = SimilarityEngine(self.names, normalized=True)
+        self._n_fields = n_fields
+        self._gram_counts = gram_counts
+        self._name_lens = name_lens
+        self._postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+        self._char_postings = {
+            ch: (np.asarray(ids, dtype=np.int32), np.asarray(counts, dtype=np.int32))
+            for ch, (ids, counts) in char_postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def candidates(self, query_norm: str, k: Optional[int] = None) -> np.ndarray:
+        """질의와 trigram이 겹치는 행 중 Dice 계수 상위 k개 (행 번호 오름차순)"""
+        k = self.top_k if k is None else k
+        grams = trigrams(query_norm)
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        if not lists:
+            return np.empty(0, dtype=np.int64)
+        entries, shared = np.unique(np.concatenate(lists), return_counts=True)
+        dice = 2.0 * shared / (len(grams) + self._gram_counts[entries])
+        if len(entries) > k:
+            top = np.argpartition(-dice, k - 1)[:k]
+            entries = entries[top]
+        return np.unique(entries // self._n_fields)
+
+    def upper_bounds(self, query_norm: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        공통 문자가 있는 행과 ratio 상한 (행 번호 오름차순, 행 상한 = 필드별 상한의 최대값)
+
+        SequenceMatcher의 일치 문자 수는 두 문자열의 문자 다중집합 교집합 크기 이하
+        """
+        ids, shared = [], []
+        for ch, q_cnt in Counter(query_norm).items():
+            posting = self._char_postings.get(ch)
+            if posting is not None:
+                ids.append(posting[0])
+                shared.append(np.minimum(posting[1], q_cnt))
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        entries, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        common = np.bincount(inverse, weights=np.concatenate(shared))
+        bound = 2.0 * common / (len(query_norm) + self._name_lens[entries])
+        rows = entries // self._n_fields
+        # 같은 행의 필드들은 연속 entry → 행 단위 최대값
+        row_ids, starts = np.unique(rows, return_index=True)
+        return row_ids, np.maximum.reduceat(bound, starts)
+
+    def score(self, query_norm: str, row_idx: int) -> float:
+        """행 점수: 필드별 SequenceMatcher ratio의 최대값"""
+        if not query_norm:
+            return 0.0
+        base = row_idx * self._n_fields
+        return max(self.similarity.score(query_norm, base + f) for f in range(self._n_fields))
+
+    def best_match(
+        self, query: str, threshold: float = 0.4, k: Optional[int] = None, allowed: Optional[np.ndarray] = None,
+    ) -> Optional[dict]:
+        """후보 행만 정확히 채점하여 threshold 이상 최고점 행 반환 (동점이면 앞선 행)"""
+        row, score = self.best_match_scored(query, k=k, threshold=threshold, allowed=allowed)
+        if row is not None and score >= threshold:
+            return row
+        return None
+
+    def best_match_scored(
+        self, query: str, k: Optional[int] = None, threshold: float = 0.0, allowed: Optional[np.ndarray] = None,
+    ) -> Tuple[Optional[dict], float]:
+        """
+        선형 탐색과 같은 결과 (최고점 행, 점수). threshold 미만 점수만 있으면 (None 또는 임의 행, 점수)
+        """
+        query_norm = normalize_name(query)
+        if not query_norm:
+            return None, 0.0
+
+        # 1단계: trigram top-k 후보 채점 → 초기 최고점 (허용 행이 주어지면 그 안에서만 탐색하므로 생략)
+        scored: Dict[int, float] = {}
+        if allowed is None:
+            for r in self.candidates(query_norm, k):
+                scored[int(r)] = self.score(query_norm, int(r))
+        best_idx, best_score = self._pick(scored)
+
+        # 2단계: 상한이 현재 최고점 이상인 나머지 행만 상한 내림차순으로 채점
+        row_ids, bounds = self.upper_bounds(query_norm)
+        if allowed is not None:
+            inside = np.isin(row_ids, allowed)
+            row_ids, bounds = row_ids[inside], bounds[inside]
+        floor = max(best_score, threshold)
+        keep = bounds >= floor
+        row_ids, bounds = row_ids[keep], bounds[keep]
+        for i in np.argsort(-bounds, kind="stable"):
+            r = int(row_ids[i])
+            if bounds[i] < best_score:
+                break
+            if r in scored:
+                continue
+            if bounds[i] == best_score and best_idx is not None and r > best_idx:
+                continue  # 동점이어도 앞선 행이 이김
+            score = scored[r] = self.score(query_norm, r)
+            if score > best_score or (score == best_score and score > 0 and (best_idx is None or r < best_idx)):
+                best_idx, best_score = r, score
+
+        if best_idx is None:
+            return None, 0.0
+        return self.rows[best_idx], best_score
+
+    @staticmethod
+    def _pick(scored: Dict[int, float]) -> Tuple[Optional[int], float]:
+        best_idx, best_score = None, 0.0
+        for r in sorted(scored):
+            if scored[r] > best_score:
+                best_idx, best_score = r, scored[r]
+        return best_idx, best_score
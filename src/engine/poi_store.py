@@ -0,0 +1,306 @@
+"""
+GeoHarness: Columnar POI Store
+
+ml_dataset.csv를 행마다 dict(문자열 값)로 들고 있는 대신 열 단위로 압축해 보관합니다.
+
+- 좌표: float64 배열. Naver 좌표(n_mapx/n_mapy, WGS84 × 1e7)는 로드 시 한 번만 디코딩
+  (누락/0/국외 좌표는 NaN) → 매칭할 때마다 int() 재파싱 없음
+- 문자열: 열마다 UTF-8 바이트 하나 + 오프셋 배열 (StringColumn). 문자열 객체는 읽을 때만 생성
+- 종류가 적은 열(poi_type, source): 코드 배열 + 범주 목록 (CategoryColumn)
+- 이름 정규화(engine/similarity.normalize_name) 결과를 열로 저장 → 색인 빌드 시 재계산 없음
+- 바이너리 캐시: <csv>.store.npz (CSV 크기/수정 시각이 같으면 CSV 파싱 없이 배열만 읽음)
+  API 서버는 import 시 읽기만 하고(write_cache=False) 기록은 시작 시 (api/search.write_dataset_cache)
+- store[i]는 기존 DictReader 행과 같은 키의 dict (좌표는 float, 없으면 None)
+
+사용법:
+    store = PoiStore.load("data/ml_dataset.csv")     # 캐시 있으면 .npz, 없으면 CSV 파싱 후 캐시 저장
+    store.n_lat[i], store.poi_name[i], store[i]
+    store.memory_footprint()                       # {"rows": 3065, "total_bytes": ..., "columns": {...}}
+"""
+
+import csv
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from engine.similarity import normalize_name
+
+logger = logging.getLogger("PoiStore")
+
+CACHE_VERSION = 1
+STRING_FIELDS = ("poi_name", "n_name", "n_address")
+CATEGORY_FIELDS = ("poi_type", "source")
+NORMALIZED_FIELDS = ("poi_name", "n_name")      # engine/poi_index.py 색인 대상
+FLOAT_FIELDS = ("g_lat", "g_lng", "n_lat", "n_lng")
+
+
+class StringColumn:
+    """UTF-8 바이트 하나 + 오프셋 배열 (i번째 문자열 = blob[offsets[i]:offsets[i+1]])"""
+
+    __slots__ = ("_blob", "offsets")
+
+    def __init__(self, blob: bytes, offsets: np.ndarray):
+        self._blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str]) -> "StringColumn":
+        encoded = [(v or "").encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        return cls(b"".join(encoded), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self._blob[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self):
+        blob, offsets = self._blob, self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield blob[start:end].decode("utf-8")
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._blob) + self.offsets.nbytes
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {f"{prefix}.blob": np.frombuffer(self._blob, dtype=np.uint8), f"{prefix}.offsets": self.offsets}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str) -> "StringColumn":
+        return cls(arrays[f"{prefix}.blob"].tobytes(), arrays[f"{prefix}.offsets"])
+
+
+class CategoryColumn:
+    """범주 코드 배열 + 범주 문자열 목록 (같은 값은 한 번만 저장)"""
+
+    __slots__ = ("codes", "categories")
+
+    def __init__(self, codes: np.ndarray, categories: List[str]):
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str]) -> "CategoryColumn":
+        lookup: Dict[str, int] = {}
+        codes = [lookup.setdefault(v or "", len(lookup)) for v in values]
+        dtype = np.min_scalar_type(max(len(lookup) - 1, 0))
+        return cls(np.asarray(codes, dtype=dtype), list(lookup))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str:
+        return self.categories[self.codes[i]]
+
+    def __iter__(self):
+        categories = self.categories
+        return (categories[c] for c in self.codes.tolist())
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + sum(len(c.encode("utf-8")) for c in self.categories)
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {f"{prefix}.codes": self.codes, **StringColumn.from_strings(self.categories).to_arrays(f"{prefix}.cat")}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str) -> "CategoryColumn":
+        return cls(arrays[f"{prefix}.codes"], list(StringColumn.from_arrays(arrays, f"{prefix}.cat")))
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _decode_naver(mapx, mapy):
+    """n_mapx/n_mapy (WGS84 × 1e7 정수 문자열) → (lat, lng). 누락/0/국외 좌표는 NaN"""
+    try:
+        raw_x, raw_y = int(mapx or 0), int(mapy or 0)
+    except (TypeError, ValueError):
+        return np.nan, np.nan
+    lat, lng = raw_y / 10_000_000.0, raw_x / 10_000_000.0
+    if raw_x and raw_y and 33.0 <= lat <= 43.0 and 124.0 <= lng <= 132.0:
+        return lat, lng
+    return np.nan, np.nan
+
+
+def cache_path_for(csv_path) -> Path:
+    """ml_dataset.csv → ml_dataset.store.npz"""
+    return Path(csv_path).with_suffix(".store.npz")
+
+
+def _signature(csv_path: Path) -> Dict:
+    stat = csv_path.stat()
+    return {"version": CACHE_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class PoiStore:
+    def __init__(
+        self,
+        strings: Dict[str, StringColumn],
+        categories: Dict[str, CategoryColumn],
+        floats: Dict[str, np.ndarray],
+        normalized: Dict[str, StringColumn],
+    ):
+        self._strings = strings
+        self._categories = categories
+        self._floats = floats
+        self._normalized = normalized
+        self.n_rows = len(floats["g_lat"])
+        self.loaded_from: Optional[str] = None   # "cache" | "csv" | None (행 목록에서 생성)
+        self.load_ms: Optional[float] = None
+        self.signature: Optional[Dict] = None    # load()한 CSV의 버전/크기/수정 시각
+
+        self.g_lat, self.g_lng = floats["g_lat"], floats["g_lng"]
+        self.n_lat, self.n_lng = floats["n_lat"], floats["n_lng"]   # Naver 좌표 (없으면 NaN)
+        self.poi_name, self.n_name, self.n_address = (strings[f] for f in STRING_FIELDS)
+        self.poi_type, self.source = (categories[f] for f in CATEGORY_FIELDS)
+
+    # ── 생성 ──
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "PoiStore":
+        """DictReader 형식 행 → 열 저장소 (행 목록은 열로 옮긴 뒤 버림)"""
+        text = {f: [] for f in (*STRING_FIELDS, *CATEGORY_FIELDS)}
+        floats = {f: [] for f in FLOAT_FIELDS}
+        for row in rows:
+            for f in text:
+                text[f].append(row.get(f) or "")
+            floats["g_lat"].append(_to_float(row.get("g_lat")))
+            floats["g_lng"].append(_to_float(row.get("g_lng")))
+            n_lat, n_lng = _decode_naver(row.get("n_mapx"), row.get("n_mapy"))
+            floats["n_lat"].append(n_lat)
+            floats["n_lng"].append(n_lng)
+        return cls(
+            strings={f: StringColumn.from_strings(text[f]) for f in STRING_FIELDS},
+            categories={f: CategoryColumn.from_strings(text[f]) for f in CATEGORY_FIELDS},
+            floats={f: np.asarray(v, dtype=np.float64) for f, v in floats.items()},
+            normalized={f: StringColumn.from_strings(normalize_name(v) for v in text[f]) for f in NORMALIZED_FIELDS},
+        )
+
+    @classmethod
+    def from_csv(cls, csv_path) -> "PoiStore":
+        with open(csv_path, encoding="utf-8") as f:
+            return cls.from_rows(csv.DictReader(f))
+
+    @classmethod
+    def load(cls, csv_path, cache_path=None, use_cache: bool = True, write_cache: bool = True) -> "PoiStore":
+        """
+        캐시(.npz)가 CSV와 같은 버전이면 캐시에서, 아니면 CSV를 파싱하고 캐시를 다시 씀
+
+        write_cache: False면 캐시를 읽기만 함 (나중에 save(cache_path, store.signature)로 기록)
+
+        Raises:
+            FileNotFoundError: CSV가 없음
+        """
+        csv_path = Path(csv_path)
+        cache_path = Path(cache_path) if cache_path else cache_path_for(csv_path)
+        start = time.perf_counter()
+        signature = _signature(csv_path)
+
+        if use_cache and cache_path.exists():
+            try:
+                store = cls.read_cache(cache_path, expected=signature)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring POI store cache {cache_path}: {e}")
+                store = None
+            if store is not None:
+                store.loaded_from, store.load_ms = "cache", round((time.perf_counter() - start) * 1000, 2)
+                store.signature = signature
+                return store
+
+        store = cls.from_csv(csv_path)
+        store.loaded_from, store.load_ms = "csv", round((time.perf_counter() - start) * 1000, 2)
+        store.signature = signature
+        if use_cache and write_cache:
+            try:
+                store.save(cache_path, signature)
+            except OSError as e:
+                logger.warning(f"Could not write POI store cache {cache_path}: {e}")
+        return store
+
+    # ── 바이너리 캐시 ──
+
+    def save(self, cache_path, signature: Optional[Dict] = None):
+        """열 배열을 .npz로 저장 (임시 파일에 쓰고 교체)"""
+        arrays: Dict[str, np.ndarray] = {f"float.{f}": a for f, a in self._floats.items()}
+        for f, col in self._strings.items():
+            arrays.update(col.to_arrays(f"str.{f}"))
+        for f, col in self._categories.items():
+            arrays.update(col.to_arrays(f"category.{f}"))
+        for f, col in self._normalized.items():
+            arrays.update(col.to_arrays(f"norm.{f}"))
+        arrays["meta"] = np.array(json.dumps(signature or {"version": CACHE_VERSION}))
+
+        cache_path = Path(cache_path)
+        tmp = cache_path.with_name(cache_path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, cache_path)
+
+    @classmethod
+    def read_cache(cls, cache_path, expected: Optional[Dict] = None) -> Optional["PoiStore"]:
+        """캐시 읽기. expected(버전/CSV 크기·수정 시각)와 다르면 None"""
+        with np.load(cache_path, allow_pickle=False) as npz:
+            meta = json.loads(str(npz["meta"]))
+            if meta.get("version") != CACHE_VERSION or (expected is not None and meta != expected):
+                return None
+            arrays = {name: npz[name] for name in npz.files}
+        return cls(
+            strings={f: StringColumn.from_arrays(arrays, f"str.{f}") for f in STRING_FIELDS},
+            categories={f: CategoryColumn.from_arrays(arrays, f"category.{f}") for f in CATEGORY_FIELDS},
+            floats={f: arrays[f"float.{f}"] for f in FLOAT_FIELDS},
+            normalized={f: StringColumn.from_arrays(arrays, f"norm.{f}") for f in NORMALIZED_FIELDS},
+        )
+
+    # ── 조회 ──
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def __getitem__(self, i: int) -> dict:
+        """i번째 행 (DictReader 행과 같은 이름 키, 좌표는 float 또는 None)"""
+        row = {f: col[i] for f, col in self._strings.items()}
+        row.update({f: col[i] for f, col in self._categories.items()})
+        for f, values in self._floats.items():
+            value = float(values[i])
+            row[f] = value if value == value else None   # NaN → None
+        return row
+
+    def normalized(self, field: str) -> StringColumn:
+        """정규화된 이름 열 (engine/poi_index.PoiIndex 입력)"""
+        return self._normalized[field]
+
+    def memory_footprint(self) -> Dict:
+        """열별 메모리 사용량 (바이트)"""
+        columns = {f: int(a.nbytes) for f, a in self._floats.items()}
+        columns.update({f: col.nbytes for f, col in self._strings.items()})
+        columns.update({f: col.nbytes for f, col in self._categories.items()})
+        columns.update({f"{f}_normalized": col.nbytes for f, col in self._normalized.items()})
+        return {"rows": self.n_rows, "total_bytes": sum(columns.values()), "columns": columns}
+
+    def stats(self) -> Dict:
+        footprint = self.memory_footprint()
+        return {
+            "rows": footprint["rows"],
+            "total_bytes": footprint["total_bytes"],
+            "bytes_per_row": round(footprint["total_bytes"] / self.n_rows, 1) if self.n_rows else 0.0,
+            "loaded_from": self.loaded_from,
+            "load_ms": self.load_ms,
+        }
+
+    @classmethod
+    def empty(cls) -> "PoiStore":
+        return cls.from_rows([])
+
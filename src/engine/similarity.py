@@ -0,0 +1,107 @@
+"""
+GeoHarness: Name Similarity Engine
+
+POI 이름 유사도(정규화 후 SequenceMatcher.ratio)를 빠르게 계산합니다.
+
+- 정규화 정규식은 모듈 로드 시 1회 컴파일
+- 데이터셋 이름은 생성 시 1회 정규화 + 길이/문자 빈도 사전 계산
+- cutoff가 주어지면 값싼 상한으로 채점 전에 후보를 제외
+    길이 상한:  ratio ≤ 2·min(|q|, |n|) / (|q| + |n|)
+    문자 상한:  ratio ≤ 2·|문자 다중집합 교집합| / (|q| + |n|)   (difflib quick_ratio와 같은 값)
+- cutoff 이상인 점수는 기존 name_similarity와 비트 단위로 같고, 미만은 0.0으로 보고
+
+SequenceMatcher.ratio는 인자 순서에 따라 값이 달라질 수 있으므로
+항상 (질의, 데이터셋 이름) 순서로 계산합니다 (기존 name_similarity(query, name)와 동일).
+
+사용법:
+    engine = SimilarityEngine(row["poi_name"] for row in rows)
+    scores = engine.score_many("하이라인 카페", cutoff=0.4)   # shape (len(rows),)
+"""
+
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+_HTML_TAG = re.compile(r"<[^>]+>")
+_NON_WORD = re.compile(r"[^\w가-힣a-zA-Z0-9]")
+
+
+def normalize_name(s: str) -> str:
+    """HTML 태그·기호 제거 후 소문자 (이름 유사도 비교 기준 문자열)"""
+    s = _HTML_TAG.sub("", s)
+    s = _NON_WORD.sub("", s)
+    return s.lower().strip()
+
+
+def ratio(a_norm: str, b_norm: str) -> float:
+    """정규화된 두 이름의 유사도 (빈 문자열이면 0)"""
+    if not a_norm or not b_norm:
+        return 0.0
+    return SequenceMatcher(None, a_norm, b_norm).ratio()
+
+
+def name_similarity(a: str, b: str) -> float:
+    """한/영 정규화 후 유사도 계산 (0~1)"""
+    return ratio(normalize_name(a), normalize_name(b))
+
+
+class SimilarityEngine:
+    def __init__(self, names: Iterable[str], normalized: bool = False):
+        self.names: List[str] = [n if normalized else normalize_name(n or "") for n in names]
+        self.lengths = np.array([len(n) for n in self.names], dtype=np.int32)
+        self._counts = [Counter(n) for n in self.names]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def score(self, query_norm: str, i: int) -> float:
+        """정규화된 질의와 i번째 이름의 정확한 유사도"""
+        return ratio(query_norm, self.names[i])
+
+    def score_many(
+        self,
+        query: str,
+        indices: Optional[Sequence[int]] = None,
+        cutoff: float = 0.0,
+        normalized: bool = False,
+    ) -> np.ndarray:
+        """
+        질의 1개 대 여러 이름 유사도
+
+        Args:
+            indices: 채점할 이름 번호 (None이면 전체)
+            cutoff: 이 값 미만으로 판명된 후보는 SequenceMatcher 없이 0.0
+            normalized: query가 이미 정규화된 문자열이면 True
+
+        Returns:
+            indices 순서대로의 점수 배열
+        """
+        q = query if normalized else normalize_name(query)
+        idx = np.arange(len(self.names)) if indices is None else np.asarray(indices, dtype=np.int64)
+        scores = np.zeros(len(idx))
+        if not q or len(idx) == 0:
+            return scores
+
+        lq = len(q)
+        lengths = self.lengths[idx]
+        todo = np.flatnonzero(lengths > 0)
+        if cutoff > 0:
+            length_bound = 2.0 * np.minimum(lengths[todo], lq) / (lengths[todo] + lq)
+            todo = todo[length_bound >= cutoff]
+
+        q_counts = Counter(q) if cutoff > 0 else None
+        names = self.names
+        for j in todo:
+            i = int(idx[j])
+            if q_counts is not None:
+                counts = self._counts[i]
+                common = sum(min(c, counts[ch]) for ch, c in q_counts.items() if ch in counts)
+                if 2.0 * common / (lengths[j] + lq) < cutoff:
+                    continue
+            scores[j] = SequenceMatcher(None, q, names[i]).ratio()
+        if cutoff > 0:
+            scores[scores < cutoff] = 0.0
+        return scores
@@ -0,0 +1,154 @@
+"""
+GeoHarness: Spatial Indexes
+
+AnchorIndex: 기준점(VWorld anchor) 집합을 BallTree(haversine)로 한 번만 색인하고,
+학습(ml/advanced_trainer.py)과 추론(engine/inference.py)이 같은
+k-최근접 질의 경로를 사용하도록 합니다.
+
+기준점이 수천 개로 늘어나도 좌표당 O(log A)로 가장 가까운 k개를 찾습니다.
+(기존: 모든 기준점과의 거리 계산 후 전체 정렬, O(A log A))
+
+GridIndex: POI 좌표를 고정 크기 위경도 격자 버킷에 담아 반경 질의를 합니다.
+(api/search.py CSV 폴백이 Google 좌표 주변 행만 이름 채점하도록)
+
+사용법:
+    from engine.spatial import AnchorIndex, GridIndex
+
+    index = AnchorIndex(anchors)                 # [{"lat": ..., "lng": ...}, ...]
+    features = index.triangulation_features(lats, lngs)
+    # → shape (n, 6): [d1, b1, d2, b2, d3, b3]
+
+    grid = GridIndex(lats, lngs)                 # NaN 좌표는 색인하지 않음
+    rows = grid.within(37.5445, 127.0567, radius_m=300)
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000
+N_NEAREST = 3
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """두 WGS84 좌표 간 거리 (미터) — NumPy 브로드캐스팅 지원"""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = np.radians(lat2 - lat1)
+    dlam = np.radians(lng2 - lng1)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def bearing(lat1, lng1, lat2, lng2):
+    """두 좌표 사이의 방위각 (degrees) — NumPy 브로드캐스팅 지원"""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dlam = np.radians(lng2 - lng1)
+    x = np.sin(dlam) * np.cos(phi2)
+    y = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(dlam)
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360
+
+
+class AnchorIndex:
+    """
+    기준점 k-최근접 색인 (sklearn BallTree, haversine metric)
+
+    pickle 가능하므로 decoder.pkl 번들에 그대로 저장됩니다.
+    """
+
+    def __init__(self, anchors: List[Dict]):
+        from sklearn.neighbors import BallTree
+
+        self.lat = np.array([a["lat"] for a in anchors], dtype=np.float64)
+        self.lng = np.array([a["lng"] for a in anchors], dtype=np.float64)
+        self._tree = None
+        if len(anchors) > 0:
+            self._tree = BallTree(np.radians(np.column_stack([self.lat, self.lng])), metric="haversine")
+
+    def __len__(self) -> int:
+        return self.lat.shape[0]
+
+    def query(self, lats, lngs, k: int = N_NEAREST) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        가장 가까운 기준점 k개 조회
+
+        Returns:
+            (dist_m, idx) — 각 shape (n, k), 거리 오름차순
+        """
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lngs = np.asarray(lngs, dtype=np.float64).ravel()
+        if self._tree is None or len(self) < k:
+            raise ValueError(f"AnchorIndex has {len(self)} anchors, {k} requested")
+
+        _, idx = self._tree.query(np.radians(np.column_stack([lats, lngs])), k=k)
+        # 거리는 기존 haversine 공식으로 다시 계산 (학습 feature와 동일한 수치)
+        dist = haversine_m(lats[:, None], lngs[:, None], self.lat[idx], self.lng[idx])
+        return dist, idx
+
+    def triangulation_features(self, lats, lngs, k: int = N_NEAREST) -> np.ndarray:
+        """
+        가장 가까운 기준점 k개까지의 (거리, 방향각) feature
+
+        Returns:
+            shape (n, 2k) — [d1, b1, d2, b2, ...]. 기준점이 k개 미만이면 0으로 채움
+        """
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lngs = np.asarray(lngs, dtype=np.float64).ravel()
+        features = np.zeros((lats.shape[0], 2 * k))
+        if len(self) < k:
+            return features
+
+        dist, idx = self.query(lats, lngs, k)
+        features[:, 0::2] = dist
+        features[:, 1::2] = bearing(lats[:, None], lngs[:, None], self.lat[idx], self.lng[idx])
+        return features
+
+
+class GridIndex:
+    """
+    위경도 격자 버킷 반경 색인
+
+    각 점을 (floor(lat / cell_deg), floor(lng / cell_deg)) 셀에 담고,
+    질의 반경을 덮는 셀들의 점만 haversine으로 정확히 거리 필터링합니다.
+    셀 크기는 자주 쓰는 반경과 비슷하게 두면 질의당 몇 개 셀만 확인합니다.
+    """
+
+    def __init__(self, lats, lngs, cell_deg: float = 0.005):
+        self.lat = np.asarray(lats, dtype=np.float64).ravel()
+        self.lng = np.asarray(lngs, dtype=np.float64).ravel()
+        self.cell_deg = cell_deg
+
+        valid = np.flatnonzero(np.isfinite(self.lat) & np.isfinite(self.lng))
+        cy = np.floor(self.lat[valid] / cell_deg).astype(np.int64)
+        cx = np.floor(self.lng[valid] / cell_deg).astype(np.int64)
+        order = np.lexsort((valid, cx, cy))
+        keys = np.column_stack([cy[order], cx[order]])
+        ids = valid[order]
+        self._cells: Dict[Tuple[int, int], np.ndarray] = {}
+        if len(ids):
+            breaks = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for start, end in zip(np.r_[0, breaks], np.r_[breaks, len(ids)]):
+                self._cells[(int(keys[start, 0]), int(keys[start, 1]))] = ids[start:end]
+        self.n_indexed = len(ids)
+
+    def __len__(self) -> int:
+        return self.n_indexed
+
+    def within(self, lat: float, lng: float, radius_m: float) -> np.ndarray:
+        """(lat, lng)에서 radius_m 이내 점의 번호 (오름차순)"""
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        dlng = dlat / max(math.cos(math.radians(lat)), 1e-6)
+        y0, y1 = math.floor((lat - dlat) / self.cell_deg), math.floor((lat + dlat) / self.cell_deg)
+        x0, x1 = math.floor((lng - dlng) / self.cell_deg), math.floor((lng + dlng) / self.cell_deg)
+
+        buckets = [
+            self._cells[(y, x)]
+            for y in range(y0, y1 + 1)
+            for x in range(x0, x1 + 1)
+            if (y, x) in self._cells
+        ]
+        if not buckets:
+            return np.empty(0, dtype=np.int64)
+        ids = np.concatenate(buckets)
+        dist = haversine_m(lat, lng, self.lat[ids], self.lng[ids])
+        return np.sort(ids[dist <= radius_m])
@@ -8,6 +8,7 @@ GeoHarness v4.0: Advanced Scikit-Learn Spatial Offset Trainer (CPU Optimized)
 특징:
 1. Feature Engineering: 
    - H3 / Geohash 대신 가장 가까운 3개의 가상 앵커 포인트와의 상대적 거리/방위각을 모두 Feature로 계산합니다. (공간 삼각 측량망 형성)
+   - 앵커 집합은 AnchorIndex(BallTree)로 색인하여 번들에 함께 저장합니다. (추론과 동일한 k-NN 경로)
 2. Ensemble Architecture:
    - 메모리/속도 최적화를 위해 Random Forest와 HistGradientBoosting을 결합하여 Bias-Variance 트레이드오프를 맞춥니다.
 3. K-Fold Cross Validation:
@@ -23,6 +24,10 @@ from pathlib import Path
 import pandas as pd
 import numpy as np
 
+from engine.compiled import compile_bundle
+from ml.compile_decoder import verify_compiled
+from engine.spatial import AnchorIndex
+
 try:
     from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor, VotingRegressor
     from sklearn.model_selection import KFold, train_test_split
@@ -66,41 +71,22 @@ def load_vworld_anchors(anchors_path: str):
             })
     return anchors
 
-def generate_triangulation_features(df: pd.DataFrame, anchors: list):
+def generate_triangulation_features(df: pd.DataFrame, anchor_index: AnchorIndex):
     """
     각 위치에서 가장 가까운 3개의 앵커와의 거리, 방위각을 Feature로 추출
+
+    추론(engine/inference.py)과 동일한 AnchorIndex k-최근접 질의를 사용합니다.
     """
-    if not anchors or len(anchors) < 3:
+    if anchor_index is None or len(anchor_index) < 3:
         logger.warning("Not enough anchors for 3-point triangulation. Only using lat/lng features.")
         return df
 
-    # Vectorized Haversine/Bearing can be faster, but for 4000 rows, iteration is fine.
-    dist_1, bear_1 = [], []
-    dist_2, bear_2 = [], []
-    dist_3, bear_3 = [], []
+    features = anchor_index.triangulation_features(df['g_lat'].values, df['g_lng'].values)
+
+    df['anchor1_dist'] = features[:, 0]; df['anchor1_bear'] = features[:, 1]
+    df['anchor2_dist'] = features[:, 2]; df['anchor2_bear'] = features[:, 3]
+    df['anchor3_dist'] = features[:, 4]; df['anchor3_bear'] = features[:, 5]
 
-    for _, row in df.iterrows():
-        lat, lng = row['g_lat'], row['g_lng']
-        
-        # Calculate all distances and bearings to all anchors
-        relations = []
-        for anchor in anchors:
-            d = haversine_distance(lat, lng, anchor['lat'], anchor['lng'])
-            b = bearing(lat, lng, anchor['lat'], anchor['lng'])
-            relations.append((d, b))
-        
-        # Sort by distance
-        relations.sort(key=lambda x: x[0])
-        
-        # Take Top 3 closest anchors
-        dist_1.append(relations[0][0]); bear_1.append(relations[0][1])
-        dist_2.append(relations[1][0]); bear_2.append(relations[1][1])
-        dist_3.append(relations[2][0]); bear_3.append(relations[2][1])
-        
-    df['anchor1_dist'] = dist_1; df['anchor1_bear'] = bear_1
-    df['anchor2_dist'] = dist_2; df['anchor2_bear'] = bear_2
-    df['anchor3_dist'] = dist_3; df['anchor3_bear'] = bear_3
-    
     return df
 
 def build_ensemble_model():
@@ -156,7 +142,8 @@ def train_advanced_model(
 
     logger.info("[2/5] Engineering Geometric Features...")
     anchors = load_vworld_anchors(anchors_path)
-    df = generate_triangulation_features(df, anchors)
+    anchor_index = AnchorIndex(anchors)
+    df = generate_triangulation_features(df, anchor_index)
     
     # Select features dynamically based on what was generated
     feature_cols = ['g_lat', 'g_lng']
@@ -210,12 +197,25 @@ def train_advanced_model(
         "model_y": final_model_y,
         "feature_cols": feature_cols,
         "anchors": anchors,
+        "anchor_index": anchor_index,
         "n_samples": len(df),
+        # 격자 빌드(ml/build_lattice.py)용 학습 영역 (min_lat, min_lng, max_lat, max_lng)
+        "training_bounds": (
+            float(df["g_lat"].min()), float(df["g_lng"].min()),
+            float(df["g_lat"].max()), float(df["g_lng"].max()),
+        ),
         "rmse_x": float(np.mean(cv_rmse_x)),
         "rmse_y": float(np.mean(cv_rmse_y)),
         "gpu_trained": False,
         "method": "Ensemble(RF+HistGB)"
     }
+    # 추론용 평탄화 트리 배열 (engine/compiled.py) — 학습 특징 전체에서 sklearn predict와
+    # 비트 단위로 같을 때만 저장. 다르면 로드 시 재생성도 막고 sklearn predict만 사용
+    compile_bundle(bundle)
+    if not verify_compiled(bundle, X):
+        logger.warning("Saving without bundle['compiled'] — inference falls back to sklearn predict")
+        del bundle["compiled"]
+        bundle["compiled_mismatch"] = True
     
     with open(output_model_path, 'wb') as f:
         pickle.dump(bundle, f)
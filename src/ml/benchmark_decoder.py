@@ -0,0 +1,88 @@
+"""
+GeoHarness: Decoder Inference Benchmark
+
+단건(/api/v1/search 경로) 및 배치 추론에서 sklearn predict와
+평탄화 트리 평가기(engine/compiled.py)의 호출당 지연 시간을 비교합니다.
+
+사용법:
+    PYTHONPATH=src python src/ml/benchmark_decoder.py
+    PYTHONPATH=src python src/ml/benchmark_decoder.py --calls 500 --batch 10000
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine.inference import _build_features, _prepare_bundle
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("DecoderBenchmark")
+
+
+def _time_per_call(fn, rows: np.ndarray) -> float:
+    """rows 각각에 대해 fn(1-row X) 호출, 호출당 평균 초"""
+    start = time.perf_counter()
+    for i in range(rows.shape[0]):
+        fn(rows[i:i + 1])
+    return (time.perf_counter() - start) / rows.shape[0]
+
+
+def run_benchmark(model_path: str, dataset_path: str, n_calls: int, batch_size: int):
+    import joblib
+
+    bundle = _prepare_bundle(joblib.load(model_path))
+    compiled = bundle.get("compiled")
+    if compiled is None:
+        logger.error("Bundle could not be compiled — nothing to compare.")
+        return
+
+    df = pd.read_csv(dataset_path)
+    X = _build_features(bundle, df["g_lat"].values, df["g_lng"].values)
+    rows = X[np.resize(np.arange(X.shape[0]), n_calls)]
+
+    def sklearn_predict(x):
+        return bundle["model_x"].predict(x), bundle["model_y"].predict(x)
+
+    # warm-up (joblib 스레드풀, 캐시)
+    sklearn_predict(rows[:1])
+    compiled.predict(rows[:1])
+
+    sk_single = _time_per_call(sklearn_predict, rows)
+    c_single = _time_per_call(compiled.predict, rows)
+
+    big = X[np.resize(np.arange(X.shape[0]), batch_size)]
+    start = time.perf_counter()
+    sk_out = sklearn_predict(big)
+    sk_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    c_out = compiled.predict(big)
+    c_batch = time.perf_counter() - start
+
+    exact = all(np.array_equal(a, b) for a, b in zip(sk_out, c_out))
+
+    logger.info(f"Trees: {compiled.n_trees} (max depth {compiled.max_depth})")
+    logger.info(f"Single-row ({n_calls} calls, x+y):")
+    logger.info(f"  sklearn  : {sk_single * 1e6:9.1f} µs/call")
+    logger.info(f"  compiled : {c_single * 1e6:9.1f} µs/call  → {sk_single / c_single:.1f}x")
+    logger.info(f"Batch ({batch_size} rows, x+y):")
+    logger.info(f"  sklearn  : {sk_batch * 1e3:9.1f} ms")
+    logger.info(f"  compiled : {c_batch * 1e3:9.1f} ms  → {sk_batch / c_batch:.1f}x")
+    logger.info(f"Bit-exact: {exact}")
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+
+    parser = argparse.ArgumentParser(description="Benchmark sklearn vs compiled decoder inference")
+    parser.add_argument("--model", default=os.path.join(project_root, "src", "models", "decoder.pkl"))
+    parser.add_argument("--dataset", default=os.path.join(project_root, "data", "ml_dataset.csv"))
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    run_benchmark(args.model, args.dataset, args.calls, args.batch)
@@ -0,0 +1,95 @@
+"""
+GeoHarness: Name Similarity Benchmark
+
+질의 1개를 데이터셋 전체 이름(poi_name, n_name)과 비교하는 비용을
+기존 name_similarity 반복 호출(매번 정규화 + 전체 ratio)과
+engine/similarity.py SimilarityEngine.score_many(사전 정규화 + 상한 cutoff)로 비교합니다.
+
+cutoff 이상인 점수가 기존 함수와 정확히 같은지도 함께 확인합니다.
+
+사용법:
+    PYTHONPATH=src python src/ml/benchmark_similarity.py
+    PYTHONPATH=src python src/ml/benchmark_similarity.py --queries 50 --cutoff 0.4
+"""
+
+import argparse
+import csv
+import logging
+import os
+import random
+import re
+import time
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from engine.similarity import SimilarityEngine
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("SimilarityBenchmark")
+
+
+def legacy_name_similarity(google_name: str, naver_name: str) -> float:
+    """기존 api/search.py 구현 (기준)"""
+    def normalize(s: str) -> str:
+        s = re.sub(r"<[^>]+>", "", s)
+        s = re.sub(r"[^\w가-힣a-zA-Z0-9]", "", s)
+        return s.lower().strip()
+
+    g = normalize(google_name)
+    n = normalize(naver_name)
+    if not g or not n:
+        return 0.0
+    return SequenceMatcher(None, g, n).ratio()
+
+
+def run_benchmark(dataset_path: str, n_queries: int, cutoff: float, seed: int):
+    with open(dataset_path, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    names = [row.get("poi_name", "") for row in rows] + [row.get("n_name", "") for row in rows]
+
+    random.seed(seed)
+    queries = [random.choice(rows)["poi_name"] + " 성수동" for _ in range(n_queries)]
+
+    start = time.perf_counter()
+    engine = SimilarityEngine(names)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = [np.array([legacy_name_similarity(q, n) for n in names]) for q in queries]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact = [engine.score_many(q) for q in queries]
+    exact_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pruned = [engine.score_many(q, cutoff=cutoff) for q in queries]
+    pruned_s = time.perf_counter() - start
+
+    identical = all(np.array_equal(a, b) for a, b in zip(legacy, exact))
+    identical_cut = all(
+        np.array_equal(np.where(a >= cutoff, a, 0.0), b) for a, b in zip(legacy, pruned)
+    )
+
+    per_q = 1e3 / n_queries
+    logger.info(f"Names: {len(names)} ({len(rows)} rows × poi_name/n_name), queries: {n_queries}")
+    logger.info(f"Engine build (normalize + char counts): {build_s * 1e3:.1f} ms")
+    logger.info(f"  legacy name_similarity   : {legacy_s * per_q:9.2f} ms/query")
+    logger.info(f"  engine (no cutoff)       : {exact_s * per_q:9.2f} ms/query  → {legacy_s / exact_s:.1f}x")
+    logger.info(f"  engine (cutoff {cutoff:.2f})     : {pruned_s * per_q:9.2f} ms/query  → {legacy_s / pruned_s:.1f}x")
+    logger.info(f"Identical scores: {identical} (all), {identical_cut} (≥ cutoff)")
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+
+    parser = argparse.ArgumentParser(description="Benchmark legacy name_similarity vs SimilarityEngine")
+    parser.add_argument("--dataset", default=os.path.join(project_root, "data", "ml_dataset.csv"))
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--cutoff", type=float, default=0.4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run_benchmark(args.dataset, args.queries, args.cutoff, args.seed)
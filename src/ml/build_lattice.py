@@ -0,0 +1,89 @@
+"""
+GeoHarness: Offset Lattice Builder
+
+decoder.pkl을 학습 영역 전체의 EPSG:5179 정규 격자 위에서 평가하여
+delta_x / delta_y 필드를 decoder.lattice.npy (mmap 로드용)로 저장합니다.
+런타임에는 predict_offset(..., method="lattice")가 쌍선형 보간으로 응답합니다.
+
+빌드 후 셀 중심점에서 모델 값과 보간 값을 비교해 최대 보간 오차를 보고합니다.
+모델(decoder.pkl)을 교체하면 격자를 다시 빌드해야 합니다. (버전 불일치 시 무시됨)
+
+사용법:
+    PYTHONPATH=src python src/ml/build_lattice.py --resolution 5
+    PYTHONPATH=src python src/ml/build_lattice.py --resolution 2 --margin 200
+"""
+
+import argparse
+import logging
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from engine.inference import _build_features, _file_version, _predict_deltas, _prepare_bundle
+from engine.lattice import OffsetLattice, lattice_paths
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("LatticeBuilder")
+
+
+def _training_bounds(bundle: dict, dataset_path: str):
+    """(min_lat, min_lng, max_lat, max_lng) — 번들에 없으면 학습 CSV에서 계산"""
+    if bundle.get("training_bounds"):
+        return tuple(float(v) for v in bundle["training_bounds"])
+    df = pd.read_csv(dataset_path, usecols=["g_lat", "g_lng"])
+    return (
+        float(df["g_lat"].min()), float(df["g_lng"].min()),
+        float(df["g_lat"].max()), float(df["g_lng"].max()),
+    )
+
+
+def build_lattice(model_path: str, dataset_path: str, resolution_m: float = 5.0, margin_m: float = 100.0) -> dict:
+    import joblib
+
+    bundle = _prepare_bundle(joblib.load(model_path))
+
+    def predict_fn(lats, lngs):
+        return _predict_deltas(bundle, _build_features(bundle, lats, lngs))
+
+    bounds = _training_bounds(bundle, dataset_path)
+    grid = OffsetLattice.grid_for_bounds(bounds, resolution_m, margin_m)
+    logger.info(
+        f"[1/3] Grid {grid['nx']}x{grid['ny']} ({grid['nx'] * grid['ny']:,} nodes) "
+        f"@ {resolution_m}m over bounds {bounds}"
+    )
+
+    start = time.perf_counter()
+    lattice = OffsetLattice.build(predict_fn, grid)
+    logger.info(f"[2/3] Evaluated decoder on lattice in {time.perf_counter() - start:.1f}s")
+
+    error = lattice.max_interpolation_error(predict_fn)
+    logger.info(
+        f"[3/3] Interpolation error vs model ({error['n_samples']:,} cell centers): "
+        f"max {error['max_error_m']:.3f}m, mean {error['mean_error_m']:.3f}m"
+    )
+
+    lattice.meta.update({
+        "model_version": _file_version(Path(model_path)),
+        "bounds": list(bounds),
+        "interpolation_error": error,
+    })
+    npy_path, meta_path = lattice_paths(model_path)
+    lattice.save(npy_path, meta_path)
+    logger.info(f"✅ Lattice written to {npy_path} ({lattice.fields.nbytes / 1e6:.1f} MB)")
+    return error
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+
+    parser = argparse.ArgumentParser(description="Precompute the decoder offset lattice")
+    parser.add_argument("--model", default=os.path.join(project_root, "src", "models", "decoder.pkl"))
+    parser.add_argument("--dataset", default=os.path.join(project_root, "data", "ml_dataset.csv"))
+    parser.add_argument("--resolution", type=float, default=5.0, help="grid spacing in meters (EPSG:5179)")
+    parser.add_argument("--margin", type=float, default=100.0, help="padding around the training area in meters")
+    args = parser.parse_args()
+
+    build_lattice(args.model, args.dataset, args.resolution, args.margin)
@@ -0,0 +1,76 @@
+"""
+GeoHarness: decoder.pkl Tree Compiler (Export Step)
+
+기존 decoder.pkl 번들의 model_x / model_y 트리를 NumPy 노드 배열로
+평탄화하여 bundle["compiled"]에 저장합니다. (engine/compiled.py)
+저장 전에 학습 데이터 전체에 대해 sklearn predict와 비트 단위로 같은지 검증합니다.
+
+사용법:
+    PYTHONPATH=src python src/ml/compile_decoder.py
+    PYTHONPATH=src python src/ml/compile_decoder.py --model src/models/decoder.pkl
+"""
+
+import argparse
+import logging
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from engine.compiled import compile_bundle
+from engine.inference import _build_features, _ensure_anchor_index
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("DecoderCompiler")
+
+
+def verify_compiled(bundle: dict, X: np.ndarray) -> bool:
+    """평탄화 트리 예측이 sklearn predict와 비트 단위로 같은지 확인"""
+    dx, dy = bundle["compiled"].predict(X)
+    sx = bundle["model_x"].predict(X)
+    sy = bundle["model_y"].predict(X)
+    mismatches = int(np.count_nonzero(dx != sx) + np.count_nonzero(dy != sy))
+    if mismatches:
+        logger.error(
+            f"Compiled output differs from sklearn on {mismatches} values "
+            f"(max |Δ| x={np.abs(dx - sx).max():.3e}, y={np.abs(dy - sy).max():.3e})"
+        )
+        return False
+    logger.info(f"Bit-exact on {X.shape[0]} samples")
+    return True
+
+
+def compile_decoder(model_path: str, dataset_path: str) -> bool:
+    import joblib
+
+    bundle = _ensure_anchor_index(joblib.load(model_path))
+    compile_bundle(bundle)
+    compiled = bundle["compiled"]
+    logger.info(
+        f"Flattened {compiled.n_trees} trees, max depth {compiled.max_depth}, "
+        f"{compiled.nbytes / 1024:.1f} KiB of node arrays"
+    )
+
+    df = pd.read_csv(dataset_path)
+    X = _build_features(bundle, df["g_lat"].values, df["g_lng"].values)
+    if not verify_compiled(bundle, X):
+        logger.error("Not saving — keep using sklearn predict for this bundle.")
+        return False
+
+    with open(model_path, "wb") as f:
+        pickle.dump(bundle, f)
+    logger.info(f"✅ Compiled decoder written to {model_path}")
+    return True
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+
+    parser = argparse.ArgumentParser(description="Flatten decoder.pkl trees into NumPy node arrays")
+    parser.add_argument("--model", default=os.path.join(project_root, "src", "models", "decoder.pkl"))
+    parser.add_argument("--dataset", default=os.path.join(project_root, "data", "ml_dataset.csv"))
+    args = parser.parse_args()
+
+    compile_decoder(args.model, args.dataset)
@@ -15,11 +15,13 @@ import urllib.parse
 from pathlib import Path
 from typing import List, Dict
 
-import aiohttp
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from shared.config import settings
+from shared.constants import GOOGLE_RESULTS_PER_QUERY
+from shared.http import http_pool
+from shared.scheduler import BATCH, priority_scope
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("DatasetGenerator")
@@ -31,8 +33,8 @@ headers = {
 }
 
 
-async def fetch_poi_data_google(session: aiohttp.ClientSession, region_keyword: str) -> List[Dict]:
-    """Fetch WGS84 coordinates using Google Places Text Search API"""
+async def fetch_poi_data_google(region_keyword: str) -> List[Dict]:
+    """Fetch WGS84 coordinates using Google Places Text Search API (공유 HTTP 풀: 타임아웃 + 재시도)"""
     if not settings.GOOGLE_MAPS_KEY or settings.GOOGLE_MAPS_KEY.startswith("your-"):
         logger.warning("GOOGLE_MAPS_KEY is missing or invalid. Skipping Google extraction.")
         return []
@@ -40,28 +42,30 @@ async def fetch_poi_data_google(session: aiohttp.ClientSession, region_keyword:
     url = f"https://maps.googleapis.com/maps/api/place/textsearch/json?query={urllib.parse.quote(region_keyword)}&region=kr&language=ko&key={settings.GOOGLE_MAPS_KEY}"
     
     try:
-        async with session.get(url) as response:
-            data = await response.json()
-            if "error_message" in data:
-                logger.error(f"[Google] API Error: {data['error_message']}")
-            
-            pois = []
-            for place in data.get("results", []):
-                pois.append({
-                    "name": place.get("name", ""),
-                    "g_lat": place.get("geometry", {}).get("location", {}).get("lat", 0),
-                    "g_lng": place.get("geometry", {}).get("location", {}).get("lng", 0),
-                    "address": place.get("formatted_address", ""),
-                    "poi_type": place.get("types", ["unknown"])[0] if place.get("types") else "unknown"
-                })
-            logger.info(f"[Google] Found {len(pois)} POIs for '{region_keyword}'")
-            return pois
+        status, data = await http_pool.get_json("google", url, hedge=False)
+        data = data or {}
+        if status != 200:
+            logger.error(f"[Google] HTTP {status} for '{region_keyword}'")
+        if "error_message" in data:
+            logger.error(f"[Google] API Error: {data['error_message']}")
+        
+        pois = []
+        for place in data.get("results", [])[:GOOGLE_RESULTS_PER_QUERY]:
+            pois.append({
+                "name": place.get("name", ""),
+                "g_lat": place.get("geometry", {}).get("location", {}).get("lat", 0),
+                "g_lng": place.get("geometry", {}).get("location", {}).get("lng", 0),
+                "address": place.get("formatted_address", ""),
+                "poi_type": place.get("types", ["unknown"])[0] if place.get("types") else "unknown"
+            })
+        logger.info(f"[Google] Found {len(pois)} POIs for '{region_keyword}'")
+        return pois
     except Exception as e:
         logger.error(f"[Google] Error fetching POIs: {e}")
         return []
 
 
-async def fetch_poi_data_naver(session: aiohttp.ClientSession, keyword: str) -> Dict | None:
+async def fetch_poi_data_naver(keyword: str) -> Dict | None:
     """Fallback scraping for Naver Map search using the public autocomplete/search endpoint"""
     # Using the public mobile local search API which is less restrictive
     url = f"https://m.map.naver.com/search2/searchMore.naver?query={urllib.parse.quote(keyword)}&sm=hty&style=v5&page=1"
@@ -74,24 +78,25 @@ async def fetch_poi_data_naver(session: aiohttp.ClientSession, keyword: str) ->
             "Referer": "https://m.map.naver.com/"
         }
         
-        async with session.get(url, headers=custom_headers) as response:
-            if response.status != 200:
-                logger.warning(f"[Naver] Request failed for '{keyword}' with status: {response.status}")
-                return None
-            
-            # Naver mobile searchMore returns a JSON wrapped in a weird structure or just JSON
-            data = await response.json(content_type=None)
-            items = data.get("result", {}).get("site", {}).get("list", [])
-            if not items:
-                return None
-            
-            first_hit = items[0]
-            # m.map.naver.com usually returns x/y in 'x' and 'y' fields
-            return {
-                "n_name": first_hit.get("name"),
-                "n_lng": float(first_hit.get("x", 0)),
-                "n_lat": float(first_hit.get("y", 0))
-            }
+        # Naver mobile searchMore returns a JSON wrapped in a weird structure or just JSON
+        status, data = await http_pool.get_json(
+            "naver_web", url, headers=custom_headers, content_type=None, hedge=False,
+        )
+        if status != 200:
+            logger.warning(f"[Naver] Request failed for '{keyword}' with status: {status}")
+            return None
+        
+        items = data.get("result", {}).get("site", {}).get("list", [])
+        if not items:
+            return None
+        
+        first_hit = items[0]
+        # m.map.naver.com usually returns x/y in 'x' and 'y' fields
+        return {
+            "n_name": first_hit.get("name"),
+            "n_lng": float(first_hit.get("x", 0)),
+            "n_lat": float(first_hit.get("y", 0))
+        }
     except Exception as e:
         logger.error(f"[Naver] Error scraping POI '{keyword}': {e}")
         return None
@@ -107,9 +112,11 @@ async def build_google_base_dataset(regions: List[str], output_path: str = "data
     
     dataset = []
     
-    async with aiohttp.ClientSession() as session:
+    # Google 초당 한도는 shared/quota.py가 호출 시점에 맞춤 (고정 sleep 없음)
+    try:
         for region in regions:
-            google_pois = await fetch_poi_data_google(session, region)
+            with priority_scope(BATCH):
+                google_pois = await fetch_poi_data_google(region)
             
             for g_poi in google_pois:
                 dataset.append({
@@ -119,9 +126,8 @@ async def build_google_base_dataset(regions: List[str], output_path: str = "data
                     "poi_type": g_poi["poi_type"],
                     "search_region": region
                 })
-            
-            # Simple rate limiting for Google API
-            await asyncio.sleep(1.0)
+    finally:
+        await http_pool.close()
                 
     if not dataset:
         logger.warning("No Google data extracted successfully! Dataset is empty.")
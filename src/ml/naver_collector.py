@@ -18,14 +18,15 @@ API 신청:
 import asyncio
 import csv
 import logging
-import random
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-import aiohttp
 from dotenv import load_dotenv
 
 from shared.config import settings
+from shared.http import http_pool
+from shared.quota import QuotaExceeded, quotas
+from shared.scheduler import BATCH, priority_scope
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("NaverCollector")
@@ -33,10 +34,13 @@ logger = logging.getLogger("NaverCollector")
 load_dotenv()
 
 
-async def search_naver_local(session: aiohttp.ClientSession, query: str) -> Dict | None:
+async def search_naver_local(query: str) -> Dict | None:
     """
     NCP Geocoding API로 장소명 → WGS84 좌표 조회
 
+    공유 HTTP 풀(shared/http.py)의 NCP 타임아웃과 jitter 백오프 재시도를 사용합니다.
+    배치 수집이라 헤지 요청은 보내지 않습니다 (일일 호출 한도 보호).
+
     Returns: { n_name, n_lng (WGS84), n_lat (WGS84), n_address, n_road_address }
     """
     if not settings.NAVER_CLIENT_ID or settings.NAVER_CLIENT_ID.startswith("your-"):
@@ -54,26 +58,27 @@ async def search_naver_local(session: aiohttp.ClientSession, query: str) -> Dict
     params = {"query": query}
 
     try:
-        async with session.get(url, headers=headers, params=params) as response:
-            if response.status != 200:
-                logger.warning(f"[NCP] Geocoding failed for '{query}' with status: {response.status}")
-                return None
-
-            data = await response.json()
-            addresses = data.get("addresses", [])
-            if not addresses:
-                return None
-
-            first = addresses[0]
-            n_lng = float(first["x"])
-            n_lat = float(first["y"])
-            return {
-                "n_name": query,
-                "n_lng": n_lng,
-                "n_lat": n_lat,
-                "n_address": first.get("jibunAddress", ""),
-                "n_road_address": first.get("roadAddress", ""),
-            }
+        status, data = await http_pool.get_json("ncp", url, headers=headers, params=params, hedge=False)
+        if status != 200:
+            logger.warning(f"[NCP] Geocoding failed for '{query}' with status: {status}")
+            return None
+
+        addresses = data.get("addresses", [])
+        if not addresses:
+            return None
+
+        first = addresses[0]
+        n_lng = float(first["x"])
+        n_lat = float(first["y"])
+        return {
+            "n_name": query,
+            "n_lng": n_lng,
+            "n_lat": n_lat,
+            "n_address": first.get("jibunAddress", ""),
+            "n_road_address": first.get("roadAddress", ""),
+        }
+    except QuotaExceeded:
+        raise
     except Exception as e:
         logger.error(f"[NCP] Error geocoding '{query}': {e}")
         return None
@@ -105,36 +110,56 @@ async def build_naver_paired_dataset(
 
     logger.info(f"Loaded {len(google_pois)} Google POIs from {google_csv_path}")
 
+    # 남은 일일 한도만큼만 처리 (나머지는 한도 초기화 후 다시 실행)
+    await quotas.ensure_loaded()
+    capacity = (quotas.remaining("ncp") or {}).get("daily_remaining")
+    if capacity is not None and capacity < len(google_pois):
+        logger.warning(f"NCP daily quota allows {capacity} more calls — processing {capacity}/{len(google_pois)} POIs")
+        google_pois = google_pois[:capacity]
+
+    # 초당 한도는 shared/quota.py가 맞춤 (호출 사이 고정 sleep 없이 허용 속도로 동시 실행)
+    results: List[Optional[Dict]] = [None] * len(google_pois)
+    sem = asyncio.Semaphore(settings.COLLECTOR_CONCURRENCY)
+    processed = 0
+
+    async def collect(i: int, poi: Dict):
+        nonlocal processed
+        # Use the POI name + region context for better matching
+        region_prefix = poi["search_region"].split(" ")[0]
+        async with sem:
+            results[i] = await search_naver_local(f"{region_prefix} {poi['poi_name']}")
+        processed += 1
+        if processed % 20 == 0:
+            matched = sum(1 for r in results if r)
+            logger.info(f"  Processed {processed}/{len(google_pois)} — matched: {matched}")
+
+    # batch 우선순위: 같은 키를 쓰는 라이브 API 호출에 슬롯/속도를 양보
+    try:
+        with priority_scope(BATCH):
+            async with asyncio.TaskGroup() as tg:
+                for i, poi in enumerate(google_pois):
+                    tg.create_task(collect(i, poi))
+    except* QuotaExceeded as eg:
+        logger.warning(f"Stopping early: {eg.exceptions[0]}")
+    finally:
+        await http_pool.close()
+
     dataset = []
     matched_count = 0
-
-    async with aiohttp.ClientSession() as session:
-        for i, poi in enumerate(google_pois):
-            # Use the POI name + region context for better matching
-            region_prefix = poi["search_region"].split(" ")[0]
-            search_query = f"{region_prefix} {poi['poi_name']}"
-
-            naver_result = await search_naver_local(session, search_query)
-
-            if naver_result and naver_result["n_lat"] and naver_result["n_lng"]:
-                dataset.append({
-                    "poi_name": poi["poi_name"],
-                    "g_lat": float(poi["g_lat"]),
-                    "g_lng": float(poi["g_lng"]),
-                    "n_lat": naver_result["n_lat"],
-                    "n_lng": naver_result["n_lng"],
-                    "n_name": naver_result["n_name"],
-                    "n_address": naver_result["n_address"],
-                    "poi_type": poi["poi_type"],
-                    "search_region": poi["search_region"],
-                })
-                matched_count += 1
-
-            # Rate limiting (Naver API: 25,000 calls/day)
-            await asyncio.sleep(random.uniform(0.3, 0.8))
-
-            if (i + 1) % 20 == 0:
-                logger.info(f"  Processed {i + 1}/{len(google_pois)} — matched: {matched_count}")
+    for poi, naver_result in zip(google_pois, results):
+        if naver_result and naver_result["n_lat"] and naver_result["n_lng"]:
+            dataset.append({
+                "poi_name": poi["poi_name"],
+                "g_lat": float(poi["g_lat"]),
+                "g_lng": float(poi["g_lng"]),
+                "n_lat": naver_result["n_lat"],
+                "n_lng": naver_result["n_lng"],
+                "n_name": naver_result["n_name"],
+                "n_address": naver_result["n_address"],
+                "poi_type": poi["poi_type"],
+                "search_region": poi["search_region"],
+            })
+            matched_count += 1
 
     if dataset:
         with open(output_path, 'w', newline='', encoding='utf-8') as f:
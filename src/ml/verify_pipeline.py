@@ -0,0 +1,277 @@
+"""
+GeoHarness: Resumable POI Verification Pipeline
+
+POI 기준 파일(google_poi_base.csv) 전체를 /search·/verify/batch와 같은 장소별 판정
+(Naver 검색 → classify_poi_status → ML 보정, api/batch_verify.py)으로 검증합니다.
+
+- 동시 판정 수: --concurrency (업스트림 호출은 batch 우선순위, 속도는 shared/quota.py가 맞춤)
+- 결과는 입력 순서대로 --output CSV에 이어 씀 (완료 순서가 달라도 순서 버퍼에서 정렬)
+- --checkpoint-every 건마다 체크포인트(다음 입력 행, 출력 파일 크기) 저장
+  → 중단/충돌 후 다시 실행하면 출력을 체크포인트 크기로 잘라내고 다음 행부터 이어감
+- Naver 일일 한도가 라이브 API 몫(BATCH_VERIFY_NAVER_RESERVE)까지 줄면 그 행 직전에서 멈춤
+  (폴백 판정으로 채우지 않음 — 한도 초기화 후 같은 명령으로 재개)
+- Naver 조회 실패(429/5xx, 타임아웃, 차단기 열림)도 그 행 직전에서 멈춤
+  (not_found로 기록하지 않음 — 체크포인트가 그 행을 가리키므로 재실행 시 다시 조회)
+- 끝나면 출력 파일 전체 기준 상태별 / poi_type별 통계를 로그와 <output>.summary.json으로 남김
+
+사용법:
+    PYTHONPATH=src python src/ml/verify_pipeline.py
+    PYTHONPATH=src python src/ml/verify_pipeline.py --concurrency 16 --checkpoint-every 200
+    PYTHONPATH=src python src/ml/verify_pipeline.py --restart        # 체크포인트 무시, 처음부터
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, Optional
+
+from dotenv import load_dotenv
+
+from api.batch_verify import _parse_poi, _verify_one
+from api.search import NaverLookupError
+from shared.config import settings
+from shared.http import http_pool
+from shared.quota import KST
+from shared.scheduler import BATCH, priority_scope
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("VerifyPipeline")
+
+load_dotenv()
+
+STATUSES = ("verified", "warning", "not_found")
+OUTPUT_FIELDS = [
+    "row", "poi_name", "g_lat", "g_lng", "poi_type", "search_region",
+    "status", "status_confidence", "status_reason", "naver_lookup",
+    "naver_name", "naver_category", "name_similarity",
+    "naver_lat", "naver_lng", "corrected_lat", "corrected_lng", "correction_distance_m",
+]
+
+
+def _output_row(row: int, poi: Dict, result: Dict, lookup: str) -> Dict:
+    naver = result.get("naver_location") or {}
+    return {
+        "row": row,
+        "poi_name": poi.get("poi_name", ""),
+        "g_lat": result["original"]["lat"],
+        "g_lng": result["original"]["lng"],
+        "poi_type": poi.get("poi_type", ""),
+        "search_region": poi.get("search_region", ""),
+        "status": result["status"],
+        "status_confidence": result["status_confidence"],
+        "status_reason": result["status_reason"],
+        "naver_lookup": lookup,
+        "naver_name": result.get("naver_name") or "",
+        "naver_category": result.get("naver_category") or "",
+        "name_similarity": result.get("name_similarity") if result.get("name_similarity") is not None else "",
+        "naver_lat": naver.get("lat", ""),
+        "naver_lng": naver.get("lng", ""),
+        "corrected_lat": result["corrected"]["lat"],
+        "corrected_lng": result["corrected"]["lng"],
+        "correction_distance_m": result["correction_distance_m"],
+    }
+
+
+def _sync(out) -> int:
+    """출력을 디스크까지 기록하고 파일 크기 반환 (체크포인트가 가리킬 위치)"""
+    out.flush()
+    os.fsync(out.fileno())
+    return os.fstat(out.fileno()).st_size
+
+
+def _load_checkpoint(path: Path, input_path: str) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("input") != os.path.abspath(input_path):
+        raise SystemExit(f"Checkpoint {path} belongs to {checkpoint.get('input')} — use --restart")
+    return checkpoint
+
+
+def _save_checkpoint(path: Path, input_path: str, next_row: int, output_bytes: int):
+    """임시 파일에 쓰고 교체 (중간에 죽어도 이전 체크포인트가 남음)"""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "input": os.path.abspath(input_path),
+            "next_row": next_row,
+            "output_bytes": output_bytes,
+            "updated_at": datetime.now(KST).isoformat(timespec="seconds"),
+        }, f)
+    os.replace(tmp, path)
+
+
+def summarize(output_path: str) -> Dict:
+    """출력 CSV 전체(이전 실행 포함) → 상태별 / poi_type별 통계 (한 줄씩 읽음)"""
+    by_status = {s: 0 for s in STATUSES}
+    by_type: Dict[str, Dict[str, int]] = {}
+    total = 0
+    with open(output_path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            total += 1
+            status = row["status"]
+            by_status[status] = by_status.get(status, 0) + 1
+            counts = by_type.setdefault(row["poi_type"] or "unknown", {s: 0 for s in STATUSES})
+            counts[status] = counts.get(status, 0) + 1
+
+    def rates(counts: Dict[str, int]) -> Dict:
+        n = sum(counts.values())
+        return {
+            "total": n,
+            **counts,
+            "not_found_pct": round(100 * counts.get("not_found", 0) / n, 1) if n else 0.0,
+        }
+
+    return {
+        "total": total,
+        "statuses": {s: {"count": c, "pct": round(100 * c / total, 1) if total else 0.0} for s, c in by_status.items()},
+        "poi_types": {t: rates(c) for t, c in sorted(by_type.items(), key=lambda kv: -sum(kv[1].values()))},
+    }
+
+
+def _log_summary(summary: Dict):
+    logger.info(f"[Summary] {summary['total']:,} POIs")
+    for status, s in summary["statuses"].items():
+        logger.info(f"  {status:<10} {s['count']:>6,}  ({s['pct']:.1f}%)")
+    logger.info(f"  {'poi_type':<16} {'total':>6} {'verified':>9} {'warning':>8} {'not_found':>10}")
+    for poi_type, t in summary["poi_types"].items():
+        logger.info(
+            f"  {poi_type:<16} {t['total']:>6,} {t['verified']:>9,} {t['warning']:>8,} "
+            f"{t['not_found']:>10,}  ({t['not_found_pct']:.1f}% not found)"
+        )
+
+
+async def run_pipeline(
+    input_path: str,
+    output_path: str,
+    checkpoint_path: Optional[str] = None,
+    concurrency: int = 8,
+    checkpoint_every: int = 100,
+    region: Optional[str] = None,
+    limit: Optional[int] = None,
+    restart: bool = False,
+) -> Dict:
+    """
+    Args:
+        region: Naver 검색어에 붙일 지역명 (None이면 행의 search_region 첫 단어, 예: "성수동 카페" → 성수동)
+        limit: 이번 실행에서 처리할 최대 행 수
+
+    Returns:
+        {"processed": 이번 실행 처리 수, "next_row": 다음 입력 행, "complete": 입력 끝까지 처리 여부,
+         "stopped": 중단 사유 또는 None, "summary": 출력 전체 통계}
+    """
+    output = Path(output_path)
+    checkpoint_file = Path(checkpoint_path or f"{output_path}.checkpoint.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if restart:
+        for path in (output, checkpoint_file):
+            path.unlink(missing_ok=True)
+
+    checkpoint = _load_checkpoint(checkpoint_file, input_path)
+    start_row = checkpoint["next_row"] if checkpoint else 0
+    if checkpoint:
+        if not output.exists():
+            raise SystemExit(f"Checkpoint {checkpoint_file} exists but {output} is missing — use --restart")
+        # 마지막 체크포인트 이후에 쓴 행은 버리고 그 행부터 다시 판정
+        with open(output, "r+b") as f:
+            f.truncate(checkpoint["output_bytes"])
+        logger.info(f"Resuming from row {start_row:,} (checkpoint {checkpoint['updated_at']})")
+    elif output.exists() and output.stat().st_size:
+        raise SystemExit(f"{output} exists without a checkpoint — use --restart to overwrite")
+
+    sem = asyncio.Semaphore(concurrency)
+    window: Deque = deque()        # 입력 순서대로 (row, poi, task) — 앞에서부터 기록
+    window_size = concurrency * 4
+    processed, next_row, stopped, exhausted = 0, start_row, None, False
+    started = time.perf_counter()
+
+    async def verify(poi: Dict):
+        row_region = region if region is not None else (poi.get("search_region") or "").split(" ")[0]
+        async with sem:
+            return await _verify_one(_parse_poi(poi), row_region or None)
+
+    with open(input_path, encoding="utf-8-sig", newline="") as src, \
+            open(output, "a", encoding="utf-8", newline="") as out:
+        writer = csv.DictWriter(out, fieldnames=OUTPUT_FIELDS)
+        if out.tell() == 0:
+            writer.writeheader()
+        rows = enumerate(csv.DictReader(src))
+        end_row = start_row + limit if limit is not None else None
+        try:
+            with priority_scope(BATCH):
+                while True:
+                    while len(window) < window_size:
+                        row, poi = next(rows, (None, None))
+                        exhausted = row is None
+                        if row is None or (end_row is not None and row >= end_row):
+                            break
+                        if row >= start_row:
+                            window.append((row, poi, asyncio.ensure_future(verify(poi))))
+                    if not window:
+                        break
+
+                    row, poi, task = window.popleft()
+                    try:
+                        result, lookup = await task
+                    except NaverLookupError as e:
+                        # 429/5xx/타임아웃/차단기 열림 — 기록하지 않고 이 행부터 재개
+                        stopped = f"naver lookup failed at row {row:,} ({e})"
+                        break
+                    except (ValueError, TypeError, KeyError) as e:
+                        logger.warning(f"Skipping row {row}: {e}")
+                        next_row = row + 1
+                        continue
+                    if lookup == "quota_exhausted":
+                        remaining = http_pool.quotas.remaining("naver") or {}
+                        stopped = f"naver daily quota exhausted (resets at {remaining.get('resets_at')})"
+                        break
+                    writer.writerow(_output_row(row, poi, result, lookup))
+                    processed += 1
+                    next_row = row + 1
+                    if processed % checkpoint_every == 0:
+                        _save_checkpoint(checkpoint_file, input_path, next_row, _sync(out))
+                        rate = processed / (time.perf_counter() - started)
+                        logger.info(f"  Verified {processed:,} rows (next row {next_row:,}, {rate:.1f}/s)")
+        finally:
+            for _, _, task in window:
+                task.cancel()
+            _save_checkpoint(checkpoint_file, input_path, next_row, _sync(out))
+            await http_pool.close()
+
+    complete = stopped is None and exhausted and not window
+    if stopped:
+        logger.warning(f"Stopped at row {next_row:,}: {stopped} — rerun the same command to resume")
+    summary = summarize(output_path)
+    with open(f"{output_path}.summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    _log_summary(summary)
+    return {"processed": processed, "next_row": next_row, "complete": complete, "stopped": stopped, "summary": summary}
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+
+    parser = argparse.ArgumentParser(description="Verify a POI base file against Naver, resumably")
+    parser.add_argument("--input", default=os.path.join(project_root, "data", "google_poi_base.csv"))
+    parser.add_argument("--output", default=os.path.join(project_root, "data", "verify_results.csv"))
+    parser.add_argument("--checkpoint", default=None, help="defaults to <output>.checkpoint.json")
+    parser.add_argument("--concurrency", type=int, default=settings.BATCH_VERIFY_CONCURRENCY)
+    parser.add_argument("--checkpoint-every", type=int, default=100)
+    parser.add_argument("--region", default=None, help="suffix for Naver queries (default: row search_region)")
+    parser.add_argument("--limit", type=int, default=None, help="max rows to process in this run")
+    parser.add_argument("--restart", action="store_true", help="discard checkpoint and output, start over")
+    args = parser.parse_args()
+
+    asyncio.run(run_pipeline(
+        args.input, args.output, args.checkpoint, args.concurrency, args.checkpoint_every,
+        args.region, args.limit, args.restart,
+    ))
@@ -23,11 +23,13 @@ import logging
 from pathlib import Path
 from typing import List, Dict
 
-import aiohttp
 from dotenv import load_dotenv
 from pyproj import Transformer
 
 from shared.config import settings
+from shared.http import http_pool
+from shared.quota import QuotaExceeded
+from shared.scheduler import BATCH, priority_scope
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("VWorldCollector")
@@ -76,8 +78,8 @@ SEONGSU_ANCHORS = [
 ]
 
 
-async def geocode_address_vworld(session: aiohttp.ClientSession, address: str) -> Dict | None:
-    """VWorld Geocoder API로 도로명주소 → WGS84 좌표 변환"""
+async def geocode_address_vworld(address: str) -> Dict | None:
+    """VWorld Geocoder API로 도로명주소 → WGS84 좌표 변환 (공유 HTTP 풀: 타임아웃 + 재시도)"""
     if not settings.VWORLD_API_KEY or settings.VWORLD_API_KEY.startswith("your-"):
         logger.error("VWORLD_API_KEY is missing.")
         return None
@@ -92,23 +94,24 @@ async def geocode_address_vworld(session: aiohttp.ClientSession, address: str) -
     )
 
     try:
-        async with session.get(url) as response:
-            if response.status != 200:
-                logger.warning(f"[VWorld] HTTP {response.status} for: {address}")
-                return None
-
-            data = await response.json(content_type=None)
-            status = data.get("response", {}).get("status")
-
-            if status != "OK":
-                logger.warning(f"[VWorld] Status {status} for: {address}")
-                return None
-
-            point = data["response"]["result"]["point"]
-            return {
-                "vw_lng": float(point["x"]),
-                "vw_lat": float(point["y"]),
-            }
+        http_status, data = await http_pool.get_json("vworld", url, content_type=None, hedge=False)
+        if http_status != 200:
+            logger.warning(f"[VWorld] HTTP {http_status} for: {address}")
+            return None
+
+        status = data.get("response", {}).get("status")
+
+        if status != "OK":
+            logger.warning(f"[VWorld] Status {status} for: {address}")
+            return None
+
+        point = data["response"]["result"]["point"]
+        return {
+            "vw_lng": float(point["x"]),
+            "vw_lat": float(point["y"]),
+        }
+    except QuotaExceeded:
+        raise
     except Exception as e:
         logger.error(f"[VWorld] Error geocoding '{address}': {e}")
         return None
@@ -124,9 +127,15 @@ async def collect_anchors(output_path: str = "data/vworld_anchors.csv"):
 
     dataset = []
 
-    async with aiohttp.ClientSession() as session:
+    # VWorld 초당 한도(VWORLD_REQUESTS_PER_SEC)는 shared/quota.py가 호출 시점에 맞춤
+    try:
         for i, anchor in enumerate(SEONGSU_ANCHORS):
-            result = await geocode_address_vworld(session, anchor["address"])
+            try:
+                with priority_scope(BATCH):
+                    result = await geocode_address_vworld(anchor["address"])
+            except QuotaExceeded as e:
+                logger.warning(f"Stopping early: {e}")
+                break
 
             if result:
                 # PyProj 변환: WGS84 -> EPSG:5179
@@ -143,9 +152,8 @@ async def collect_anchors(output_path: str = "data/vworld_anchors.csv"):
                 logger.info(f"  ✅ {anchor['name']}: ({result['vw_lat']:.6f}, {result['vw_lng']:.6f})")
             else:
                 logger.warning(f"  ❌ {anchor['name']}: geocoding failed")
-
-            # VWorld rate limit: 1 req/sec
-            await asyncio.sleep(1.0)
+    finally:
+        await http_pool.close()
 
     if dataset:
         with open(output_path, 'w', newline='', encoding='utf-8') as f:
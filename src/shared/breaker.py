@@ -0,0 +1,160 @@
+"""
+GeoHarness: Upstream Circuit Breakers
+
+업스트림 호스트(maps.googleapis.com, openapi.naver.com, ...)마다 차단기를 둡니다.
+
+- closed    : 정상. 최근 window_s 동안 호출이 min_calls 이상이고 실패율이 failure_rate 이상이면 open
+- open      : 호출하지 않고 즉시 CircuitOpenError (검색은 CSV 데이터셋 폴백으로 바로 진행)
+- half_open : open 후 open_s가 지나면 probe 요청을 half_open_probes개만 통과시켜
+              성공하면 closed(창 초기화), 실패하면 다시 open
+
+실패: 예외(타임아웃/연결 오류) 또는 HTTP 429/5xx. 취소된 호출은 판정하지 않습니다.
+
+사용법:
+    breaker = registry.for_url(url)
+    if not breaker.allow():
+        raise CircuitOpenError(breaker.name)
+    ...
+    breaker.record(ok=True)
+"""
+
+import time
+from collections import deque
+from typing import Callable, Dict
+from urllib.parse import urlsplit
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """차단기가 열려 있어 업스트림을 호출하지 않음"""
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc or url
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window_s: float = 30.0,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        open_s: float = 15.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.window_s = window_s
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_s = open_s
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self.state = CLOSED
+        self._events: deque = deque()   # (시각, 성공 여부)
+        self._opened_at = 0.0
+        self._probes = 0
+        self.opened = 0                 # open 전환 횟수
+        self.rejected = 0
+
+    def _trim(self, now: float):
+        while self._events and self._events[0][0] < now - self.window_s:
+            self._events.popleft()
+
+    def _cooled_down(self, now: float) -> bool:
+        return now - self._opened_at >= self.open_s
+
+    def available(self) -> bool:
+        """지금 호출하면 통과할지 (상태를 바꾸거나 probe 자리를 잡지 않음)"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return self._cooled_down(self._clock())
+        return self._probes < self.half_open_probes
+
+    def allow(self) -> bool:
+        """호출 허가. half_open에서는 probe 자리를 잡으므로 반드시 record() 또는 release()로 반환"""
+        if self.state == OPEN and self._cooled_down(self._clock()):
+            self.state, self._probes = HALF_OPEN, 0
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and self._probes < self.half_open_probes:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def release(self):
+        """판정 없이 probe 자리 반환 (호출이 취소된 경우)"""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record(self, ok: bool):
+        now = self._clock()
+        if self.state == HALF_OPEN:
+            if ok:
+                self.state = CLOSED
+                self._events.clear()
+            else:
+                self._open(now)
+            return
+        if self.state == OPEN:
+            return  # open 전에 시작된 호출의 늦은 결과
+
+        self._events.append((now, ok))
+        self._trim(now)
+        failures = sum(1 for _, success in self._events if not success)
+        if len(self._events) >= self.min_calls and failures / len(self._events) >= self.failure_rate:
+            self._open(now)
+
+    def _open(self, now: float):
+        self.state = OPEN
+        self._opened_at = now
+        self._probes = 0
+        self._events.clear()
+        self.opened += 1
+
+    def stats(self) -> Dict:
+        now = self._clock()
+        self._trim(now)
+        calls = len(self._events)
+        failures = sum(1 for _, success in self._events if not success)
+        state = self.state
+        if state == OPEN and self._cooled_down(now):
+            state = HALF_OPEN   # 다음 호출이 probe
+        return {
+            "state": state,
+            "window_calls": calls,
+            "window_failure_rate": round(failures / calls, 3) if calls else 0.0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_in_s": round(max(0.0, self.open_s - (now - self._opened_at)), 1) if self.state == OPEN else None,
+        }
+
+
+class BreakerRegistry:
+    """호스트별 차단기 (처음 호출될 때 같은 설정으로 생성)"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, **options):
+        self._clock = clock
+        self._options = options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(host, clock=self._clock, **self._options)
+        return breaker
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        return self.get(host_of(url))
+
+    def available(self, url: str) -> bool:
+        return self.for_url(url).available()
+
+    def stats(self) -> Dict[str, Dict]:
+        return {host: breaker.stats() for host, breaker in self._breakers.items()}
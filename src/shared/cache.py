@@ -0,0 +1,550 @@
+"""
+GeoHarness: Search Result Cache Backends
+
+검색 결과처럼 JSON 직렬화 가능한 값을 캐시합니다. 세 백엔드가 같은 인터페이스
+(get / set / delete / clear / close / stats)를 구현합니다.
+
+- BoundedCache (memory): 인스턴스 로컬. 항목 수(max_entries)와 대략적인 바이트 크기
+  (max_bytes)로 제한하는 LRU, TTL, 선택적 zlib 압축, 백그라운드 만료 스윕
+- SQLiteCache (sqlite): 디스크 파일. 재시작 후에도 유지되며 같은 한도/LRU/TTL 적용
+- RedisCache (redis): 여러 인스턴스가 공유. RESP 프로토콜을 직접 구현한 최소 클라이언트
+  (추가 의존성 없음). 만료는 Redis PX, 용량은 서버 maxmemory 정책에 맡김
+
+크기는 JSON(UTF-8) 직렬화 길이로 추정합니다 (파이썬 객체 오버헤드는 제외).
+디스크/네트워크 백엔드는 blocking=True이며, 호출 측은 이벤트 루프 밖에서 실행해야 합니다.
+백엔드 오류는 캐시 미스로 취급합니다 (검색 자체는 계속 진행).
+
+사용법:
+    cache = create_cache("sqlite", path="data/search_cache.sqlite3", ttl=3600)
+    cache.set("하이라인 카페 성수동", response)
+    cached = cache.get("하이라인 카페 성수동")
+"""
+
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger("SearchCache")
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(raw: bytes) -> Any:
+    return json.loads(raw.decode("utf-8"))
+
+
+class CacheBackend:
+    """공통 인터페이스 + 통계 + 백그라운드 만료 스윕"""
+
+    backend = "base"
+    blocking = False
+
+    def __init__(self, ttl: float = 3600.0, compress: bool = False, sweep_interval: float = 60.0):
+        self.ttl = ttl
+        self.compress = compress
+        self.sweep_interval = sweep_interval
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def expire(self) -> int:
+        """만료 항목 일괄 제거 (제거 수 반환)"""
+        return 0
+
+    def _pack(self, value: Any) -> bytes:
+        raw = _encode(value)
+        return zlib.compress(raw) if self.compress else raw
+
+    def _unpack(self, raw: bytes) -> Any:
+        return _decode(zlib.decompress(raw) if self.compress else raw)
+
+    def _unpack_or_drop(self, key: str, raw: bytes) -> Optional[Any]:
+        """저장값 복원 → 적중. 손상됐거나 다른 compress 설정으로 쓴 값은 오류 + 미스로 세고 키 삭제"""
+        try:
+            value = self._unpack(raw)
+        except (zlib.error, ValueError) as e:
+            self.errors += 1
+            self.misses += 1
+            logger.warning(f"Dropping undecodable {self.backend} cache entry {key!r}: {e}")
+            self.delete(key)
+            return None
+        self.hits += 1
+        return value
+
+    def _ensure_sweeper(self):
+        if self._sweeper is not None or self.sweep_interval <= 0:
+            return
+        with self._sweeper_lock:
+            if self._sweeper is not None:
+                return
+            self._stop.clear()
+            self._sweeper = threading.Thread(target=self._run, name=f"{self.backend}-cache-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _run(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.expire()
+            except Exception as e:
+                logger.error(f"Cache sweep failed: {e}")
+
+    def close(self):
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=1.0)
+            self._sweeper = None
+
+    def _base_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "ttl_s": self.ttl,
+            "compress": self.compress,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+    def stats(self) -> Dict:
+        return self._base_stats()
+
+
+class BoundedCache(CacheBackend):
+    backend = "memory"
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        max_bytes: int = 64 << 20,
+        ttl: float = 3600.0,
+        compress: bool = False,
+        sweep_interval: float = 60.0,
+    ):
+        super().__init__(ttl=ttl, compress=compress, sweep_interval=sweep_interval)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # key → (저장 값, 바이트 크기, 만료 시각)
+        self._data: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+    # ── 조회 / 저장 ────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored, size, expires_at = entry
+            if expires_at <= time.time():
+                self._remove_locked(key, size)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return self._unpack(stored) if self.compress else stored
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raw = _encode(value)
+        stored: Any = value
+        if self.compress:
+            stored = raw = zlib.compress(raw)
+        size = len(raw) + len(key.encode("utf-8"))
+        if self.max_entries <= 0 or size > self.max_bytes:
+            self.rejected += 1
+            return
+
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (stored, size, expires_at)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                old_key, (_, old_size, _) = next(iter(self._data.items()))
+                self._remove_locked(old_key, old_size)
+                self.evictions += 1
+        self._ensure_sweeper()
+
+    def delete(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._remove_locked(key, entry[1])
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _remove_locked(self, key: str, size: int):
+        del self._data[key]
+        self._bytes -= size
+
+    def expire(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [(k, e[1]) for k, e in self._data.items() if e[2] <= now]
+            for k, size in expired:
+                self._remove_locked(k, size)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict:
+        return {
+            **self._base_stats(),
+            "size": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class SQLiteCache(CacheBackend):
+    """
+    디스크 SQLite 캐시 (재시작 후에도 유지)
+
+    WAL 모드 단일 연결을 lock으로 직렬화합니다. LRU 순서는 accessed_at 컬럼으로 관리합니다.
+    """
+
+    backend = "sqlite"
+    blocking = True
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 20_000,
+        max_bytes: int = 256 << 20,
+        ttl: float = 3600.0,
+        compress: bool = True,
+        sweep_interval: float = 60.0,
+    ):
+        super().__init__(ttl=ttl, compress=compress, sweep_interval=sweep_interval)
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed_at)")
+        self._ensure_sweeper()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                if row[1] <= now:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self.expirations += 1
+                    self.misses += 1
+                    return None
+                self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"SQLite cache get failed: {e}")
+            return None
+        return self._unpack_or_drop(key, row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        stored = self._pack(value)
+        size = len(stored) + len(key.encode("utf-8"))
+        if self.max_entries <= 0 or size > self.max_bytes:
+            self.rejected += 1
+            return
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, sqlite3.Binary(stored), size, expires_at, now),
+                )
+                self._evict_locked()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"SQLite cache set failed: {e}")
+
+    def _evict_locked(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # 만료 항목부터 정리한 뒤에도 초과하면 LRU 순으로 제거
+        removed = self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        if removed:
+            self.expirations += removed
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            self.evictions += 1
+
+    def delete(self, key: str):
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"SQLite cache delete failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def expire(self) -> int:
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
+            self.expirations += removed
+        return removed
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        return {
+            **self._base_stats(),
+            "path": str(self.path),
+            "size": count,
+            "bytes": total,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class RespError(Exception):
+    """Redis 서버가 돌려준 오류 응답 (-ERR ...)"""
+
+
+class _RespConnection:
+    """RESP2 최소 클라이언트 (요청-응답 1건씩, 스레드 안전하지 않음 — 호출 측 lock 사용)"""
+
+    def __init__(self, host: str, port: int, password: Optional[str], db: int, timeout: float):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+        if password:
+            self.command("AUTH", password)
+        if db:
+            self.command("SELECT", db)
+
+    def command(self, *args) -> Any:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode("utf-8")
+            elif not isinstance(arg, bytes):
+                arg = str(arg).encode("ascii")
+            out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        self._sock.sendall(b"".join(out))
+        return self._read()
+
+    def _read(self) -> Any:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("redis connection closed")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RespError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            n = int(body)
+            if n < 0:
+                return None
+            data = self._file.read(n + 2)
+            return data[:-2]
+        if kind == b"*":
+            n = int(body)
+            return None if n < 0 else [self._read() for _ in range(n)]
+        raise ConnectionError(f"unexpected RESP reply: {line!r}")
+
+    def close(self):
+        try:
+            self._file.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class RedisCache(CacheBackend):
+    """
+    Redis 프로토콜 공유 캐시 (여러 인스턴스가 같은 키 공간 사용)
+
+    url: redis://[:password@]host:port/db
+    연결 실패/타임아웃은 미스로 처리하고 다음 호출에서 재연결합니다.
+    """
+
+    backend = "redis"
+    blocking = True
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "geoharness:search:",
+        ttl: float = 3600.0,
+        compress: bool = True,
+        socket_timeout: float = 0.5,
+    ):
+        super().__init__(ttl=ttl, compress=compress, sweep_interval=0)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self.socket_timeout = socket_timeout
+        self._conn: Optional[_RespConnection] = None
+        self._lock = threading.Lock()
+
+    def _command(self, *args) -> Any:
+        with self._lock:
+            try:
+                if self._conn is None:
+                    self._conn = _RespConnection(self.host, self.port, self.password, self.db, self.socket_timeout)
+                return self._conn.command(*args)
+            except (OSError, ConnectionError):
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                raise
+
+    def _scan_keys(self) -> List[bytes]:
+        keys: List[bytes] = []
+        cursor = b"0"
+        while True:
+            cursor, batch = self._command("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 500)
+            keys.extend(batch)
+            if cursor in (b"0", 0, "0"):
+                return keys
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self._command("GET", self.prefix + key)
+        except (OSError, ConnectionError, RespError) as e:
+            self.errors += 1
+            self.misses += 1
+            logger.warning(f"Redis cache get failed: {e}")
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        return self._unpack_or_drop(key, raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl_ms = max(1, int((self.ttl if ttl is None else ttl) * 1000))
+        try:
+            self._command("SET", self.prefix + key, self._pack(value), "PX", ttl_ms)
+        except (OSError, ConnectionError, RespError) as e:
+            self.errors += 1
+            logger.warning(f"Redis cache set failed: {e}")
+
+    def delete(self, key: str):
+        try:
+            self._command("DEL", self.prefix + key)
+        except (OSError, ConnectionError, RespError) as e:
+            self.errors += 1
+            logger.warning(f"Redis cache delete failed: {e}")
+
+    def clear(self):
+        try:
+            keys = self._scan_keys()
+            for i in range(0, len(keys), 500):
+                self._command("DEL", *keys[i:i + 500])
+        except (OSError, ConnectionError, RespError) as e:
+            self.errors += 1
+            logger.warning(f"Redis cache clear failed: {e}")
+
+    def __len__(self) -> int:
+        """접두사 키 전체 SCAN (키 수에 비례 — 통계 수집에서는 호출하지 않음)"""
+        return len(self._scan_keys())
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict:
+        # size는 보고하지 않음: 키 공간을 다른 인스턴스와 공유하고 PX로 만료되므로
+        # 로컬 카운터는 맞지 않고, 스크랩마다 SCAN하면 Redis에 키 수만큼 부하
+        return {**self._base_stats(), "url": f"redis://{self.host}:{self.port}/{self.db}", "size": None}
+
+
+def create_cache(backend: str = "memory", **kwargs) -> CacheBackend:
+    """
+    설정값으로 캐시 백엔드 생성
+
+    memory: max_entries, max_bytes, ttl, compress, sweep_interval
+    sqlite: path + memory 인자
+    redis:  url, prefix, ttl, compress, socket_timeout
+    """
+    if backend == "memory":
+        return BoundedCache(**kwargs)
+    if backend == "sqlite":
+        return SQLiteCache(**kwargs)
+    if backend == "redis":
+        return RedisCache(**kwargs)
+    raise ValueError(f"unknown cache backend: {backend}")
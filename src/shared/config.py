@@ -11,6 +11,93 @@ class Settings(BaseSettings):
     NAVER_SEARCH_CLIENT_SECRET: str = ""
     VWORLD_API_KEY: str = ""
 
+    # ML 보정 캐시 (engine/inference.py)
+    CORRECTION_CACHE_SIZE: int = 50_000
+    CORRECTION_CACHE_GRID_DEG: float = 1e-6   # 좌표 스냅 격자 (~0.1m)
+
+    # CPU 단계 실행기 (api/executor.py)
+    CPU_EXECUTOR_KIND: str = "thread"          # thread | process | inline
+    CPU_EXECUTOR_WORKERS: int = 4
+    CPU_EXECUTOR_MAX_PENDING: int = 64
+
+    # 공유 HTTP 연결 풀 (shared/http.py)
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_POOL_LIMIT_PER_HOST: int = 20
+    HTTP_KEEPALIVE_S: float = 30.0
+    HTTP_DNS_TTL_S: int = 300
+    HTTP_TIMEOUT_GOOGLE_S: float = 5.0
+    HTTP_TIMEOUT_NAVER_S: float = 3.0
+    HTTP_TIMEOUT_NCP_S: float = 3.0
+    HTTP_TIMEOUT_VWORLD_S: float = 10.0
+
+    # 업스트림 복원력 (shared/resilience.py)
+    HTTP_RETRY_ATTEMPTS: int = 2               # 첫 시도 포함
+    HTTP_RETRY_BASE_S: float = 0.1             # full-jitter 백오프 기준
+    HTTP_RETRY_CAP_S: float = 1.0
+    HTTP_HEDGE_QUANTILE: float = 0.95          # 이 분위 지연 후 헤지 GET (0이면 끔)
+    HTTP_HEDGE_MIN_SAMPLES: int = 20           # 분위 계산 전 최소 표본 수
+    SEARCH_DEADLINE_S: float = 8.0             # /search 요청 전체 예산
+    SEARCH_SHARE_GOOGLE: float = 0.6           # 단계 1회 호출 상한 = 예산 × 몫
+    SEARCH_SHARE_NAVER: float = 0.4
+    SEARCH_SHARE_NCP: float = 0.4
+    VERIFY_DEADLINE_S: float = 5.0             # /verify-location 요청 전체 예산
+
+    # 업스트림 호스트별 차단기 (shared/breaker.py)
+    BREAKER_WINDOW_S: float = 30.0             # 실패율 계산 창
+    BREAKER_MIN_CALLS: int = 10                # 창 안 최소 호출 수 (미만이면 열지 않음)
+    BREAKER_FAILURE_RATE: float = 0.5
+    BREAKER_OPEN_S: float = 15.0               # open 유지 시간 → 이후 half-open probe
+    BREAKER_HALF_OPEN_PROBES: int = 1
+
+    # 업스트림 호출 한도 (shared/quota.py) — 0이면 제한 없음
+    # Naver/NCP 일일 한도, VWorld 초당 한도는 shared/constants.py 값을 사용
+    QUOTA_STORE_PATH: str = ""                 # 비우면 data/quota.sqlite3 (일일 카운터)
+    QUOTA_FLUSH_S: float = 1.0                 # 카운터 저장/다른 프로세스 사용량 동기화 주기
+    QUOTA_GOOGLE_PER_SEC: float = 10.0
+    QUOTA_GOOGLE_DAILY: int = 0
+    QUOTA_NAVER_PER_SEC: float = 10.0
+    QUOTA_NCP_PER_SEC: float = 10.0
+    QUOTA_VWORLD_DAILY: int = 0
+    COLLECTOR_CONCURRENCY: int = 8             # ml/ 수집기 동시 요청 수 (속도는 위 한도가 결정)
+
+    # 업스트림 호출 우선순위 스케줄러 (shared/scheduler.py)
+    SCHEDULER_SLOTS_PER_UPSTREAM: int = 16     # 업스트림별 동시 실행 호출 수
+    SCHEDULER_WEIGHT_INTERACTIVE: float = 8.0  # 경합 시 슬롯 배분 비율
+    SCHEDULER_WEIGHT_PREWARM: float = 2.0
+    SCHEDULER_WEIGHT_BATCH: float = 1.0
+    SCHEDULER_INTERACTIVE_SLO_S: float = 1.5   # interactive p95가 넘으면 백그라운드 제한 + 선점
+    SCHEDULER_DEGRADED_BACKGROUND_SLOTS: int = 1
+    SCHEDULER_BACKGROUND_RATE_SHARE: float = 0.5   # 백그라운드 호출의 초당 한도 몫 (라이브 API 여유분)
+
+    # 검색 결과 캐시 (shared/cache.py)
+    SEARCH_CACHE_BACKEND: str = "memory"       # memory | sqlite | redis
+    SEARCH_CACHE_SQLITE_PATH: str = ""         # 비우면 data/search_cache.sqlite3
+    SEARCH_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    SEARCH_CACHE_TTL_S: float = 3600.0
+    SEARCH_CACHE_MAX_ENTRIES: int = 2000
+    SEARCH_CACHE_MAX_BYTES: int = 64 << 20     # 64 MiB (JSON 직렬화 기준 추정치)
+    SEARCH_CACHE_COMPRESS: bool = True
+    SEARCH_CACHE_SWEEP_S: float = 60.0
+
+    # CSV 데이터셋 폴백 매칭 (api/search.py)
+    DATASET_STORE_CACHE: bool = True           # 열 저장소 바이너리 캐시 data/ml_dataset.store.npz 사용
+    DATASET_MATCH_RADIUS_M: float = 500.0      # 장소별 매칭: Google 좌표 반경 (판정 warning 한계와 동일)
+    DATASET_GRID_CELL_DEG: float = 0.005       # 격자 셀 크기 (~550m)
+
+    # 자동완성 로컬 접두사 색인 (engine/autocomplete.py)
+    AUTOCOMPLETE_LIMIT: int = 5
+    AUTOCOMPLETE_MIN_LOCAL: int = 3            # 로컬 결과가 이보다 적으면 Google 호출
+    AUTOCOMPLETE_RECENT_MAX: int = 5000        # 기억할 최근 Google 예측 수
+
+    # 장소별 Naver 교차검증 (api/search.py)
+    NAVER_VERIFY_CONCURRENCY: int = 5
+    NAVER_VERIFY_DEADLINE_S: float = 2.5
+
+    # 대량 POI 검증 (api/batch_verify.py)
+    BATCH_VERIFY_CONCURRENCY: int = 8          # 동시 판정 수 (입력/출력 큐 크기도 이 값에 비례)
+    BATCH_VERIFY_NAVER_RESERVE: int = 1000     # 라이브 API용으로 남겨둘 Naver 일일 호출 수
+    BATCH_VERIFY_SPOOL_BYTES: int = 1 << 20    # 업로드 본문 메모리 상한 (초과분은 임시 파일)
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
 
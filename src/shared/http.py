@@ -0,0 +1,256 @@
+"""
+GeoHarness: Shared HTTP Client Pool
+
+애플리케이션 수명 동안 하나의 aiohttp.ClientSession을 공유하여
+Google / Naver / NCP / VWorld 호출마다 반복되던 TCP·TLS 핸드셰이크와
+DNS 조회를 없앱니다.
+
+- FastAPI 시작 시 start(), 종료 시 close() (api/server.py lifespan)
+- 호스트당 연결 수 제한, keep-alive, DNS 캐시 (TCPConnector)
+- 업스트림별 타임아웃 (UPSTREAM_TIMEOUTS, 설정으로 조정)
+- get_json: 요청 예산(shared/resilience.Deadline) 안에서 타임아웃을 줄이고,
+  관측 p95보다 느린 GET은 헤지, 실패/429/5xx는 jitter 백오프로 재시도
+- 호스트별 차단기(shared/breaker.py): 열려 있으면 호출 없이 CircuitOpenError
+- 업스트림 호출 한도(shared/quota.py): 첫 요청은 초당 한도까지 대기, 재시도/헤지 요청도 사용량에 반영
+- 우선순위 스케줄러(shared/scheduler.py): 업스트림별 슬롯을 interactive > prewarm > batch
+  가중치로 배분. 백그라운드 클래스는 초당 한도의 일부(BACKGROUND_RATE_SHARE)만 사용
+
+사용법:
+    from shared.http import http_pool
+
+    status, data = await http_pool.get_json("google", url, params=params)
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from shared.breaker import BreakerRegistry, CircuitOpenError
+from shared.config import settings
+from shared.quota import QuotaExceeded, QuotaManager, quotas as default_quotas
+from shared.resilience import DeadlineExceeded, LatencyTracker, RetryPolicy, current_deadline, resilient_call
+from shared.scheduler import INTERACTIVE, PriorityScheduler, current_priority
+
+logger = logging.getLogger("HttpPool")
+
+# 업스트림 이름 → 요청 전체 타임아웃 (초)
+UPSTREAM_TIMEOUTS: Dict[str, float] = {
+    "google": settings.HTTP_TIMEOUT_GOOGLE_S,
+    "naver": settings.HTTP_TIMEOUT_NAVER_S,
+    "ncp": settings.HTTP_TIMEOUT_NCP_S,
+    "vworld": settings.HTTP_TIMEOUT_VWORLD_S,
+}
+DEFAULT_TIMEOUT_S = 10.0
+
+DEFAULT_RETRY = RetryPolicy(
+    attempts=settings.HTTP_RETRY_ATTEMPTS,
+    base_s=settings.HTTP_RETRY_BASE_S,
+    cap_s=settings.HTTP_RETRY_CAP_S,
+    retry_on=(TimeoutError, aiohttp.ClientError, ConnectionError, OSError),
+)
+
+
+def _is_upstream_failure(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+class HttpClientPool:
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        timeouts: Optional[Dict[str, float]] = None,
+        retry: RetryPolicy = DEFAULT_RETRY,
+        hedge_quantile: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        breakers: Optional[BreakerRegistry] = None,
+        quotas: Optional[QuotaManager] = None,
+        scheduler: Optional[PriorityScheduler] = None,
+        background_rate_share: float = 1.0,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeouts = dict(timeouts or UPSTREAM_TIMEOUTS)
+        self.retry = retry
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self._latency: Dict[str, LatencyTracker] = {}
+        self.breakers = breakers if breakers is not None else BreakerRegistry()
+        self.quotas = quotas
+        self.scheduler = scheduler
+        self.background_rate_share = background_rate_share
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> aiohttp.ClientSession:
+        return self.session()
+
+    async def close(self):
+        if self.quotas is not None:
+            await asyncio.to_thread(self.quotas.flush, True)
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    def session(self) -> aiohttp.ClientSession:
+        """
+        공유 세션 (현재 이벤트 루프에 없으면 새로 생성)
+
+        운영 환경에서는 start()에서 만든 세션 하나를 계속 사용합니다.
+        루프가 바뀌는 경우(테스트 클라이언트, CLI의 asyncio.run 반복 호출)에는
+        이전 루프에 묶인 세션을 쓸 수 없으므로 새로 만듭니다.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+        return self._session
+
+    def latency(self, upstream: str) -> LatencyTracker:
+        tracker = self._latency.get(upstream)
+        if tracker is None:
+            tracker = self._latency[upstream] = LatencyTracker(min_samples=self.hedge_min_samples)
+        return tracker
+
+    async def get_json(
+        self,
+        upstream: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        content_type: Optional[str] = "application/json",
+        hedge: bool = True,
+        retry: Optional[RetryPolicy] = None,
+    ) -> Tuple[int, Optional[Any]]:
+        """
+        GET 후 JSON 파싱 (요청 예산·헤지·재시도 적용)
+
+        Args:
+            hedge: False면 헤지 요청을 보내지 않음 (쿼터가 빠듯한 배치 수집 등)
+            retry: None이면 풀 기본 정책
+
+        Returns:
+            (HTTP status, JSON | None) — 200이 아니면 본문은 None
+
+        Raises:
+            CircuitOpenError: 호스트 차단기가 열려 있음 (요청을 보내지 않음)
+            QuotaExceeded: 일일 한도 소진
+            DeadlineExceeded: 슬롯/초당 한도 대기가 요청 예산을 넘김
+        """
+        if self.scheduler is None:
+            return await self._get_json(upstream, url, params, headers, content_type, hedge, retry)
+        return await self.scheduler.run(
+            upstream, lambda: self._get_json(upstream, url, params, headers, content_type, hedge, retry),
+        )
+
+    async def _get_json(
+        self,
+        upstream: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]],
+        content_type: Optional[str],
+        hedge: bool,
+        retry: Optional[RetryPolicy],
+    ) -> Tuple[int, Optional[Any]]:
+        # 차단기 먼저: 거절된 호출은 초당/일일 한도를 쓰지 않음
+        breaker = self.breakers.for_url(url)
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.name)
+
+        sent = 0
+
+        async def attempt(timeout_s: float) -> Tuple[int, Optional[Any]]:
+            nonlocal sent
+            if sent and self.quotas is not None:
+                self.quotas.charge(upstream)   # 재시도/헤지 요청
+            sent += 1
+            timeout = aiohttp.ClientTimeout(total=timeout_s)
+            async with self.session().get(url, params=params, headers=headers, timeout=timeout) as resp:
+                if resp.status != 200:
+                    return resp.status, None
+                return resp.status, await resp.json(content_type=content_type)
+
+        try:
+            if self.quotas is not None:
+                deadline = current_deadline()
+                try:
+                    async with asyncio.timeout(deadline.remaining() if deadline is not None else None):
+                        share = 1.0 if current_priority() == INTERACTIVE else self.background_rate_share
+                        await self.quotas.acquire(upstream, rate_share=share)
+                except TimeoutError:
+                    raise DeadlineExceeded(f"quota wait for '{upstream}' exceeded the request budget")
+            if self.scheduler is not None:
+                self.scheduler.commit(upstream)   # 한도를 쓴 뒤로는 선점해도 재실행 비용만 늘어남
+            result = await resilient_call(
+                attempt,
+                stage=upstream,
+                timeout_s=self.timeouts.get(upstream, DEFAULT_TIMEOUT_S),
+                tracker=self.latency(upstream),
+                retry=self.retry if retry is None else retry,
+                hedge_quantile=self.hedge_quantile if hedge else None,
+                result_status=lambda result: result[0],
+            )
+        except (asyncio.CancelledError, DeadlineExceeded, QuotaExceeded):
+            breaker.release()   # 호출 측 사정 (취소/예산·한도 소진) — 업스트림 실패로 보지 않음
+            raise
+        except Exception:
+            breaker.record(ok=False)
+            raise
+        breaker.record(ok=not _is_upstream_failure(result[0]))
+        return result
+
+    def stats(self) -> Dict:
+        connector = self._session.connector if self._session is not None else None
+        return {
+            "open": self._session is not None and not self._session.closed,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "timeouts_s": self.timeouts,
+            "idle_connections": sum(len(v) for v in getattr(connector, "_conns", {}).values()) if connector else 0,
+            "upstreams": {name: tracker.stats() for name, tracker in self._latency.items()},
+            "scheduler": self.scheduler.stats() if self.scheduler is not None else None,
+        }
+
+
+http_pool = HttpClientPool(
+    limit=settings.HTTP_POOL_LIMIT,
+    limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+    keepalive_timeout=settings.HTTP_KEEPALIVE_S,
+    dns_cache_ttl=settings.HTTP_DNS_TTL_S,
+    hedge_quantile=settings.HTTP_HEDGE_QUANTILE or None,
+    hedge_min_samples=settings.HTTP_HEDGE_MIN_SAMPLES,
+    quotas=default_quotas,
+    scheduler=PriorityScheduler(
+        slots_per_upstream=settings.SCHEDULER_SLOTS_PER_UPSTREAM,
+        weights={
+            "interactive": settings.SCHEDULER_WEIGHT_INTERACTIVE,
+            "prewarm": settings.SCHEDULER_WEIGHT_PREWARM,
+            "batch": settings.SCHEDULER_WEIGHT_BATCH,
+        },
+        interactive_slo_s=settings.SCHEDULER_INTERACTIVE_SLO_S,
+        degraded_background_slots=settings.SCHEDULER_DEGRADED_BACKGROUND_SLOTS,
+    ),
+    background_rate_share=settings.SCHEDULER_BACKGROUND_RATE_SHARE,
+    breakers=BreakerRegistry(
+        window_s=settings.BREAKER_WINDOW_S,
+        min_calls=settings.BREAKER_MIN_CALLS,
+        failure_rate=settings.BREAKER_FAILURE_RATE,
+        open_s=settings.BREAKER_OPEN_S,
+        half_open_probes=settings.BREAKER_HALF_OPEN_PROBES,
+    ),
+)
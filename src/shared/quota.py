@@ -0,0 +1,307 @@
+"""
+GeoHarness: Upstream Quota Manager
+
+업스트림별 초당 한도(token bucket)와 일일 한도(영속 카운터)를 한 곳에서 관리합니다.
+API 라우터와 ml/ 수집기가 shared/http.py 풀을 통해 같은 관리자를 사용하므로
+수집기 실행 중에도 일일 호출 수가 합산됩니다.
+
+- 초당 한도: 토큰을 먼저 예약하고(음수 허용) 부족분만큼만 정확히 대기
+  → 여러 호출이 동시에 기다려도 도착 순서대로 허용 속도에 맞춰 통과 (고정 sleep 불필요)
+- 일일 한도: KST 자정 기준. 백그라운드 스레드가 flush_s마다 SQLite(WAL)에 누적하고
+  다른 프로세스의 사용량을 다시 읽음 → acquire()는 메모리 카운터만 다룸 (이벤트 루프에서 디스크 I/O 없음)
+- remaining(): 남은 초당 토큰 / 일일 호출 수 / 초기화 시각 (수집기가 처리량 계획에 사용)
+
+사용법:
+    from shared.quota import quotas
+
+    await quotas.acquire("ncp")          # 초당 한도까지 대기, 일일 한도 초과 시 QuotaExceeded
+    await quotas.ensure_loaded()         # 오늘 누적 사용량 (다른 프로세스 포함) 읽기
+    quotas.remaining("ncp")              # {"daily_remaining": 24980, ...}
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from shared.config import settings
+from shared.constants import NAVER_DAILY_LIMIT, VWORLD_REQUESTS_PER_SEC
+
+logger = logging.getLogger("QuotaManager")
+
+KST = timezone(timedelta(hours=9))   # Naver/NCP/VWorld 일일 한도 초기화 기준
+
+
+class QuotaExceeded(Exception):
+    """일일 한도 소진 (다음 초기화까지 호출 불가)"""
+
+
+def _today() -> str:
+    return datetime.now(KST).date().isoformat()
+
+
+class UpstreamQuota:
+    def __init__(self, name: str, per_second: float = 0.0, burst: Optional[float] = None, per_day: int = 0):
+        """per_second/per_day가 0이면 해당 한도 없음"""
+        self.name = name
+        self.per_second = per_second
+        self.burst = burst if burst is not None else max(1.0, per_second)
+        self.per_day = per_day
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self.day = _today()
+        self.day_used = 0        # 저장소 기준 사용량 (다른 프로세스 포함, 마지막 flush 시점)
+        self._unsynced: Dict[str, int] = {}   # 날짜 → 아직 저장소에 쓰지 않은 이 프로세스 사용량
+        self._lock = threading.Lock()         # flush 스레드와 카운터 공유
+        self.waited_s = 0.0
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        return self._unsynced.get(self.day, 0)
+
+    def _refill(self, now: float):
+        if self.per_second > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.per_second)
+        self._stamp = now
+
+    def used_today(self) -> int:
+        return self.day_used + self.pending
+
+    def daily_remaining(self) -> Optional[int]:
+        return max(0, self.per_day - self.used_today()) if self.per_day else None
+
+    def reserve(self, cost: int = 1, tokens: Optional[float] = None) -> float:
+        """
+        호출 예약 → 대기해야 할 시간(초). 일일 한도 초과 시 QuotaExceeded
+
+        tokens: 초당 버킷에서 뺄 토큰 수 (기본 cost). 백그라운드 호출은 더 많이 빼서 속도 몫을 줄임
+        """
+        with self._lock:
+            if self.per_day and self.used_today() + cost > self.per_day:
+                self.rejected += 1
+                raise QuotaExceeded(f"{self.name}: daily limit {self.per_day} reached")
+            self._unsynced[self.day] = self.pending + cost
+        if self.per_second <= 0:
+            return 0.0
+        self._refill(time.monotonic())
+        self._tokens -= cost if tokens is None else tokens
+        return -self._tokens / self.per_second if self._tokens < 0 else 0.0
+
+    def refund(self, cost: int = 1, tokens: Optional[float] = None):
+        """대기 중 취소된 예약 반환"""
+        with self._lock:
+            self._unsynced[self.day] = max(0, self.pending - cost)
+        if self.per_second > 0:
+            self._tokens = min(self.burst, self._tokens + (cost if tokens is None else tokens))
+
+    def rollover(self, today: str):
+        """날짜 변경 (전날 미기록 사용량은 그 날짜로 남아 다음 flush에서 기록)"""
+        with self._lock:
+            self.day, self.day_used = today, 0
+
+    def unsynced(self) -> List[Tuple[str, int]]:
+        with self._lock:
+            return [(day, used) for day, used in self._unsynced.items() if used]
+
+    def synced(self, day: str, used: int):
+        """저장소 기록 성공분 차감 (실패한 분은 남아 다음 flush에서 다시 기록)"""
+        with self._lock:
+            left = self._unsynced.get(day, 0) - used
+            if left > 0:
+                self._unsynced[day] = left
+            else:
+                self._unsynced.pop(day, None)
+            if day == self.day:
+                self.day_used += used
+
+    def loaded(self, day: str, used: int):
+        """저장소에서 다시 읽은 합계 반영 (그사이 날짜가 바뀌었으면 무시)"""
+        with self._lock:
+            if day == self.day:
+                self.day_used = used
+
+    def remaining(self) -> Dict:
+        self._refill(time.monotonic())
+        tomorrow = datetime.fromisoformat(self.day).replace(tzinfo=KST) + timedelta(days=1)
+        return {
+            "per_second": self.per_second or None,
+            "tokens": round(self._tokens, 2) if self.per_second else None,
+            "daily_limit": self.per_day or None,
+            "daily_used": self.used_today(),
+            "daily_remaining": self.daily_remaining(),
+            "resets_at": tomorrow.isoformat(),
+        }
+
+
+class QuotaManager:
+    def __init__(self, limits: Dict[str, Tuple[float, int]], path: Optional[str] = None, flush_s: float = 1.0):
+        """
+        Args:
+            limits: 업스트림 → (초당 한도, 일일 한도). 목록에 없는 업스트림은 제한 없음
+            path: 일일 카운터 SQLite 경로 (None이면 메모리에만)
+            flush_s: 카운터 저장/동기화 주기
+        """
+        self.path = path
+        self.flush_s = flush_s
+        self._quotas = {name: UpstreamQuota(name, rate, per_day=daily) for name, (rate, daily) in limits.items()}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._loaded = threading.Event()   # 첫 flush(오늘 누적 사용량 읽기) 완료
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """저장소 연결 (처음 사용할 때 생성 — import만으로 파일을 만들지 않음)"""
+        if self._conn is None and self.path:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quota_usage ("
+                "upstream TEXT NOT NULL, day TEXT NOT NULL, used INTEGER NOT NULL, "
+                "PRIMARY KEY (upstream, day))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, upstream: str) -> Optional[UpstreamQuota]:
+        return self._quotas.get(upstream)
+
+    def _start_flusher(self) -> bool:
+        """백그라운드 flush 스레드 시작 (처음 사용할 때). 저장소가 없으면 False"""
+        if not self.path:
+            return False
+        with self._flusher_lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._stop.clear()
+                self._flusher = threading.Thread(target=self._run_flusher, name="quota-flush", daemon=True)
+                self._flusher.start()
+        return True
+
+    def _run_flusher(self):
+        try:
+            self.flush(force=True)   # 오늘 이미 사용한 양 (이전 실행/다른 프로세스)
+        finally:
+            self._loaded.set()
+        while not self._stop.wait(max(self.flush_s, 0.05)):
+            self.flush(force=True)
+
+    async def ensure_loaded(self):
+        """첫 flush(오늘 누적 사용량 읽기)까지 대기 — 기다림은 스레드에서 (이벤트 루프를 막지 않음)"""
+        if self._start_flusher() and not self._loaded.is_set():
+            await asyncio.to_thread(self._loaded.wait, 5.0)
+
+    def _rollover(self, quota: UpstreamQuota):
+        # 기다리지 않음: 첫 로드 전이면 이 프로세스 사용량만 반영된 메모리 카운터 기준
+        self._start_flusher()
+        today = _today()
+        if quota.day != today:
+            quota.rollover(today)
+
+    async def acquire(self, upstream: str, cost: int = 1, rate_share: float = 1.0):
+        """
+        호출 허가를 받을 때까지 대기 (초당 한도). 한도가 없는 업스트림은 즉시 반환
+
+        rate_share: 이 호출자가 쓸 수 있는 초당 한도 비율 (예: 0.5면 토큰 2배 소모 → 절반 속도)
+
+        Raises:
+            QuotaExceeded: 일일 한도 소진
+        """
+        quota = self._quotas.get(upstream)
+        if quota is None:
+            return
+        await self.ensure_loaded()
+        self._rollover(quota)
+        tokens = cost / rate_share
+        wait = quota.reserve(cost, tokens)
+        if wait > 0:
+            quota.waited_s += wait
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                quota.refund(cost, tokens)
+                raise
+
+    def charge(self, upstream: str, cost: int = 1):
+        """대기 없이 사용량만 반영 (재시도/헤지 요청). 토큰이 음수가 되어 이후 호출이 그만큼 늦춰짐"""
+        quota = self._quotas.get(upstream)
+        if quota is not None:
+            self._rollover(quota)
+            quota.reserve(cost)
+
+    def remaining(self, upstream: str) -> Optional[Dict]:
+        """남은 용량 (한도 없는 업스트림은 None). 저장소 합계가 필요하면 먼저 ensure_loaded()"""
+        quota = self._quotas.get(upstream)
+        if quota is None:
+            return None
+        self._rollover(quota)
+        return quota.remaining()
+
+    def flush(self, force: bool = False):
+        """
+        이 프로세스 사용량을 저장소에 더하고, 다른 프로세스 포함 합계를 다시 읽음
+
+        백그라운드 스레드가 flush_s마다 호출 (이벤트 루프에서는 asyncio.to_thread로만 호출)
+        """
+        if not self.path:
+            return
+        with self._lock:
+            if not force and time.monotonic() - self._last_flush < self.flush_s:
+                return
+            self._last_flush = time.monotonic()
+            try:
+                conn = self._connection()
+                for quota in self._quotas.values():
+                    day = quota.day
+                    for unsynced_day, used in quota.unsynced():
+                        conn.execute(
+                            "INSERT INTO quota_usage (upstream, day, used) VALUES (?, ?, ?) "
+                            "ON CONFLICT(upstream, day) DO UPDATE SET used = used + excluded.used",
+                            (quota.name, unsynced_day, used),
+                        )
+                        quota.synced(unsynced_day, used)
+                    row = conn.execute(
+                        "SELECT used FROM quota_usage WHERE upstream = ? AND day = ?", (quota.name, day),
+                    ).fetchone()
+                    quota.loaded(day, row[0] if row else 0)
+            except sqlite3.Error as e:
+                logger.warning(f"Quota counter flush failed: {e}")
+
+    def close(self):
+        flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            self._stop.set()
+            flusher.join()
+        if self._conn is not None:
+            self.flush(force=True)
+            self._conn.close()
+            self._conn = None
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            name: {**quota.remaining(), "waited_s": round(quota.waited_s, 3), "rejected": quota.rejected}
+            for name, quota in self._quotas.items()
+        }
+
+
+def _default_path() -> str:
+    return settings.QUOTA_STORE_PATH or str(Path(__file__).resolve().parents[2] / "data" / "quota.sqlite3")
+
+
+quotas = QuotaManager(
+    {
+        "google": (settings.QUOTA_GOOGLE_PER_SEC, settings.QUOTA_GOOGLE_DAILY),
+        "naver": (settings.QUOTA_NAVER_PER_SEC, NAVER_DAILY_LIMIT),
+        "ncp": (settings.QUOTA_NCP_PER_SEC, NAVER_DAILY_LIMIT),
+        "vworld": (VWORLD_REQUESTS_PER_SEC, settings.QUOTA_VWORLD_DAILY),
+    },
+    path=_default_path(),
+    flush_s=settings.QUOTA_FLUSH_S,
+)
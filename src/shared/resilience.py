@@ -0,0 +1,291 @@
+"""
+GeoHarness: Upstream Resilience (deadline budget, hedging, retry)
+
+- Deadline: 요청 전체 시간 예산. 단계(업스트림)별 몫(shares)을 나누어 주고
+  단계별 사용 시간을 기록합니다. contextvar로 전달되므로 하위 호출(asyncio Task 포함)이
+  인자 없이 현재 예산을 참조합니다.
+- LatencyTracker: 업스트림별 최근 지연 시간 창 → p95 계산 (헤지 지연)
+- hedged(): 첫 요청이 p95 안에 끝나지 않으면 같은 요청을 한 번 더 보내고 먼저 온 응답 사용
+  (멱등 GET 전용)
+- RetryPolicy: full-jitter 지수 백오프. 남은 예산보다 긴 대기는 하지 않음
+- resilient_call(): 위 요소를 한 번의 업스트림 호출에 적용
+
+사용법:
+    with deadline_scope(Deadline(8.0, shares={"google": 0.6})) as deadline:
+        status, data = await http_pool.get_json("google", url, params=params)
+        deadline.report()   # {"total_ms": ..., "stages": {"google": ...}, ...}
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    """요청 예산을 모두 사용하여 단계를 시작/재시도할 수 없음"""
+
+
+class Deadline:
+    def __init__(self, total_s: float, shares: Optional[Dict[str, float]] = None):
+        self.total_s = total_s
+        self.shares = dict(shares or {})
+        self.started = time.monotonic()
+        self.stages: Dict[str, float] = {}
+        self.retries = 0
+        self.hedges = 0
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.total_s - self.elapsed())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout_for(self, stage: str, default: Optional[float] = None) -> float:
+        """단계 1회 호출에 쓸 수 있는 시간: min(남은 예산, 단계 몫, default)"""
+        limit = self.remaining()
+        if stage in self.shares:
+            limit = min(limit, self.shares[stage] * self.total_s)
+        if default is not None:
+            limit = min(limit, default)
+        return limit
+
+    def record(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator["Deadline"]:
+        start = time.monotonic()
+        try:
+            yield self
+        finally:
+            self.record(name, time.monotonic() - start)
+
+    def report(self) -> Dict:
+        """예산 사용 내역 (ms). 단계는 동시에 실행될 수 있으므로 합이 used_ms보다 클 수 있음"""
+        return {
+            "total_ms": round(self.total_s * 1000, 1),
+            "used_ms": round(self.elapsed() * 1000, 1),
+            "remaining_ms": round(self.remaining() * 1000, 1),
+            "stages": {k: round(v * 1000, 1) for k, v in self.stages.items()},
+            "retries": self.retries,
+            "hedges": self.hedges,
+        }
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("geoharness_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline) -> Iterator[Deadline]:
+    """이 블록(및 여기서 만든 Task)의 업스트림 호출에 deadline 적용"""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def deadline_context(deadline: Deadline) -> Context:
+    """
+    deadline이 설정된 컨텍스트 복사본
+
+    async generator처럼 deadline_scope로 감싸기 어려운 곳에서 ctx.run(asyncio.ensure_future, coro)로
+    예산이 적용된 Task를 만들 때 사용합니다.
+    """
+    ctx = copy_context()
+    ctx.run(_current_deadline.set, deadline)
+    return ctx
+
+
+@contextmanager
+def budget_stage(name: str) -> Iterator[Optional[Deadline]]:
+    """현재 예산이 있으면 블록 소요 시간을 name 단계로 기록 (없으면 아무것도 하지 않음)"""
+    deadline = current_deadline()
+    if deadline is None:
+        yield None
+        return
+    with deadline.stage(name):
+        yield deadline
+
+
+class LatencyTracker:
+    """업스트림별 최근 성공 지연 시간 창과 호출 통계"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> Dict:
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        attempts: int = 2,
+        base_s: float = 0.1,
+        cap_s: float = 1.0,
+        retry_on: Tuple[Type[BaseException], ...] = (TimeoutError, ConnectionError, OSError),
+        retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504),
+    ):
+        self.attempts = attempts
+        self.base_s = base_s
+        self.cap_s = cap_s
+        self.retry_on = retry_on
+        self.retry_statuses = retry_statuses
+
+    def backoff(self, attempt: int) -> float:
+        """full jitter: U(0, min(cap, base·2^attempt))"""
+        return random.uniform(0, min(self.cap_s, self.base_s * (2 ** attempt)))
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+async def hedged(call: Callable[[], Awaitable[T]], delay_s: Optional[float],
+                 tracker: Optional[LatencyTracker] = None) -> T:
+    """
+    call()을 실행하고 delay_s 안에 끝나지 않으면 한 번 더 실행하여 먼저 성공한 결과 반환
+
+    둘 다 실패하면 먼저 시작한 요청의 예외를 그대로 올립니다. 진 요청은 취소합니다.
+    """
+    first = asyncio.ensure_future(call())
+    if delay_s is None:
+        return await first
+
+    done, _ = await asyncio.wait({first}, timeout=delay_s)
+    if done:
+        return first.result()
+
+    second = asyncio.ensure_future(call())
+    if tracker is not None:
+        tracker.hedges += 1
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.hedges += 1
+
+    pending = {first, second}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second and tracker is not None:
+                        tracker.hedge_wins += 1
+                    return task.result()
+        raise first.exception()
+    finally:
+        for task in (first, second):
+            if not task.done():
+                task.cancel()
+
+
+async def resilient_call(
+    call: Callable[[float], Awaitable[T]],
+    *,
+    stage: str,
+    timeout_s: float,
+    tracker: Optional[LatencyTracker] = None,
+    retry: RetryPolicy = NO_RETRY,
+    hedge_quantile: Optional[float] = None,
+    result_status: Optional[Callable[[T], int]] = None,
+) -> T:
+    """
+    업스트림 호출 1건에 예산/타임아웃/헤지/재시도 적용
+
+    Args:
+        call: 시도별 타임아웃(초)을 받아 요청을 수행하는 코루틴 함수
+        stage: 예산 단계 이름 (Deadline.shares 키, 사용 시간 기록 키)
+        timeout_s: 시도 1회 최대 시간 (남은 예산과 단계 몫으로 더 줄어들 수 있음)
+        hedge_quantile: 지정 시 해당 분위 지연 후 헤지 요청 (멱등 요청에만)
+        result_status: 결과에서 HTTP status를 꺼내는 함수 (retry_statuses 재시도용)
+    """
+    deadline = current_deadline()
+    attempt = 0
+    while True:
+        budget = timeout_s if deadline is None else deadline.timeout_for(stage, timeout_s)
+        if budget <= 0:
+            raise DeadlineExceeded(f"no budget left for '{stage}'")
+
+        hedge_delay = tracker.quantile(hedge_quantile) if tracker is not None and hedge_quantile else None
+        if hedge_delay is not None and hedge_delay >= budget:
+            hedge_delay = None
+        if tracker is not None:
+            tracker.calls += 1
+
+        start = time.monotonic()
+        error: Optional[BaseException] = None
+        result: Any = None
+        try:
+            async with asyncio.timeout(budget):
+                result = await hedged(lambda: call(budget), hedge_delay, tracker)
+        except retry.retry_on as e:
+            error = e
+        finally:
+            elapsed = time.monotonic() - start
+            if deadline is not None:
+                deadline.record(stage, elapsed)
+
+        retryable_status = (
+            error is None and result_status is not None and result_status(result) in retry.retry_statuses
+        )
+        if error is None and not retryable_status:
+            if tracker is not None:
+                tracker.observe(elapsed)
+            return result
+
+        if tracker is not None:
+            tracker.failures += 1
+        attempt += 1
+        if attempt >= retry.attempts:
+            if error is not None:
+                raise error
+            return result
+
+        wait = retry.backoff(attempt)
+        if deadline is not None and wait >= deadline.remaining():
+            if error is not None:
+                raise error
+            return result
+        if tracker is not None:
+            tracker.retries += 1
+        if deadline is not None:
+            deadline.retries += 1
+        await asyncio.sleep(wait)
@@ -0,0 +1,221 @@
+"""
+GeoHarness: Priority Scheduler for Upstream Calls
+
+모든 업스트림 호출(shared/http.py get_json)은 업스트림별 동시 실행 슬롯을 받아야 시작합니다.
+슬롯이 모자라면 우선순위 클래스별 대기열에 들어가고, 가중 공정 스케줄링으로 다음 호출을 고릅니다.
+
+- 클래스: interactive(API 요청) / prewarm(캐시 예열) / batch(ml/ 수집기)
+  현재 클래스는 contextvar로 전달 (priority_scope). 기본값은 interactive
+- 가중 공정 스케줄링(stride): 클래스마다 pass 값을 두고 가장 작은 클래스부터 꺼내며
+  꺼낼 때 pass += 1/weight. 경합 시 interactive:prewarm:batch = 8:2:1 비율로 슬롯 배정
+- 성능 저하 감지: 최근 interactive 호출(대기 + 실행) p95가 SLO를 넘으면
+    · 백그라운드(prewarm/batch) 동시 실행을 degraded_background_slots개로 제한
+    · interactive 호출이 슬롯을 기다리면 실행 중인 백그라운드 호출을 취소(선점)하고
+      해당 호출은 자기 대기열 맨 앞에 다시 넣음 (결과는 호출자에게 그대로 전달)
+    · 선점 대상은 아직 요청을 보내지 않은 호출뿐 (초당 한도 대기 중 등).
+      요청을 보내기 시작한 호출(commit())은 끝까지 실행 → 재실행으로 한도를 두 번 쓰지 않음
+
+사용법:
+    with priority_scope(BATCH):
+        await scheduler.run("ncp", lambda: fetch(...))
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional, Set
+
+from shared.resilience import DeadlineExceeded, current_deadline
+
+INTERACTIVE = "interactive"
+PREWARM = "prewarm"
+BATCH = "batch"
+PRIORITY_CLASSES = (INTERACTIVE, PREWARM, BATCH)
+BACKGROUND_CLASSES = (PREWARM, BATCH)
+
+_current_priority: ContextVar[str] = ContextVar("geoharness_priority", default=INTERACTIVE)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+@contextmanager
+def priority_scope(priority: str) -> Iterator[str]:
+    """이 블록(및 여기서 만든 Task)의 업스트림 호출 우선순위 클래스"""
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"unknown priority class '{priority}'")
+    token = _current_priority.set(priority)
+    try:
+        yield priority
+    finally:
+        _current_priority.reset(token)
+
+
+class _UpstreamQueue:
+    def __init__(self, slots: int):
+        self.slots = slots
+        self.in_use = 0
+        self.waiting: Dict[str, Deque[asyncio.Future]] = {c: deque() for c in PRIORITY_CLASSES}
+        self.passes: Dict[str, float] = {c: 0.0 for c in PRIORITY_CLASSES}
+        self.vtime = 0.0                                   # 마지막으로 꺼낸 클래스의 pass
+        self.running: Dict[asyncio.Future, str] = {}       # 실행 중 호출 → 클래스 (시작 순서)
+        self.preempted: Set[asyncio.Future] = set()
+        self.committed: Set[asyncio.Future] = set()        # 요청을 보내기 시작한 호출 (선점 제외)
+
+
+class PriorityScheduler:
+    def __init__(
+        self,
+        slots_per_upstream: int = 16,
+        weights: Optional[Dict[str, float]] = None,
+        interactive_slo_s: float = 1.5,
+        degraded_background_slots: int = 1,
+        window: int = 100,
+    ):
+        self.slots_per_upstream = slots_per_upstream
+        self.weights = {INTERACTIVE: 8.0, PREWARM: 2.0, BATCH: 1.0, **(weights or {})}
+        self.interactive_slo_s = interactive_slo_s
+        self.degraded_background_slots = degraded_background_slots
+        self._queues: Dict[str, _UpstreamQueue] = {}
+        self._latency: Deque[float] = deque(maxlen=window)
+        self.dispatched = {c: 0 for c in PRIORITY_CLASSES}
+        self.preemptions = {c: 0 for c in PRIORITY_CLASSES}
+
+    def _queue(self, upstream: str) -> _UpstreamQueue:
+        q = self._queues.get(upstream)
+        if q is None:
+            q = self._queues[upstream] = _UpstreamQueue(self.slots_per_upstream)
+        return q
+
+    def interactive_p95(self) -> Optional[float]:
+        if len(self._latency) < 5:
+            return None
+        ordered = sorted(self._latency)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def degraded(self) -> bool:
+        p95 = self.interactive_p95()
+        return p95 is not None and p95 > self.interactive_slo_s
+
+    async def run(self, upstream: str, fn: Callable[[], Awaitable[Any]], priority: Optional[str] = None) -> Any:
+        """
+        슬롯을 받아 fn() 실행. 선점되면 대기열 맨 앞에서 다시 기다렸다가 재실행
+
+        Raises:
+            DeadlineExceeded: 슬롯 대기가 요청 예산(shared/resilience.Deadline)을 넘김
+        """
+        cls = priority or current_priority()
+        q = self._queue(upstream)
+        submitted = time.monotonic()
+        front = False
+        while True:
+            await self._acquire(q, cls, front)
+            inner = asyncio.ensure_future(fn())
+            q.running[inner] = cls
+            try:
+                result = await inner
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if inner in q.preempted and (task is None or not task.cancelling()):
+                    self.preemptions[cls] += 1
+                    front = True
+                    continue   # finally에서 슬롯 반환 후 재대기
+                raise
+            finally:
+                q.preempted.discard(inner)
+                q.committed.discard(inner)
+                q.running.pop(inner, None)
+                q.in_use -= 1
+                self._dispatch(q)
+            if cls == INTERACTIVE:
+                self._latency.append(time.monotonic() - submitted)
+            return result
+
+    def commit(self, upstream: str):
+        """run()이 실행 중인 현재 호출이 요청을 보내기 시작함 → 이후로는 선점하지 않음"""
+        task = asyncio.current_task()
+        q = self._queues.get(upstream)
+        if q is not None and task in q.running:
+            q.committed.add(task)
+
+    async def _acquire(self, q: _UpstreamQueue, cls: str, front: bool):
+        fut = asyncio.get_running_loop().create_future()
+        if not q.waiting[cls] and cls not in q.running.values():
+            q.passes[cls] = max(q.passes[cls], q.vtime)   # 쉬던 클래스가 밀린 몫을 한꺼번에 쓰지 않도록
+        (q.waiting[cls].appendleft if front else q.waiting[cls].append)(fut)
+        self._dispatch(q)
+        if not fut.done() and cls == INTERACTIVE and self.degraded():
+            self._preempt_background(q)
+
+        deadline = current_deadline()
+        try:
+            async with asyncio.timeout(deadline.remaining() if deadline is not None and cls == INTERACTIVE else None):
+                await fut
+        except (asyncio.CancelledError, TimeoutError) as e:
+            if fut.done() and not fut.cancelled():
+                q.in_use -= 1          # 슬롯을 받은 직후 취소됨 → 반환
+                self._dispatch(q)
+            else:
+                fut.cancel()
+                try:
+                    q.waiting[cls].remove(fut)
+                except ValueError:
+                    pass
+            if isinstance(e, TimeoutError):
+                raise DeadlineExceeded(f"waited too long for an upstream slot ({cls})") from e
+            raise
+
+    def _eligible(self, q: _UpstreamQueue, cls: str) -> bool:
+        if not q.waiting[cls]:
+            return False
+        if cls in BACKGROUND_CLASSES and self.degraded():
+            background = sum(1 for c in q.running.values() if c in BACKGROUND_CLASSES)
+            return background < self.degraded_background_slots
+        return True
+
+    def _dispatch(self, q: _UpstreamQueue):
+        while q.in_use < q.slots:
+            candidates = [c for c in PRIORITY_CLASSES if self._eligible(q, c)]
+            if not candidates:
+                return
+            cls = min(candidates, key=lambda c: (q.passes[c], PRIORITY_CLASSES.index(c)))
+            fut = q.waiting[cls].popleft()
+            if fut.done():
+                continue   # 취소된 대기
+            q.vtime = q.passes[cls]
+            q.passes[cls] += 1.0 / self.weights[cls]
+            q.in_use += 1
+            self.dispatched[cls] += 1
+            fut.set_result(None)
+
+    def _preempt_background(self, q: _UpstreamQueue):
+        """아직 요청을 보내지 않은 가장 최근 백그라운드 호출 1건 취소 (batch 먼저, 다음 prewarm)"""
+        for cls in (BATCH, PREWARM):
+            victims = [
+                t for t, c in q.running.items() if c == cls and t not in q.preempted and t not in q.committed
+            ]
+            if victims:
+                victim = victims[-1]
+                q.preempted.add(victim)
+                victim.cancel()
+                return
+
+    def stats(self) -> Dict:
+        p95 = self.interactive_p95()
+        return {
+            "degraded": self.degraded(),
+            "interactive_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "dispatched": dict(self.dispatched),
+            "preemptions": dict(self.preemptions),
+            "upstreams": {
+                name: {
+                    "in_use": q.in_use,
+                    "slots": q.slots,
+                    "queued": {c: len(w) for c, w in q.waiting.items()},
+                }
+                for name, q in self._queues.items()
+            },
+        }
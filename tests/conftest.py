@@ -0,0 +1,85 @@
+"""
+Shared fixtures: a small decoder.pkl bundle trained on the real dataset,
+so inference tests exercise the same code paths as production without
+the cost of the full 150-tree / 200-iteration ensemble.
+"""
+
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.spatial import AnchorIndex
+from ml.advanced_trainer import load_vworld_anchors, generate_triangulation_features
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def _build_small_bundle():
+    from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor, VotingRegressor
+
+    df = pd.read_csv(DATA_DIR / "ml_dataset.csv").head(400)
+    df["delta_x"] = df["n_mapx"] / 10000000.0 - df["g_lng"]
+    df["delta_y"] = df["n_mapy"] / 10000000.0 - df["g_lat"]
+    df = df[np.sqrt(df["delta_x"] ** 2 + df["delta_y"] ** 2) <= 0.003].reset_index(drop=True)
+
+    anchors = load_vworld_anchors(str(DATA_DIR / "vworld_anchors.csv"))
+    anchor_index = AnchorIndex(anchors)
+    df = generate_triangulation_features(df, anchor_index)
+    feature_cols = ['g_lat', 'g_lng', 'anchor1_dist', 'anchor1_bear',
+                    'anchor2_dist', 'anchor2_bear', 'anchor3_dist', 'anchor3_bear']
+    X = df[feature_cols].values
+
+    def ensemble():
+        return VotingRegressor(estimators=[
+            ('rf', RandomForestRegressor(n_estimators=8, max_depth=6, random_state=42, n_jobs=1)),
+            ('hgb', HistGradientBoostingRegressor(max_iter=15, max_depth=6, random_state=42)),
+        ])
+
+    return {
+        "model_x": ensemble().fit(X, df["delta_x"].values),
+        "model_y": ensemble().fit(X, df["delta_y"].values),
+        "feature_cols": feature_cols,
+        "anchors": anchors,
+        "anchor_index": anchor_index,
+        "n_samples": len(df),
+        "rmse_x": 0.0001,
+        "rmse_y": 0.0001,
+        "gpu_trained": False,
+        "method": "Ensemble(RF+HistGB)",
+    }
+
+
+@pytest.fixture(autouse=True)
+def no_dataset_cache_writes(monkeypatch):
+    """Keep the server lifespan from writing data/ml_dataset.store.npz during tests."""
+    from shared.config import settings
+
+    monkeypatch.setattr(settings, "DATASET_STORE_CACHE", False)
+
+
+@pytest.fixture(scope="session")
+def small_bundle():
+    return _build_small_bundle()
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    """Point inference at a temp decoder.pkl path (nothing written yet)."""
+    import engine.inference as inference
+
+    original = inference._MODEL_PATH
+    path = tmp_path / "decoder.pkl"
+    inference.configure_model(str(path), poll_interval=60.0)
+    yield path
+    inference.configure_model(original)
+
+
+@pytest.fixture
+def decoder_path(model_path, small_bundle):
+    """Write the small bundle to the temp decoder.pkl used by inference."""
+    with open(model_path, "wb") as f:
+        pickle.dump(small_bundle, f)
+    return model_path
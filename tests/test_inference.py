@@ -0,0 +1,196 @@
+"""
+Unit tests for the ML inference engine (engine/inference.py).
+"""
+
+import pickle
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from engine.inference import predict_offset, predict_offset_batch, get_model_status, _ensure_anchor_index
+from engine.spatial import AnchorIndex
+from ml.advanced_trainer import haversine_distance, bearing
+
+DATASET_CSV = Path(__file__).resolve().parent.parent / "data" / "ml_dataset.csv"
+
+SAMPLE_LATS = np.array([37.5442, 37.5389944, 37.541642, 37.5470])
+SAMPLE_LNGS = np.array([127.0499, 127.0499414, 127.0582107, 127.0410])
+
+
+def test_anchor_index_matches_brute_force(small_bundle):
+    anchors = small_bundle["anchors"]
+    features = AnchorIndex(anchors).triangulation_features(SAMPLE_LATS, SAMPLE_LNGS)
+
+    for i, (lat, lng) in enumerate(zip(SAMPLE_LATS, SAMPLE_LNGS)):
+        rel = sorted(
+            ((haversine_distance(lat, lng, a["lat"], a["lng"]), bearing(lat, lng, a["lat"], a["lng"]))
+             for a in anchors),
+            key=lambda r: r[0],
+        )[:3]
+        expected = [v for pair in rel for v in pair]
+        np.testing.assert_allclose(features[i], expected, rtol=1e-9, atol=1e-7)
+
+
+def test_legacy_bundle_gets_anchor_index(small_bundle):
+    legacy = {k: v for k, v in small_bundle.items() if k != "anchor_index"}
+    bundle = _ensure_anchor_index(legacy)
+    assert len(bundle["anchor_index"]) == len(small_bundle["anchors"])
+
+
+def test_batch_matches_single_predictions(decoder_path):
+    batch = predict_offset_batch(SAMPLE_LATS, SAMPLE_LNGS)
+    assert batch["method"] == "ml"
+
+    for i, (lat, lng) in enumerate(zip(SAMPLE_LATS, SAMPLE_LNGS)):
+        single = predict_offset(float(lat), float(lng))
+        assert single["method"] == "ml"
+        assert batch["corrected_lat"][i] == single["corrected_lat"]
+        assert batch["corrected_lng"][i] == single["corrected_lng"]
+
+
+def test_batch_without_model_uses_pyproj(model_path):
+    batch = predict_offset_batch(SAMPLE_LATS, SAMPLE_LNGS)
+    assert batch["method"] == "pyproj_fallback"
+    np.testing.assert_allclose(batch["corrected_lat"], SAMPLE_LATS, atol=1e-6)
+
+
+def test_batch_endpoint_accepts_json_and_ndjson(decoder_path):
+    from api.server import app
+    client = TestClient(app)
+
+    points = [{"lat": float(a), "lng": float(b)} for a, b in zip(SAMPLE_LATS, SAMPLE_LNGS)]
+    json_resp = client.post("/api/v1/predict-offset/batch", json={"points": points}).json()
+    assert json_resp["count"] == len(points)
+    assert json_resp["method"] == "ml"
+
+    ndjson = "\n".join(f'{{"lat": {p["lat"]}, "lng": {p["lng"]}}}' for p in points)
+    nd_resp = client.post(
+        "/api/v1/predict-offset/batch",
+        content=ndjson,
+        headers={"Content-Type": "application/x-ndjson"},
+    ).json()
+    assert nd_resp["results"] == json_resp["results"]
+
+    bad = client.post("/api/v1/predict-offset/batch", json={"points": [{"lat": 1}]}).json()
+    assert "error" in bad
+
+
+def test_compiled_ensemble_is_bit_exact(small_bundle):
+    from engine.compiled import CompiledEnsemble
+    from engine.inference import _build_features
+
+    rng = np.random.default_rng(0)
+    lats = 37.544 + rng.normal(0, 0.01, 600)
+    lngs = 127.050 + rng.normal(0, 0.01, 600)
+    X = _build_features(small_bundle, lats, lngs)
+
+    compiled = CompiledEnsemble.from_models(small_bundle["model_x"], small_bundle["model_y"])
+    delta_x, delta_y = compiled.predict(X)
+
+    assert np.array_equal(delta_x, small_bundle["model_x"].predict(X))
+    assert np.array_equal(delta_y, small_bundle["model_y"].predict(X))
+
+
+def test_loaded_bundle_uses_compiled_trees(decoder_path):
+    from engine.inference import _load_model
+
+    model = _load_model()
+    assert model["compiled"].n_trees > 0
+    assert predict_offset(37.5442, 127.0499)["method"] == "ml"
+
+
+def test_bundle_flagged_at_training_is_not_recompiled(model_path, small_bundle):
+    from engine.inference import _load_model
+
+    with open(model_path, "wb") as f:
+        pickle.dump({**small_bundle, "compiled_mismatch": True}, f)
+    model = _load_model()
+    assert model.get("compiled") is None
+    assert predict_offset(37.5442, 127.0499)["method"] == "ml"
+
+
+def test_lattice_mode_interpolates_inside_grid_and_falls_back_outside(decoder_path):
+    import json
+    from engine.lattice import lattice_paths
+    from ml.build_lattice import build_lattice
+
+    error = build_lattice(str(decoder_path), str(DATASET_CSV), resolution_m=50.0, margin_m=0.0)
+    assert error["max_error_m"] >= error["mean_error_m"] >= 0.0
+
+    inside = predict_offset(37.5442, 127.0499, method="lattice")
+    model = predict_offset(37.5442, 127.0499)
+    assert inside["method"] == "lattice"
+    assert abs(inside["corrected_lat"] - model["corrected_lat"]) < 1e-3
+
+    busan = predict_offset(35.1796, 129.0756, method="lattice")
+    assert busan["method"] == "ml"
+
+    # 다른 모델 버전으로 만든 격자는 무시
+    _, meta_path = lattice_paths(decoder_path)
+    meta = json.loads(meta_path.read_text())
+    meta["model_version"] = "stale"
+    meta_path.write_text(json.dumps(meta))
+    import engine.inference as inference
+    inference.configure_model(str(decoder_path))
+    assert predict_offset(37.5442, 127.0499, method="lattice")["method"] == "ml"
+
+
+def test_model_watcher_swaps_valid_bundles_and_rejects_broken_ones(model_path, small_bundle):
+    import pickle
+    import engine.inference as inference
+
+    assert get_model_status()["loaded"] is False
+    assert predict_offset(37.5442, 127.0499)["method"] == "pyproj_fallback"
+
+    with open(model_path, "wb") as f:
+        pickle.dump(small_bundle, f)
+    assert inference._manager.check_now() is True
+    status = get_model_status()
+    assert status["loaded"] is True
+    assert status["version"] == status["manager"]["version"]
+    assert status["manager"]["load_time_ms"] is not None
+    good_version = status["version"]
+
+    # 필수 키가 빠진 번들은 거부, 기존 모델 유지
+    with open(model_path, "wb") as f:
+        pickle.dump({"model_x": small_bundle["model_x"]}, f)
+    assert inference._manager.check_now() is False
+    status = get_model_status()
+    assert status["version"] == good_version
+    assert "missing keys" in status["manager"]["last_error"]
+
+    model_path.unlink()
+    assert inference._manager.check_now() is True
+    assert get_model_status()["loaded"] is False
+
+
+def test_correction_cache_hits_snapped_coordinates_and_resets_on_swap(decoder_path, small_bundle, monkeypatch):
+    import pickle
+    import engine.inference as inference
+
+    before = get_model_status()["cache"]
+    first = predict_offset(37.5442, 127.0499)
+    stats = get_model_status()["cache"]
+    assert (stats["hits"], stats["misses"]) == (before["hits"], before["misses"] + 1)
+
+    # 같은 격자 셀(1e-6°) 안의 좌표는 캐시 적중, 오프셋은 실제 입력에 적용
+    second = predict_offset(37.5442 + 2e-7, 127.0499)
+    assert get_model_status()["cache"]["hits"] == before["hits"] + 1
+    assert second["details"]["delta_y"] == first["details"]["delta_y"]
+    assert second["corrected_lat"] == (37.5442 + 2e-7) + (first["corrected_lat"] - 37.5442)
+
+    small = inference._correction_cache
+    monkeypatch.setattr(small, "max_entries", 2)
+    predict_offset(37.5450, 127.0510)
+    predict_offset(37.5460, 127.0520)
+    assert get_model_status()["cache"]["evictions"] >= 1
+
+    # 모델 교체 → 캐시 무효화
+    bundle = dict(small_bundle, n_samples=small_bundle["n_samples"] + 1)
+    with open(decoder_path, "wb") as f:
+        pickle.dump(bundle, f)
+    invalidations = small.invalidations
+    assert inference._manager.check_now() is True
+    assert small.invalidations == invalidations + 1
+    assert get_model_status()["cache"]["size"] == 0
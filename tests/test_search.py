@@ -0,0 +1,1389 @@
+"""
+Unit tests for the POI search pipeline (api/search.py) and its
+supporting components.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from api.executor import StageExecutor
+
+
+def test_stage_executor_runs_off_the_event_loop_and_records_timing():
+    executor = StageExecutor(kind="thread", max_workers=2, max_pending=4)
+
+    def busy(seconds):
+        time.sleep(seconds)
+        return threading.current_thread().name
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        name, _ = await asyncio.gather(executor.run("fuzzy", busy, 0.1), ticker())
+        return name, ticks
+
+    name, ticks = asyncio.run(main())
+    executor.shutdown()
+
+    assert name.startswith("cpu-stage")
+    assert ticks == 5  # 이벤트 루프가 CPU 단계 동안 막히지 않음
+    stage = executor.stats()["stages"]["fuzzy"]
+    assert stage["calls"] == 1
+    assert stage["avg_run_ms"] >= 90
+
+
+def test_stage_executor_bounds_pending_work_and_counts_errors():
+    executor = StageExecutor(kind="thread", max_workers=4, max_pending=2)
+    peak = 0
+
+    def track():
+        nonlocal peak
+        peak = max(peak, executor.in_flight)
+        time.sleep(0.02)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    async def main():
+        await asyncio.gather(*[executor.run("tracked", track) for _ in range(6)])
+        with pytest.raises(RuntimeError):
+            await executor.run("failing", fail)
+
+    asyncio.run(main())
+    executor.shutdown()
+
+    assert peak <= 2
+    assert executor.stats()["stages"]["failing"]["errors"] == 1
+
+
+def test_http_pool_reuses_connections_and_applies_upstream_timeouts():
+    from aiohttp import web
+
+    from shared.http import HttpClientPool
+
+    pool = HttpClientPool(limit_per_host=4, timeouts={"fast": 0.2})
+    peers = set()
+
+    async def ok(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"ok": True})
+
+    async def slow(request):
+        await asyncio.sleep(1.0)
+        return web.json_response({"ok": True})
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/ok", ok)
+        app.router.add_get("/slow", slow)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        base = f"http://127.0.0.1:{port}"
+        try:
+            await pool.start()
+            session = pool.session()
+            for _ in range(5):
+                status, data = await pool.get_json("fast", f"{base}/ok")
+                assert status == 200 and data == {"ok": True}
+            assert pool.session() is session  # 요청마다 새 세션을 만들지 않음
+            with pytest.raises(asyncio.TimeoutError):
+                await pool.get_json("fast", f"{base}/slow")
+        finally:
+            await pool.close()
+            await runner.cleanup()
+
+    asyncio.run(main())
+    assert len(peers) == 1  # keep-alive: 순차 요청 5건이 하나의 TCP 연결 사용
+    assert pool.stats()["open"] is False
+
+
+def test_search_uses_upstream_helpers(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.search as search
+    from api.server import app
+
+    calls = []
+
+    async def fake_google(full_query, api_key):
+        calls.append(("google", full_query))
+        return 200, {"results": [{
+            "name": "테스트 카페",
+            "formatted_address": "서울 성동구",
+            "place_id": "p1",
+            "geometry": {"location": {"lat": 37.5445, "lng": 127.0567}},
+        }]}
+
+    async def fake_naver(query, display=1):
+        calls.append(("naver", query))
+        return {"title": "<b>테스트 카페</b>", "mapx": "1270567000", "mapy": "375445000"}
+
+    monkeypatch.setattr(search.settings, "GOOGLE_MAPS_KEY", "test-key")
+    monkeypatch.setattr(search, "_google_text_search", fake_google)
+    monkeypatch.setattr(search, "_naver_local_search", fake_naver)
+    monkeypatch.setattr(search, "_find_in_dataset", lambda query, **kw: None)
+    monkeypatch.setattr(search, "_get_cached", lambda key: None)
+    monkeypatch.setattr(search, "_set_cache", lambda key, value: None)
+
+    resp = TestClient(app).post("/api/v1/search", json={"query": "테스트 카페", "region": "성수동"})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert sorted(c[0] for c in calls) == ["google", "naver"]
+    assert body["total"] == 1
+    place = body["places"][0]
+    assert place["naver_name"] == "테스트 카페"
+    assert place["naver_location"] == {"lat": 37.5445, "lng": 127.0567}
+
+
+def test_bounded_cache_evicts_lru_by_entries_and_bytes():
+    from shared.cache import BoundedCache
+
+    cache = BoundedCache(max_entries=3, max_bytes=10_000, ttl=60, sweep_interval=0)
+    for key in ("a", "b", "c"):
+        cache.set(key, {"places": [key]})
+    assert cache.get("a") == {"places": ["a"]}   # a를 최근 사용으로 갱신
+    cache.set("d", {"places": ["d"]})
+    assert cache.get("b") is None                 # 가장 오래 사용되지 않은 b 제거
+    assert cache.get("a") is not None
+
+    big = {"blob": "x" * 4000}
+    cache.set("big1", big)
+    cache.set("big2", big)
+    cache.set("big3", big)                        # 바이트 한도 초과 → 오래된 항목부터 제거
+    stats = cache.stats()
+    assert stats["bytes"] <= 10_000
+    assert cache.get("big3") == big
+    assert stats["evictions"] >= 2
+
+    cache.set("huge", {"blob": "x" * 20_000})    # 단일 항목이 한도보다 크면 저장하지 않음
+    assert cache.get("huge") is None
+    assert cache.stats()["rejected"] == 1
+
+
+def test_bounded_cache_expires_in_background_and_compresses():
+    from shared.cache import BoundedCache
+
+    value = {"places": [{"name": "하이라인 카페", "types": ["cafe"] * 50}]}
+    cache = BoundedCache(max_entries=10, max_bytes=1 << 20, ttl=0.05, compress=True, sweep_interval=0.02)
+    try:
+        cache.set("q", value)
+        raw_size = len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode())
+        assert cache.stats()["bytes"] < raw_size  # 압축 저장
+        assert cache.get("q") == value
+        time.sleep(0.2)
+        stats = cache.stats()
+        assert stats["size"] == 0 and stats["bytes"] == 0   # 재조회 없이 스윕 스레드가 제거
+        assert stats["expirations"] == 1
+    finally:
+        cache.close()
+
+
+class _FakeRedisServer:
+    """테스트용 RESP 서버 (GET/SET PX/DEL/SCAN/SELECT/PING만 지원)"""
+
+    def __init__(self):
+        import socketserver
+
+        store = self.store = {}
+        lock = threading.Lock()
+
+        class Handler(socketserver.StreamRequestHandler):
+            def _read_command(self):
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                args = []
+                for _ in range(int(line[1:-2])):
+                    n = int(self.rfile.readline()[1:-2])
+                    args.append(self.rfile.read(n + 2)[:-2])
+                return args
+
+            def _bulk(self, value):
+                return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+            def handle(self):
+                while True:
+                    args = self._read_command()
+                    if args is None:
+                        return
+                    cmd = args[0].upper()
+                    with lock:
+                        now = time.time()
+                        for k in [k for k, (_, exp) in store.items() if exp is not None and exp <= now]:
+                            del store[k]
+                        if cmd in (b"PING", b"SELECT", b"AUTH"):
+                            reply = b"+OK\r\n"
+                        elif cmd == b"GET":
+                            reply = self._bulk(store.get(args[1], (None, None))[0])
+                        elif cmd == b"SET":
+                            exp = now + int(args[4]) / 1000 if len(args) > 4 and args[3].upper() == b"PX" else None
+                            store[args[1]] = (args[2], exp)
+                            reply = b"+OK\r\n"
+                        elif cmd == b"DEL":
+                            removed = sum(store.pop(k, None) is not None for k in args[1:])
+                            reply = b":%d\r\n" % removed
+                        elif cmd == b"SCAN":
+                            prefix = args[3].rstrip(b"*")
+                            keys = [k for k in store if k.startswith(prefix)]
+                            reply = b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys) + b"".join(self._bulk(k) for k in keys)
+                        else:
+                            reply = b"-ERR unknown command\r\n"
+                    self.wfile.write(reply)
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_sqlite_cache_survives_restart_and_bounds_entries(tmp_path):
+    from shared.cache import SQLiteCache, create_cache
+
+    path = tmp_path / "search_cache.sqlite3"
+    value = {"places": [{"name": "하이라인 카페"}], "query": "하이라인 카페 성수동", "total": 1}
+
+    cache = create_cache("sqlite", path=str(path), max_entries=2, ttl=60, sweep_interval=0)
+    assert isinstance(cache, SQLiteCache) and cache.blocking
+    cache.set("a", value)
+    cache.set("b", {"places": []})
+    assert cache.get("a") == value         # a를 최근 사용으로 갱신
+    cache.set("c", {"places": []})         # 항목 한도 → 가장 오래 사용되지 않은 b 제거
+    assert cache.get("b") is None
+    cache.set("stale", {"places": []}, ttl=-1)
+    cache.close()
+
+    restarted = SQLiteCache(str(path), max_entries=2, ttl=60, sweep_interval=0)
+    try:
+        assert restarted.get("a") == value  # 재시작 후에도 유지
+        assert restarted.get("stale") is None
+        assert restarted.stats()["size"] == 2
+        # 손상된 값 → 오류 + 미스로 세고 삭제
+        with restarted._lock:
+            restarted._conn.execute("UPDATE cache SET value = ? WHERE key = 'a'", (b"not json",))
+        assert restarted.get("a") is None
+        assert restarted.stats()["errors"] == 1 and restarted.stats()["size"] == 1
+    finally:
+        restarted.close()
+
+
+def test_redis_cache_shares_entries_between_instances():
+    from shared.cache import RedisCache
+
+    server = _FakeRedisServer()
+    url = f"redis://127.0.0.1:{server.port}/0"
+    value = {"places": [{"name": "하이라인 카페"}], "total": 1}
+    a = RedisCache(url=url, ttl=0.2)
+    b = RedisCache(url=url, ttl=0.2)
+    try:
+        assert b.get("q") is None
+        a.set("q", value)
+        assert b.get("q") == value          # 다른 인스턴스가 저장한 항목 조회
+        assert len(a) == 1
+        time.sleep(0.3)
+        assert b.get("q") is None           # Redis PX 만료
+        a.set("x", value, ttl=60)
+        a.clear()
+        assert b.get("x") is None
+        # 다른 compress 설정으로 쓴 값 → 오류 + 미스, 키 삭제 (검색은 계속)
+        plain = RedisCache(url=url, compress=False)
+        a.set("z", value, ttl=60)
+        assert plain.get("z") is None
+        assert plain.stats()["errors"] == 1 and plain.stats()["misses"] == 1
+        assert a.get("z") is None
+        plain.close()
+        assert b.stats()["hits"] == 1
+        assert b.stats()["size"] is None     # 통계 수집은 SCAN 없이
+    finally:
+        a.close()
+        b.close()
+        server.close()
+
+    down = RedisCache(url=url, socket_timeout=0.1)
+    assert down.get("q") is None            # 서버 없음 → 미스로 처리
+    down.set("q", value)
+    down.delete("q")
+    down.clear()
+    assert down.stats()["errors"] == 4
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    from api.singleflight import SingleFlight, normalize_query
+
+    flight = SingleFlight("test")
+    runs = 0
+
+    async def fetch():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.05)
+        return {"runs": runs}
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        # 첫 호출자가 취소되어도 나머지는 결과를 받음
+        first = asyncio.ensure_future(flight.do("q", fetch))
+        await asyncio.sleep(0)
+        rest = [asyncio.ensure_future(flight.do(normalize_query("  Q "), fetch)) for _ in range(9)]
+        first.cancel()
+        results = await asyncio.gather(*rest)
+        errors = await asyncio.gather(*[flight.do("bad", boom) for _ in range(3)], return_exceptions=True)
+        again = await flight.do("q", fetch)       # 완료 후에는 키가 해제되어 새로 실행
+        return results, errors, again
+
+    results, errors, again = asyncio.run(main())
+    assert runs == 2
+    assert all(r is results[0] for r in results)
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert again == {"runs": 2}
+    assert flight.stats() == {"calls": 14, "executions": 3, "coalesced": 11}
+
+
+def test_concurrent_identical_searches_share_one_upstream_fetch(monkeypatch):
+    import api.search as search
+
+    google_calls = 0
+
+    async def fake_google(full_query, api_key):
+        nonlocal google_calls
+        google_calls += 1
+        await asyncio.sleep(0.05)
+        return 200, {"results": []}
+
+    async def fake_naver(query, display=1):
+        return None
+
+    monkeypatch.setattr(search.settings, "GOOGLE_MAPS_KEY", "test-key")
+    monkeypatch.setattr(search, "_google_text_search", fake_google)
+    monkeypatch.setattr(search, "_naver_local_search", fake_naver)
+    monkeypatch.setattr(search, "_find_in_dataset", lambda query, **kw: None)
+    monkeypatch.setattr(search, "_get_cached", lambda key: None)
+    monkeypatch.setattr(search, "_set_cache", lambda key, value: None)
+
+    async def main():
+        payloads = [{"query": "하이라인 카페", "region": "성수동"}] * 5 + [{"query": "하이라인  카페 ", "region": "성수동"}]
+        return await asyncio.gather(*[search.search_place(p) for p in payloads])
+
+    responses = asyncio.run(main())
+    assert google_calls == 1
+    assert all(r is responses[0] for r in responses)
+    budget = responses[0]["meta"].pop("budget")
+    assert budget["total_ms"] == search.settings.SEARCH_DEADLINE_S * 1000
+    expected = {"places": [], "query": "하이라인 카페 성수동", "total": 0, "meta": {"query_match_source": None}}
+    assert responses[0] == expected
+
+    # 전체 텍스트가 같아도 query/region 구분이 다르면(장소별 Naver 검색어가 다름) 따로 실행
+    async def split():
+        return await asyncio.gather(
+            search.search_place({"query": "하이라인 카페", "region": "성수동"}),
+            search.search_place({"query": "하이라인 카페 성수동", "region": ""}),
+        )
+
+    first, second = asyncio.run(split())
+    assert google_calls == 3 and first is not second
+
+
+def _legacy_similarity(a, b):
+    """기존 name_similarity (기준 구현)"""
+    import re
+    from difflib import SequenceMatcher
+
+    def normalize(s):
+        s = re.sub(r"<[^>]+>", "", s)
+        s = re.sub(r"[^\w가-힣a-zA-Z0-9]", "", s)
+        return s.lower().strip()
+
+    a, b = normalize(a), normalize(b)
+    return SequenceMatcher(None, a, b).ratio() if a and b else 0.0
+
+
+def _linear_best_match(rows, query, threshold=0.4):
+    """기존 _find_in_dataset 선형 탐색 (기준 구현)"""
+    best_row, best_score = None, 0.0
+    for row in rows:
+        score = max(_legacy_similarity(query, row.get("poi_name", "")), _legacy_similarity(query, row.get("n_name", "")))
+        if score > best_score:
+            best_row, best_score = row, score
+    return best_row if best_score >= threshold and best_row else None
+
+
+def test_poi_index_matches_linear_scan():
+    import random
+
+    from engine.poi_index import PoiIndex
+
+    random.seed(7)
+    # 작은 음절 집합 → 동점과 부분 일치가 많은 이름
+    syllables = list("성수동카페우하이라인정육식당크린") + ["ab", "Cafe", "<b>", "</b>", " ", "+"]
+    rows = [
+        {
+            "poi_name": "".join(random.choices(syllables, k=random.randint(1, 7))),
+            "n_name": "".join(random.choices(syllables, k=random.randint(0, 7))),
+        }
+        for _ in range(200)
+    ]
+    queries = [r["poi_name"] + " 성수동" for r in rows[:40]] + [
+        "".join(random.choices(syllables, k=random.randint(1, 9))) for _ in range(60)
+    ] + ["", "+", "zzz", "카페", "CAFE 성수"]
+
+    index = PoiIndex(rows, top_k=8)   # 작은 k로도 검증 단계가 결과를 보정해야 함
+    for q in queries:
+        assert index.best_match(q, threshold=0.4) is _linear_best_match(rows, q), q
+
+
+def test_grid_index_radius_query_matches_brute_force():
+    import numpy as np
+
+    from engine.spatial import GridIndex, haversine_m
+
+    rng = np.random.default_rng(3)
+    lats = 37.54 + rng.uniform(-0.02, 0.02, 500)
+    lngs = 127.05 + rng.uniform(-0.02, 0.02, 500)
+    lats[::50] = np.nan                       # 좌표 없는 행은 색인 제외
+    grid = GridIndex(lats, lngs, cell_deg=0.003)
+    assert len(grid) == 490
+
+    for lat, lng, radius in [(37.54, 127.05, 300), (37.555, 127.035, 800), (37.52, 127.07, 50), (35.1, 129.0, 500)]:
+        dist = haversine_m(lat, lng, lats, lngs)
+        expected = np.flatnonzero(dist <= radius)   # NaN 거리는 비교 결과 False
+        assert np.array_equal(grid.within(lat, lng, radius), expected)
+
+
+def test_place_fallback_only_matches_rows_near_google_location():
+    import numpy as np
+
+    import api.search as search
+
+    lats, lngs = search._dataset.n_lat, search._dataset.n_lng
+    i = int(np.flatnonzero(np.isfinite(lats))[0])
+    row = search._dataset[i]
+
+    near = search._find_in_dataset(row["poi_name"], near=(lats[i], lngs[i]), radius_m=200)
+    assert near is not None
+    assert search.haversine_m(lats[i], lngs[i], *search._csv_row_to_naver(near)[1:]) <= 200
+    # 같은 이름이라도 멀리 떨어진 Google 좌표(부산)에서는 후보가 없음
+    assert search._find_in_dataset(row["poi_name"], near=(35.1, 129.0), radius_m=500) is None
+    # 좌표 없이 질의하면 기존처럼 전체 데이터셋에서 이름 매칭
+    assert search._find_in_dataset(row["poi_name"]) is not None
+
+
+def test_poi_store_matches_csv_rows_and_reloads_from_binary_cache(monkeypatch, tmp_path):
+    import csv
+    import sys
+    from pathlib import Path
+
+    import numpy as np
+
+    from engine.poi_index import PoiIndex
+    from engine.poi_store import PoiStore, cache_path_for
+    from engine.similarity import normalize_name
+
+    source = Path(__file__).resolve().parent.parent / "data" / "ml_dataset.csv"
+    with open(source, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))[:500]
+    rows[1] = {**rows[1], "n_mapx": "", "n_mapy": "0"}           # 누락 좌표
+    rows[2] = {**rows[2], "n_mapx": "1290000000", "n_mapy": "351000000"}   # 부산 (국내)
+    rows[3] = {**rows[3], "n_mapx": "1400000000", "n_mapy": "375000000"}   # 국외 → 없음
+    path = tmp_path / "ml_dataset.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    store = PoiStore.load(path)
+    assert store.loaded_from == "csv" and cache_path_for(path).exists()
+    cached = PoiStore.load(path)
+    assert cached.loaded_from == "cache"
+
+    for i, row in enumerate(rows):
+        view = cached[i]
+        assert {f: view[f] for f in ("poi_name", "n_name", "n_address", "poi_type", "source")} == \
+            {f: row[f] for f in ("poi_name", "n_name", "n_address", "poi_type", "source")}
+        assert view["g_lat"] == float(row["g_lat"])
+        assert cached.normalized("n_name")[i] == normalize_name(row["n_name"])
+    assert cached[0]["n_lat"] == int(rows[0]["n_mapy"]) / 1e7
+    assert cached[1]["n_lat"] is None and np.isnan(cached.n_lng[1])
+    assert (cached[2]["n_lat"], cached[2]["n_lng"]) == (35.1, 129.0)
+    assert cached[3]["n_lat"] is None
+
+    # 열 저장소가 행 dict보다 작고, 같은 이름 색인 결과
+    dict_bytes = sum(sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r.values()) for r in rows)
+    footprint = cached.memory_footprint()
+    assert footprint["rows"] == 500 and footprint["total_bytes"] * 3 < dict_bytes
+    legacy = PoiIndex(rows)
+    columnar = PoiIndex(cached, normalized=[cached.normalized(f) for f in ("poi_name", "n_name")])
+    for row in rows[::25]:
+        assert columnar.best_match(row["poi_name"])["poi_name"] == legacy.best_match(row["poi_name"])["poi_name"]
+
+    # CSV가 바뀌면 캐시를 무시하고 다시 만듦
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerow(["새 카페", "37.5", "127.0", "", "", "", "", "cafe", "test"])
+    rebuilt = PoiStore.load(path)
+    assert rebuilt.loaded_from == "csv" and len(rebuilt) == 501 and rebuilt[500]["n_lat"] is None
+
+    # 서버는 import 시 캐시를 읽기만 하고, 기록은 시작 시 write_dataset_cache에서
+    import api.search as search
+
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerow(["다른 카페", "37.5", "127.0", "", "", "", "", "cafe", "test"])
+    store = PoiStore.load(path, write_cache=False)
+    assert store.loaded_from == "csv" and PoiStore.read_cache(cache_path_for(path), store.signature) is None
+    monkeypatch.setattr(search, "_dataset_path", path)
+    monkeypatch.setattr(search, "_dataset", store)
+    monkeypatch.setattr(search.settings, "DATASET_STORE_CACHE", True)
+    search.write_dataset_cache()
+    assert PoiStore.load(path, write_cache=False).loaded_from == "cache"
+
+
+def test_similarity_engine_scores_match_legacy_function():
+    import random
+
+    import numpy as np
+
+    from engine.similarity import SimilarityEngine, name_similarity
+
+    random.seed(11)
+    alphabet = list("성수동카페하이라인<b></b> +-AbC")
+    names = ["".join(random.choices(alphabet, k=random.randint(0, 10))) for _ in range(300)]
+    engine = SimilarityEngine(names)
+
+    for query in ["하이라인 카페", "<b>성수</b>", "ABC", "", "+"] + names[:20]:
+        legacy = np.array([_legacy_similarity(query, n) for n in names])
+        assert np.array_equal(engine.score_many(query), legacy)
+        assert np.array_equal(engine.score_many(query, cutoff=0.4), np.where(legacy >= 0.4, legacy, 0.0))
+        subset = [5, 3, 250]
+        assert np.array_equal(engine.score_many(query, indices=subset), legacy[subset])
+        assert all(name_similarity(query, n) == s for n, s in zip(names, legacy))
+
+
+def test_autocomplete_answers_from_local_jamo_index_before_google(monkeypatch):
+    import api.search as search
+    from engine.autocomplete import AutocompleteIndex, prefix_key
+
+    assert prefix_key("닭갈비") == "ㄷㅏㄹㄱㄱㅏㄹㅂㅣ"     # 겹받침은 입력 순서로
+    assert prefix_key("스타벅스 성수점").startswith(prefix_key("스탑"))  # 조합 중인 음절
+
+    index = AutocompleteIndex(max_recent=2)
+    index.add_many([
+        {"description": "하이라인, 서울 성동구", "place_id": "local:0", "main_text": "Highline seongsu (하이라인)"},
+        {"description": "스타벅스 성수점", "place_id": "local:1", "main_text": "스타벅스 성수점"},
+        {"description": "스타벅스 성수역점", "place_id": "local:2", "main_text": "스타벅스 성수역점"},
+    ])
+    assert [p["place_id"] for p in index.search("항")] == ["local:0"]    # 단어 시작 일치
+    assert [p["place_id"] for p in index.search("스탑")] == ["local:1", "local:2"]
+    assert index.search("성수 역")[0]["place_id"] == "local:2"
+    index.remember([{"description": f"카페{i}", "place_id": f"g{i}", "main_text": f"카페{i}"} for i in range(3)])
+    assert [p["place_id"] for p in index.search("카페")] == ["g1", "g2"]  # 오래된 예측부터 제거
+
+    calls = []
+
+    async def fake_get_json(upstream, url, **kwargs):
+        calls.append(kwargs["params"]["input"])
+        return 200, {"predictions": [
+            {"description": "스타벅스 성수점, 서울", "place_id": "g-dup", "structured_formatting": {"main_text": "스타벅스 성수점"}},
+            {"description": "스타필드, 서울", "place_id": "g-new", "structured_formatting": {"main_text": "스타필드"}},
+        ]}
+
+    monkeypatch.setattr(search, "_autocomplete_index", index)
+    monkeypatch.setattr(search.settings, "GOOGLE_MAPS_KEY", "test-key")
+    monkeypatch.setattr(search.settings, "AUTOCOMPLETE_MIN_LOCAL", 2)
+    monkeypatch.setattr(search.http_pool, "get_json", fake_get_json)
+
+    response = asyncio.run(search.autocomplete("스타"))
+    assert response["source"] == "local" and calls == []
+
+    monkeypatch.setattr(search.settings, "AUTOCOMPLETE_MIN_LOCAL", 3)
+    response = asyncio.run(search.autocomplete("스타벅스 성수"))      # 로컬 2건 → Google 보충 (중복 제외)
+    assert response["source"] == "mixed" and calls == ["스타벅스 성수"]
+    assert [p["place_id"] for p in response["predictions"]] == ["local:1", "local:2", "g-new"]
+
+    monkeypatch.setattr(search.settings, "AUTOCOMPLETE_MIN_LOCAL", 1)
+    response = asyncio.run(search.autocomplete("스타필"))             # 방금 본 예측은 로컬에서
+    assert response["predictions"][0]["place_id"] == "g-new" and len(calls) == 1
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        search._autocomplete_index.search("스타")
+    assert (time.perf_counter() - start) / 1000 < 1e-3
+
+
+def test_http_pool_hedges_slow_gets_and_retries_within_deadline():
+    from aiohttp import web
+
+    from shared.http import HttpClientPool
+    from shared.resilience import Deadline, RetryPolicy, deadline_scope
+
+    retry = RetryPolicy(attempts=3, base_s=0.01, cap_s=0.02, retry_on=(TimeoutError, ConnectionError, OSError))
+    pool = HttpClientPool(timeouts={"up": 1.0}, retry=retry, hedge_quantile=0.95, hedge_min_samples=5)
+    hits = {"slow_first": 0, "flaky": 0}
+
+    async def ok(request):
+        return web.json_response({"ok": True})
+
+    async def slow_first(request):
+        hits["slow_first"] += 1
+        if hits["slow_first"] == 1:
+            await asyncio.sleep(0.8)
+        return web.json_response({"n": hits["slow_first"]})
+
+    async def flaky(request):
+        hits["flaky"] += 1
+        if hits["flaky"] == 1:
+            return web.json_response({}, status=503)
+        return web.json_response({"ok": True})
+
+    async def slow(request):
+        await asyncio.sleep(1.0)
+        return web.json_response({"ok": True})
+
+    async def main():
+        app = web.Application()
+        for path, handler in [("/ok", ok), ("/slow_first", slow_first), ("/flaky", flaky), ("/slow", slow)]:
+            app.router.add_get(path, handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        try:
+            for _ in range(5):
+                await pool.get_json("up", f"{base}/ok")   # p95 표본
+
+            # 첫 요청이 p95를 넘기면 두 번째 요청을 보내고 먼저 온 응답 사용
+            start = time.perf_counter()
+            status, data = await pool.get_json("up", f"{base}/slow_first")
+            hedged_s = time.perf_counter() - start
+            assert status == 200 and data == {"n": 2}
+
+            # 503은 jitter 백오프 후 재시도
+            assert await pool.get_json("up", f"{base}/flaky", hedge=False) == (200, {"ok": True})
+
+            # 요청 예산이 단계 몫(0.3s × 0.5)과 남은 시간으로 시도별 타임아웃을 줄임
+            with deadline_scope(Deadline(0.3, shares={"up": 0.5})) as deadline:
+                start = time.perf_counter()
+                with pytest.raises(TimeoutError):
+                    await pool.get_json("up", f"{base}/slow", hedge=False)
+                budget_s = time.perf_counter() - start
+            return hedged_s, budget_s, deadline.report()
+        finally:
+            await pool.close()
+            await runner.cleanup()
+
+    hedged_s, budget_s, report = asyncio.run(main())
+    assert hedged_s < 0.5
+    assert budget_s < 0.45
+    assert report["retries"] >= 1 and report["stages"]["up"] >= 250
+    stats = pool.stats()["upstreams"]["up"]
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    assert stats["retries"] >= 2 and hits["flaky"] == 2
+
+
+def test_circuit_breaker_opens_on_failure_rate_and_probes_in_half_open():
+    from shared.breaker import BreakerRegistry
+
+    now = [0.0]
+    registry = BreakerRegistry(clock=lambda: now[0], window_s=10, min_calls=4, failure_rate=0.5, open_s=5)
+    breaker = registry.for_url("https://openapi.naver.com/v1/search/local.json")
+    assert breaker.name == "openapi.naver.com"
+
+    for ok in (True, False, True):
+        assert breaker.allow()
+        breaker.record(ok)
+    assert breaker.state == "closed"          # 호출 수가 min_calls 미만
+    now[0] = 11.0                             # 창 밖으로 밀려난 기록은 실패율에서 제외
+    for ok in (True, False, False, True):
+        breaker.allow()
+        breaker.record(ok)
+    assert breaker.state == "open"
+    assert not breaker.allow() and not registry.available("https://openapi.naver.com/x")
+    assert registry.stats()["openapi.naver.com"]["rejected"] == 1
+
+    now[0] = 16.5                             # open_s 경과 → probe 1건만 통과
+    assert breaker.available()
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record(False)                     # probe 실패 → 다시 open
+    assert breaker.state == "open" and breaker.opened == 2
+
+    now[0] = 22.0
+    assert breaker.allow()
+    breaker.release()                         # 취소된 probe는 판정하지 않음
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == "closed"
+
+
+def test_open_breaker_rejects_without_spending_quota(tmp_path):
+    from shared.breaker import BreakerRegistry, CircuitOpenError
+    from shared.http import HttpClientPool
+    from shared.quota import QuotaManager
+
+    url = "https://openapi.naver.com/v1/search/local.json"
+    registry = BreakerRegistry(min_calls=1, failure_rate=0.5, open_s=60)
+    breaker = registry.for_url(url)
+    breaker.allow()
+    breaker.record(False)
+    assert breaker.state == "open"
+    quota = QuotaManager({"naver": (1.0, 10)}, path=str(tmp_path / "quota.db"))
+    pool = HttpClientPool(breakers=registry, quotas=quota)
+
+    async def main():
+        for _ in range(3):
+            with pytest.raises(CircuitOpenError):
+                await pool.get_json("naver", url)
+
+    asyncio.run(main())
+    # 차단기가 거절한 호출은 초당 토큰도 일일 사용량도 쓰지 않음
+    assert quota.remaining("naver")["daily_remaining"] == 10
+    assert quota.remaining("naver")["tokens"] == 1.0
+    quota.close()
+
+
+def test_open_breakers_route_search_to_dataset_fallback(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.search as search
+    from api.server import app
+    from shared.breaker import BreakerRegistry
+
+    registry = BreakerRegistry(min_calls=1, open_s=60)
+    for url in (search.GOOGLE_TEXT_SEARCH_URL, search.NAVER_LOCAL_SEARCH_URL):
+        registry.for_url(url).record(False)
+    monkeypatch.setattr(search.http_pool, "breakers", registry)
+
+    async def no_upstream(*args, **kwargs):
+        raise AssertionError("upstream called while its breaker is open")
+
+    csv_row = {"poi_name": "하이라인", "g_lat": 37.5443, "g_lng": 127.0566, "n_name": "하이라인",
+               "poi_type": "cafe", "n_address": "서울 성동구 성수동2가", "n_lat": 37.5445, "n_lng": 127.0567}
+    monkeypatch.setattr(search.settings, "GOOGLE_MAPS_KEY", "test-key")
+    monkeypatch.setattr(search.settings, "NAVER_SEARCH_CLIENT_ID", "id")
+    monkeypatch.setattr(search.settings, "NAVER_SEARCH_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(search, "_google_text_search", no_upstream)
+    monkeypatch.setattr(search.http_pool, "get_json", no_upstream)
+    monkeypatch.setattr(search, "_find_in_dataset", lambda query, **kw: csv_row)
+    store = {}
+    monkeypatch.setattr(search, "_get_cached", store.get)
+    monkeypatch.setattr(search, "_set_cache", store.__setitem__)
+
+    response = asyncio.run(search.search_place({"query": "하이라인", "region": "성수동"}))
+    assert response["meta"]["degraded"] == ["google", "naver"]
+    assert response["meta"]["query_match_source"] == "csv"
+    assert [p["name"] for p in response["places"]] == ["하이라인"]
+    assert response["places"][0]["original"] == {"lat": 37.5443, "lng": 127.0566}
+    assert store == {}                        # 축소 응답은 캐시하지 않음
+
+    health = TestClient(app).get("/health").json()
+    assert health["status"] == "degraded"
+    assert health["breakers"]["maps.googleapis.com"]["state"] == "open"
+
+
+def test_quota_manager_paces_per_second_and_persists_daily_counts(tmp_path):
+    from shared.quota import QuotaExceeded, QuotaManager
+
+    path = str(tmp_path / "quota.sqlite3")
+    manager = QuotaManager({"fast": (50.0, 0), "daily": (0.0, 3)}, path=path, flush_s=0.0)
+
+    async def burst():
+        start = time.perf_counter()
+        await asyncio.gather(*[manager.acquire("fast") for _ in range(60)])
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(burst())
+    assert 0.15 < elapsed < 0.4               # 버킷 50개 즉시 + 10개는 정확히 초당 50회 속도로
+    assert manager.stats()["fast"]["waited_s"] > 0
+
+    for _ in range(3):
+        asyncio.run(manager.acquire("daily"))
+    assert manager.remaining("daily")["daily_remaining"] == 0
+    with pytest.raises(QuotaExceeded):
+        asyncio.run(manager.acquire("daily"))
+    asyncio.run(manager.acquire("unlimited"))  # 한도 없는 업스트림은 통과
+    assert manager.remaining("unlimited") is None
+    manager.close()
+
+    # 재시작/다른 프로세스도 같은 일일 카운터를 봄
+    other = QuotaManager({"daily": (0.0, 5)}, path=path)
+    asyncio.run(other.ensure_loaded())
+    assert other.remaining("daily")["daily_used"] == 3
+    other.charge("daily", cost=2)
+    with pytest.raises(QuotaExceeded):
+        asyncio.run(other.acquire("daily"))
+    other.close()
+
+
+def test_quota_manager_persists_counts_off_the_event_loop(tmp_path):
+    from shared.quota import QuotaManager
+
+    manager = QuotaManager({"daily": (0.0, 100)}, path=str(tmp_path / "quota.sqlite3"), flush_s=0.05)
+    flush, threads = manager.flush, []
+
+    def recording_flush(force=False):
+        threads.append(threading.current_thread())
+        flush(force)
+
+    manager.flush = recording_flush
+
+    async def main():
+        for _ in range(20):
+            await manager.acquire("daily")
+            await asyncio.sleep(0.01)
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(main())
+    time.sleep(0.2)
+    # acquire는 메모리 카운터만 — SQLite 기록은 백그라운드 스레드가 담당
+    assert threads and loop_thread not in threads
+    assert manager.remaining("daily")["daily_used"] == 20
+    assert manager.get("daily").pending == 0
+    manager.close()
+
+    # 첫 로드가 느려도 remaining()/charge()는 이벤트 루프를 막지 않음 (메모리 카운터 기준)
+    slow = QuotaManager({"daily": (0.0, 100)}, path=str(tmp_path / "quota.sqlite3"))
+    flush_slowly = slow.flush
+
+    def slow_flush(force=False):
+        time.sleep(0.3)
+        flush_slowly(force)
+
+    slow.flush = slow_flush
+
+    async def on_loop():
+        start = time.perf_counter()
+        slow.charge("daily")
+        before = slow.remaining("daily")["daily_used"]
+        elapsed = time.perf_counter() - start
+        await slow.ensure_loaded()
+        return elapsed, before, slow.remaining("daily")["daily_used"]
+
+    elapsed, before, after = asyncio.run(on_loop())
+    assert elapsed < 0.1 and before == 1 and after == 21
+    slow.close()
+
+
+def test_quota_flush_keeps_usage_when_the_store_write_fails(tmp_path):
+    import sqlite3
+
+    from shared.quota import QuotaManager
+
+    path = str(tmp_path / "quota.sqlite3")
+    manager = QuotaManager({"daily": (0.0, 100)}, path=path, flush_s=60.0)
+    asyncio.run(manager.ensure_loaded())
+    for _ in range(4):
+        manager.charge("daily")
+
+    class LockedConnection:
+        def execute(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    connection = manager._connection
+    manager._connection = lambda: LockedConnection()
+    manager.flush(force=True)
+    # 기록 실패 → 사용량은 미기록으로 남아 다음 flush에서 다시 기록
+    assert manager.get("daily").pending == 4
+    assert manager.remaining("daily")["daily_used"] == 4
+
+    manager._connection = connection
+    manager.close()
+    other = QuotaManager({"daily": (0.0, 100)}, path=path)
+    asyncio.run(other.ensure_loaded())
+    assert other.remaining("daily")["daily_used"] == 4
+    other.close()
+
+
+def test_priority_scheduler_weights_classes_and_preempts_background():
+    from shared.resilience import Deadline, DeadlineExceeded, deadline_scope
+    from shared.scheduler import BATCH, INTERACTIVE, PriorityScheduler, priority_scope
+
+    # 가중 공정 스케줄링: 슬롯 1개를 두고 batch 4건, interactive 4건이 대기
+    scheduler = PriorityScheduler(slots_per_upstream=1, weights={"interactive": 8, "batch": 1})
+    order = []
+
+    async def call(label, delay=0.01):
+        order.append(label)
+        await asyncio.sleep(delay)
+        return label
+
+    async def weighted():
+        first = asyncio.ensure_future(scheduler.run("up", lambda: call("blocker", 0.05)))
+        await asyncio.sleep(0)
+        with priority_scope(BATCH):
+            batch = [asyncio.ensure_future(scheduler.run("up", lambda: call(BATCH))) for _ in range(4)]
+        interactive = [asyncio.ensure_future(scheduler.run("up", lambda: call(INTERACTIVE))) for _ in range(4)]
+        await asyncio.gather(first, *batch, *interactive)
+
+    asyncio.run(weighted())
+    assert order == ["blocker", BATCH] + [INTERACTIVE] * 4 + [BATCH] * 3
+
+    # interactive p95가 SLO를 넘으면 실행 중인 batch 호출을 선점하고, batch는 나중에 다시 실행
+    scheduler = PriorityScheduler(slots_per_upstream=1, interactive_slo_s=0.5)
+    scheduler._latency.extend([1.0] * 5)
+    batch_runs = []
+
+    async def slow_batch():
+        batch_runs.append(time.perf_counter())
+        await asyncio.sleep(0.3)
+        return "batch done"
+
+    async def preempt():
+        with priority_scope(BATCH):
+            batch = asyncio.ensure_future(scheduler.run("up", slow_batch))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        fast = await scheduler.run("up", lambda: call("fast", 0.01))
+        fast_s = time.perf_counter() - start
+
+        # 슬롯을 기다리는 interactive 호출은 요청 예산을 넘기지 않음
+        with deadline_scope(Deadline(0.05)):
+            with pytest.raises(DeadlineExceeded):
+                await scheduler.run("up", lambda: call("late", 0.01))
+        return fast, fast_s, await batch
+
+    fast, fast_s, batch_result = asyncio.run(preempt())
+    assert fast == "fast" and fast_s < 0.1
+    assert batch_result == "batch done" and len(batch_runs) == 2
+    stats = scheduler.stats()
+    assert stats["degraded"] is True and stats["preemptions"]["batch"] == 1
+    assert stats["upstreams"]["up"]["in_use"] == 0
+
+    # 요청을 보내기 시작한(commit) batch 호출은 선점하지 않음 → 재실행으로 한도를 두 번 쓰지 않음
+    sent = []
+
+    async def sent_batch():
+        scheduler.commit("up")
+        sent.append(time.perf_counter())
+        await asyncio.sleep(0.15)
+        return "sent batch done"
+
+    async def no_preempt():
+        with priority_scope(BATCH):
+            batch = asyncio.ensure_future(scheduler.run("up", sent_batch))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        await scheduler.run("up", lambda: call("after", 0.01))
+        return time.perf_counter() - start, await batch
+
+    waited_s, sent_result = asyncio.run(no_preempt())
+    assert sent_result == "sent batch done" and len(sent) == 1
+    assert waited_s >= 0.08
+    assert scheduler.stats()["preemptions"]["batch"] == 1
+
+
+def _patch_search_upstreams(monkeypatch, places, naver_delay=0.0):
+    import api.search as search
+
+    async def fake_google(full_query, api_key):
+        return 200, {"results": places}
+
+    async def fake_naver(query, display=1):
+        await asyncio.sleep(naver_delay)
+        return None
+
+    monkeypatch.setattr(search.settings, "GOOGLE_MAPS_KEY", "test-key")
+    monkeypatch.setattr(search, "_google_text_search", fake_google)
+    monkeypatch.setattr(search, "_naver_local_search", fake_naver)
+    monkeypatch.setattr(search, "_find_in_dataset", lambda query, **kw: None)
+    store = {}
+    monkeypatch.setattr(search, "_get_cached", store.get)
+    monkeypatch.setattr(search, "_set_cache", store.__setitem__)
+    return store
+
+
+def _google_place(name, lat, lng):
+    return {"name": name, "formatted_address": "서울 성동구", "place_id": name,
+            "geometry": {"location": {"lat": lat, "lng": lng}}}
+
+
+def test_search_stream_emits_places_then_verdicts_then_summary(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.search as search
+    from api.server import app
+
+    places = [_google_place(f"카페 {i}", lat, 127.05) for i, lat in enumerate([37.544, 37.545, 37.546])]
+    store = _patch_search_upstreams(monkeypatch, places)
+    client = TestClient(app)
+
+    with client.stream("POST", "/api/v1/search/stream", json={"query": "카페", "region": "성수동"}) as resp:
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in resp.iter_lines() if line]
+
+    kinds = [e["event"] for e in events]
+    assert kinds == ["places", "place", "place", "place", "summary"]
+    assert [p["name"] for p in events[0]["places"]] == ["카페 0", "카페 1", "카페 2"]
+    assert events[0]["places"][1]["original"] == {"lat": 37.545, "lng": 127.05}
+    assert sorted(e["index"] for e in events[1:4]) == [0, 1, 2]
+    assert all(e["place"]["status"] == "not_found" for e in events[1:4])
+    assert events[-1]["total"] == 3 and events[-1]["cached"] is False
+    assert "place_verify" in events[-1]["meta"]["budget"]["stages"]
+
+    # 스트림 결과는 JSON 엔드포인트와 같은 캐시 항목을 채움
+    cached = store[search._search_key("카페 성수동", "성수동")]
+    assert [p["name"] for p in cached["places"]] == ["카페 0", "카페 1", "카페 2"]
+    assert client.post("/api/v1/search", json={"query": "카페", "region": "성수동"}).json() == cached
+
+    # SSE 형식 + 캐시 재생
+    with client.stream("GET", "/api/v1/search/stream", params={"query": "카페"},
+                       headers={"Accept": "text/event-stream"}) as resp:
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        body = resp.read().decode()
+    frames = [f for f in body.split("\n\n") if f]
+    assert frames[0].startswith("event: places\ndata: ")
+    last = json.loads(frames[-1].split("data: ", 1)[1])
+    assert last["event"] == "summary" and last["cached"] is True
+
+
+def test_search_stream_sends_google_places_before_naver_resolves(monkeypatch):
+    import api.search as search
+
+    _patch_search_upstreams(monkeypatch, [_google_place("카페", 37.544, 127.05)], naver_delay=0.3)
+
+    async def main():
+        start = time.perf_counter()
+        stream = search._search_events("카페 성수동")
+        first = await stream.__anext__()
+        first_at = time.perf_counter() - start
+        rest = [e async for e in stream]
+        return first, first_at, rest
+
+    first, first_at, rest = asyncio.run(main())
+    assert first["event"] == "places"
+    assert first_at < 0.2               # Naver 응답(0.3s)을 기다리지 않음
+    assert [e["event"] for e in rest] == ["place", "summary"]
+
+
+def test_places_are_verified_against_naver_concurrently_with_deadline(monkeypatch):
+    import api.search as search
+
+    places = [_google_place(name, 37.5445, 127.0567) for name in ("알파 카페", "베타 식당", "감마 서점", "느린 가게")]
+    _patch_search_upstreams(monkeypatch, places)
+    monkeypatch.setattr(search.settings, "NAVER_SEARCH_CLIENT_ID", "id")
+    monkeypatch.setattr(search.settings, "NAVER_SEARCH_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(search.settings, "NAVER_VERIFY_CONCURRENCY", 3)
+    monkeypatch.setattr(search.settings, "NAVER_VERIFY_DEADLINE_S", 0.4)
+
+    active = peak = 0
+    queries = []
+
+    async def fake_naver(query, display=1):
+        nonlocal active, peak
+        queries.append(query)
+        active += 1
+        peak = max(peak, active)
+        try:
+            await asyncio.sleep(2.0 if query.startswith("느린") else 0.1)
+        finally:
+            active -= 1
+        if query == "카페 성수동":
+            return None                                  # 쿼리 단위 조회는 실패
+        name = query.rsplit(" ", 1)[0]
+        return {"title": f"<b>{name}</b>", "mapx": "1270567000", "mapy": "375445000"}
+
+    monkeypatch.setattr(search, "_naver_local_search", fake_naver)
+
+    async def main():
+        start = time.perf_counter()
+        response = await search._search_uncached("카페 성수동", "성수동", "test-key")
+        return response, time.perf_counter() - start
+
+    response, elapsed = asyncio.run(main())
+    assert elapsed < 1.0                                  # 마감 시각에서 느린 조회를 끊음
+    assert peak <= 3 + 1                                  # 장소별 3개 + 쿼리 단위 1개
+    assert sorted(queries) == sorted(["카페 성수동"] + [f"{p['name']} 성수동" for p in places])
+    by_name = {p["name"]: p for p in response["places"]}
+    for name in ("알파 카페", "베타 식당", "감마 서점"):
+        assert by_name[name]["naver_name"] == name        # 각자 자기 Naver 결과로 판정
+        assert by_name[name]["status"] == "verified"
+    assert by_name["느린 가게"]["naver_name"] is None
+    assert by_name["느린 가게"]["status"] == "not_found"
+
+
+def test_query_fallbacks_run_in_parallel_and_ncp_only_as_last_resort(monkeypatch):
+    import api.search as search
+
+    ncp_calls = []
+    csv_row = {"n_name": "CSV 카페", "poi_type": "cafe", "n_address": "", "n_lat": 37.54, "n_lng": 127.05}
+
+    def make_naver(delay, item):
+        async def naver():
+            await asyncio.sleep(delay)
+            return item
+        return naver
+
+    async def fake_ncp(address):
+        ncp_calls.append(address)
+        await asyncio.sleep(0.2)
+        return 37.6, 127.1
+
+    def slow_csv(query, **kw):
+        time.sleep(0.1)
+        return csv_row
+
+    monkeypatch.setattr(search, "_ncp_geocode", fake_ncp)
+    monkeypatch.setattr(search, "_find_in_dataset", slow_csv)
+    results = [{"formatted_address": "서울 성동구"}]
+
+    async def resolve(naver):
+        start = time.perf_counter()
+        out = await search._resolve_query_naver("카페 성수동", results, asyncio.ensure_future(naver()))
+        return out, time.perf_counter() - start
+
+    # Naver 결과 없음 → CSV 채택, NCP는 호출하지 않음 (일일 한도 보존)
+    (item, lat, lng, source), elapsed = asyncio.run(resolve(make_naver(0.05, None)))
+    assert source == "csv" and item["title"] == "CSV 카페" and (lat, lng) == (37.54, 127.05)
+    assert elapsed < 0.25 and ncp_calls == []
+
+    # Naver가 CSV보다 늦어도 우선순위가 높으므로 Naver 채택
+    naver_item = {"title": "네이버 카페", "mapx": "1270567000", "mapy": "375445000"}
+    (item, lat, lng, source), _ = asyncio.run(resolve(make_naver(0.15, naver_item)))
+    assert source == "naver" and item is naver_item and (lat, lng) == (37.5445, 127.0567)
+    assert ncp_calls == []
+
+    # Naver/CSV 모두 좌표 없음 → 그때만 NCP 좌표 + Naver item 메타데이터
+    monkeypatch.setattr(search, "_find_in_dataset", lambda query, **kw: None)
+    (item, lat, lng, source), elapsed = asyncio.run(resolve(make_naver(0.05, {"title": "좌표 없음"})))
+    assert source == "ncp" and item["title"] == "좌표 없음" and (lat, lng) == (37.6, 127.1)
+    assert ncp_calls == ["서울 성동구"] and elapsed < 0.4
+
+
+def test_verify_batch_streams_verdicts_with_bounded_concurrency_and_quota_reserve(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.batch_verify as batch_verify
+    import api.search as search
+    from api.server import app
+    from shared.quota import QuotaManager
+
+    _patch_search_upstreams(monkeypatch, [])
+    monkeypatch.setattr(search.settings, "NAVER_SEARCH_CLIENT_ID", "id")
+    monkeypatch.setattr(search.settings, "NAVER_SEARCH_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(search.settings, "BATCH_VERIFY_CONCURRENCY", 3)
+    monkeypatch.setattr(search.settings, "BATCH_VERIFY_NAVER_RESERVE", 2)
+    monkeypatch.setattr(search.settings, "BATCH_VERIFY_SPOOL_BYTES", 64)   # 임시 파일로 넘어가도 동일
+    quotas = QuotaManager({"naver": (0.0, 12)})
+    monkeypatch.setattr(batch_verify.http_pool, "quotas", quotas)
+
+    in_flight, peak = 0, 0
+
+    async def fake_naver(query, display=1):
+        nonlocal in_flight, peak
+        quotas.charge("naver")                         # 실제 풀도 요청 전에 한도를 예약
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        name = query.split(" ")[0]
+        return {"title": f"<b>{name}</b>", "mapx": "1270566000", "mapy": "375443000"}
+
+    monkeypatch.setattr(batch_verify, "_naver_local_lookup", fake_naver)
+
+    rows = "\n".join(f"카페{i},37.5443,127.0566" for i in range(12))
+    body = f"poi_name,g_lat,g_lng\n{rows}\n하이라인,,127.0566\n"
+    with TestClient(app).stream(
+        "POST", "/api/v1/verify/batch?region=성수동", content=body.encode(), headers={"Content-Type": "text/csv"},
+    ) as response:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    places = [e for e in events if e["event"] == "place"]
+    errors = [e for e in events if e["event"] == "error"]
+    assert sorted(e["index"] for e in places) == list(range(12))
+    assert errors == [{"event": "error", "index": 12, "line": 14, "error": "name, lat and lng are required"}]
+    assert peak == 3                                   # 동시 판정 수 제한
+    # 일일 한도 12 - 라이브 몫 2 → 10건만 Naver 검색, 나머지는 폴백
+    assert sum(e["naver"] == "searched" for e in places) == 10
+    assert sum(e["naver"] == "quota_exhausted" for e in places) == 2
+    searched = next(e for e in places if e["naver"] == "searched")["place"]
+    assert searched["status"] == "verified" and searched["corrected"]
+
+    summary = events[-1]
+    assert summary["event"] == "summary"
+    assert summary["total"] == 13 and summary["errors"] == 1 and summary["naver_skipped"] == 2
+    assert summary["naver_failed"] == 0
+    assert summary["statuses"] == {"verified": 10, "warning": 0, "not_found": 2}
+
+    ndjson = '{"name": "하이라인", "lat": 37.5443, "lng": 127.0566}\nnot json\n'
+    response = TestClient(app).post(
+        "/api/v1/verify/batch", content=ndjson.encode(), headers={"Content-Type": "application/x-ndjson"},
+    )
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(e["event"] for e in events[:-1]) == ["error", "place"] and events[-1]["event"] == "summary"
+    assert events[-1]["statuses"]["not_found"] == 1     # Naver 한도 소진 → 폴백 없음 → not_found
+
+    # 인코딩이 깨진 입력 → 입력 전체 오류 1건, total과 errors가 같은 기준
+    broken = b"poi_name,g_lat,g_lng\n\xff\xfe,37.5,127.0\n"
+    response = TestClient(app).post("/api/v1/verify/batch", content=broken, headers={"Content-Type": "text/csv"})
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[0]["error"].startswith("invalid batch payload") and "line" not in events[0]
+    assert events[-1]["total"] == events[-1]["errors"] == 1
+
+    # Naver 429 → not_found로 판정하지 않고 해당 줄 오류 (naver="failed"), 따로 집계
+    async def rate_limited(upstream, url, **kwargs):
+        return 429, None
+
+    monkeypatch.setattr(batch_verify, "_naver_local_lookup", search._naver_local_lookup)
+    monkeypatch.setattr(batch_verify.http_pool, "quotas", QuotaManager({"naver": (0.0, 100)}))
+    monkeypatch.setattr(search.http_pool, "get_json", rate_limited)
+    response = TestClient(app).post(
+        "/api/v1/verify/batch", content=ndjson.encode(), headers={"Content-Type": "application/x-ndjson"},
+    )
+    events = [json.loads(line) for line in response.text.splitlines()]
+    failed = [e for e in events if e.get("naver") == "failed"]
+    assert failed == [{"event": "error", "index": 0, "line": 1, "naver": "failed",
+                       "error": "naver lookup failed: HTTP 429"}]
+    assert not any(e["event"] == "place" for e in events)
+    assert events[-1]["naver_failed"] == 1 and events[-1]["statuses"]["not_found"] == 0
+
+    # 입력 읽기 중 예상 밖 오류(spool 디스크 I/O 등) → 응답이 멈추지 않고 오류 + summary로 끝남
+    async def failing_records(spool, content_type):
+        yield 1, {"name": "하이라인", "lat": 37.5443, "lng": 127.0566}
+        raise OSError("spool read failed")
+
+    monkeypatch.setattr(batch_verify, "_read_records", failing_records)
+    response = TestClient(app).post(
+        "/api/v1/verify/batch", content=ndjson.encode(), headers={"Content-Type": "application/x-ndjson"},
+    )
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[-2] == {"event": "error", "index": 1, "error": "batch input failed: spool read failed"}
+    assert events[-1]["event"] == "summary" and events[-1]["total"] == 2 and events[-1]["errors"] == 2
+
+
+def test_verify_batch_csv_reader_keeps_quoted_newlines_across_read_batches():
+    import io
+
+    from api.batch_verify import _READ_ROWS, _read_records
+
+    n = _READ_ROWS * 3
+    body = "poi_name,g_lat,g_lng\n" + "".join(f'"카페 {i}\n2층",37.5,127.0\n' for i in range(n))
+    spool = io.BytesIO(body.encode())
+
+    async def read():
+        return [item async for item in _read_records(spool, "text/csv")]
+
+    records = asyncio.run(read())
+    assert len(records) == n
+    assert all(record["poi_name"] == f"카페 {i}\n2층" for i, (_, record) in enumerate(records))
+    assert records[1][0] == 5                  # 줄 번호는 행이 끝나는 물리적 줄
+
+
+def test_verify_pipeline_checkpoints_stops_on_quota_and_resumes(monkeypatch, tmp_path):
+    import csv
+
+    import api.batch_verify as batch_verify
+    import api.search as search
+    from ml.verify_pipeline import run_pipeline
+    from shared.quota import QuotaManager
+
+    _patch_search_upstreams(monkeypatch, [])
+    monkeypatch.setattr(batch_verify.settings, "NAVER_SEARCH_CLIENT_ID", "id")
+    monkeypatch.setattr(batch_verify.settings, "NAVER_SEARCH_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(batch_verify.settings, "BATCH_VERIFY_NAVER_RESERVE", 0)
+    quotas = QuotaManager({"naver": (0.0, 7)})
+    monkeypatch.setattr(batch_verify.http_pool, "quotas", quotas)
+    queries = []
+
+    async def fake_naver(query, display=1):
+        quotas.charge("naver")
+        queries.append(query)
+        await asyncio.sleep(0.001 * (len(queries) % 3))     # 완료 순서를 섞음
+        name = query.split(" ")[0]
+        if name.startswith("폐업"):
+            return None
+        return {"title": name, "mapx": "1270566000", "mapy": "375443000"}
+
+    monkeypatch.setattr(batch_verify, "_naver_local_lookup", fake_naver)
+
+    source = tmp_path / "pois.csv"
+    with open(source, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["poi_name", "g_lat", "g_lng", "poi_type", "search_region"])
+        for i in range(10):
+            name, poi_type = (f"폐업{i}", "bar") if i % 3 == 0 else (f"카페{i}", "cafe")
+            writer.writerow([name, 37.5443, 127.0566, poi_type, "성수동 카페"])
+    output = str(tmp_path / "results.csv")
+
+    # 첫 실행: 일일 한도 7건 → 7행 처리 후 멈춤 (체크포인트 = 다음 행 7)
+    first = asyncio.run(run_pipeline(str(source), output, concurrency=3, checkpoint_every=2))
+    assert first["processed"] == 7 and first["next_row"] == 7 and not first["complete"]
+    assert "quota" in first["stopped"]
+    assert queries[0] == "폐업0 성수동"
+
+    # 체크포인트 이후 일부만 쓰인 행(충돌)은 재개 시 잘라냄
+    with open(output, "a", encoding="utf-8") as f:
+        f.write("99,partial")
+    quotas = QuotaManager({"naver": (0.0, 100)})
+    monkeypatch.setattr(batch_verify.http_pool, "quotas", quotas)
+    second = asyncio.run(run_pipeline(str(source), output, concurrency=3, checkpoint_every=2))
+    assert second["processed"] == 3 and second["complete"] and second["stopped"] is None
+
+    with open(output, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [int(r["row"]) for r in rows] == list(range(10))      # 입력 순서, 중복 없음
+    assert {r["status"] for r in rows if r["poi_name"].startswith("폐업")} == {"not_found"}
+
+    summary = second["summary"]
+    assert summary["total"] == 10
+    assert summary["statuses"]["not_found"] == {"count": 4, "pct": 40.0}
+    assert summary["poi_types"]["bar"] == {"total": 4, "verified": 0, "warning": 0, "not_found": 4,
+                                           "not_found_pct": 100.0}
+    assert summary["poi_types"]["cafe"]["verified"] == 6
+    with open(f"{output}.summary.json", encoding="utf-8") as f:
+        assert json.load(f) == summary
+
+    # Naver 429 → 그 행은 기록하지 않고 멈춤, 체크포인트도 그 행에서 (재실행 시 다시 조회)
+    from shared.breaker import BreakerRegistry
+
+    restarted = str(tmp_path / "restarted.csv")
+    calls = {"n": 0}
+
+    async def flaky_naver(upstream, url, **kwargs):
+        calls["n"] += 1
+        if calls["n"] > 3:
+            return 429, None
+        return 200, {"items": [{"title": "카페", "mapx": "1270566000", "mapy": "375443000"}]}
+
+    monkeypatch.setattr(batch_verify, "_naver_local_lookup", search._naver_local_lookup)
+    monkeypatch.setattr(batch_verify.http_pool, "breakers", BreakerRegistry())
+    monkeypatch.setattr(batch_verify.http_pool, "get_json", flaky_naver)
+    failed = asyncio.run(run_pipeline(str(source), restarted, concurrency=1, limit=6, restart=True))
+    assert failed["processed"] == 3 and failed["next_row"] == 3 and "HTTP 429" in failed["stopped"]
+    with open(restarted, encoding="utf-8", newline="") as f:
+        assert [int(r["row"]) for r in csv.DictReader(f)] == [0, 1, 2]
+    with open(f"{restarted}.checkpoint.json", encoding="utf-8") as f:
+        assert json.load(f)["next_row"] == 3
+
+    # 차단기가 열려 있으면 조회 없이 멈춤 → 출력·체크포인트 그대로
+    registry = BreakerRegistry(min_calls=1, open_s=60)
+    breaker = registry.for_url(search.NAVER_LOCAL_SEARCH_URL)
+    breaker.allow()
+    breaker.record(False)
+    monkeypatch.setattr(batch_verify.http_pool, "breakers", registry)
+    blocked = asyncio.run(run_pipeline(str(source), restarted, concurrency=1, limit=3))
+    assert blocked["processed"] == 0 and blocked["next_row"] == 3 and "circuit open" in blocked["stopped"]
+    assert blocked["summary"]["total"] == 3
+
+    # 체크포인트만 남고 출력이 지워졌으면 --restart 안내
+    os.remove(output)
+    with pytest.raises(SystemExit, match="--restart"):
+        asyncio.run(run_pipeline(str(source), output))